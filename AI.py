@@ -1,36 +1,173 @@
 import shlex
-from subprocess import Popen, PIPE
+import threading
 import piece
+import engine
+import book
+import timecontrol
+import enginepool
+import engineconfig
 
-# A class that launches the Stockfish AI program and communicate with it for a solid AI to be played against.
+
+# The position a standard game starts from, which is sent to the program by name.
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+# A MoveRequest class that stands for a move an AI program has been asked for and may still be thinking of. It is completed from the thread
+# that finds the move, while the draw loop only polls it, so that the game keeps running. The answer is turned into the move by a function
+# that runs in the thread collecting the move, as it may touch the chessboard.
+class MoveRequest:
+    # An __init__ member function that gets called as the MoveRequest instance is created. It creates the representation of the object.
+    def __init__(self, finish=lambda answer: answer):
+        self.finish = finish
+        self.answer = None
+        self.ponder = None  # The reply the AI program expects to its move, if it said.
+        self.event = threading.Event()
+        
+    # A member function that gives the answer of the AI program. It can be called from any thread.
+    def complete(self, answer):
+        self.answer = answer
+        self.event.set()
+        
+    # A member function that determines if the AI program has answered.
+    def isDone(self):
+        return self.event.isSet()
+    
+    # A member function that returns the move, waiting for the AI program to answer if it has not yet.
+    def getMove(self, timeout=None):
+        self.event.wait(timeout)
+        return self.finish(self.answer) if self.isDone() else None
+
+
+# A function that returns the pool of the processes of the program of an engine profile, which keeps one running between games.
+def getStockfishPool(profile):
+    return enginepool.getPool(profile.path)
+
+
+# A class that borrows a Stockfish AI program from the pool and communicate with it for a solid AI to be played against. The engine profile
+# gives the program to run and the options it is given.
 class StockfishAI:
     # An __init__ member function that gets called as the Stockfish AI instance is created. It creates the representation of the object.
-    def __init__(self, master):
+    def __init__(self, master, timeManager=None, ponder=True, profile=None):
         self.master = master
-        self.path = sketchPath() + "\\data\\stockfish_9_x64.exe"
-        self.process = Popen(self.path, stdin=PIPE, stdout=PIPE)
-        self.moves = []
+        self.timeManager = timeManager or timecontrol.TimeManager()
+        self.ponder = ponder
+        self.profile = profile or engineconfig.getProfile()
+        self.pool = getStockfishPool(self.profile)
+        self.engine = self.pool.acquire()
+        self.position = "startpos" if master.chessboard.toFEN() == STARTING_FEN else "fen " + master.chessboard.toFEN()
+        self.moves = []  # The moves made since the position, none of which captures or moves a pawn.
+        self.syncedPosition = None  # The last position command sent to the program.
+        self.book = book.openBook()
+        self.request = None
+        self.clock = None
+        self.lastMove = None
+        self.promoting = False  # Whether the last move of the program promotes a pawn, which is only done once the move has been made.
+        self.ponderMove = None  # The reply the program is thinking about while the player thinks, if any.
+        self.ponderRequest = None
+        self.ponderHit = False  # Whether the player has made the expected reply, so that the search has become the program's search.
         self.setup()
         
-    # A member function that readies the Stockfish AI program.
+    # A member function that readies the Stockfish AI program. The pool lends it ready for a new game, so only the options of the profile and
+    # of this game are left to be set.
     def setup(self):
-        self.process.stdout.readline()  # the Stockfish AI program prints one line by default when it is launched.
-        self.process.stdin.write("isready\r\nucinewgame\r\n")
-        self.process.stdin.flush()
-        self.process.stdout.readline()  # the Stockfish AI should print readyok here.
+        self.engine.setOptions(self.profile.options + [("Ponder", "true" if self.ponder else "false")])
         
-    # A member function that gets the move from the AI program.
-    def getMove(self):
-        self.process.stdin.write("go\r\n")
-        self.process.stdin.flush()
-
-        out = self.process.stdout.readline()
-        while "bestmove" not in out:
-            out = self.process.stdout.readline()
+    # A member function that sends commands to the program.
+    def send(self, *commands):
+        self.engine.send(*commands)
+        
+    # A member function that replaces the program with a new one from the pool once it has died, which starts from the current position.
+    def restart(self):
+        self.engine = self.pool.restart(self.engine)
+        self.setup()
+        self.syncedPosition = None
+        self.ponderMove = None
+        self.ponderHit = False
+        
+    # A member function that asks for a move and returns the request at once, which the program completes when it has found the move. The
+    # opening book, if it has a move, completes it without asking the program. With a clock, the program is given the times left and
+    # manages them itself, and is otherwise given the time the time manager allows; either way, it is stopped at the ceiling, if any. If the
+    # program has been pondering on the move the player made, the search it is already running is the answer. A program that has died is
+    # replaced first.
+    def requestMove(self, clock=None):
+        self.clock = clock
+        if not self.engine.isAlive():
+            self.restart()
+        
+        if self.ponderHit:
+            self.ponderHit = False
+            return self.request
+        
+        self.request = MoveRequest(self.readMove)
+        
+        move = self.getBookMove()
+        if move is not None:
+            self.request.complete(move)
+            return self.request
+        
+        self.sync()
+        self.go(self.request)
+        self.limitSearch(self.request)
+        return self.request
+    
+    # A member function that has the program start a search for a request, with the time controls of the clock, if any.
+    def go(self, request, ponder=False):
+        self.engine.searches.append(request)
+        command = "go ponder" if ponder else "go"
+        
+        if self.clock is not None:
+            times = [int(1000 * max(0, self.clock.getRemaining(color))) for color in (piece.COLOR.WHITE, piece.COLOR.BLACK)]
+            self.send(command + " wtime %d btime %d winc %d binc %d" % (times[0], times[1], 1000 * self.clock.increment, 1000 * self.clock.increment))
+        else:
+            self.send(command + " movetime %d" % (1000 * self.timeManager.getMoveTime()))
             
-        out = out.split()
-        move = out[1]
-
+    # A member function that stops the search of a request at the ceiling of the time manager, if any.
+    def limitSearch(self, request):
+        if self.timeManager.maxMoveTime is not None:
+            timer = threading.Timer(self.timeManager.maxMoveTime, self.stopSearch, (request,))
+            timer.daemon = True
+            timer.start()
+    
+    # A member function that has the program answer a request at once with the best move it has found, unless it already has.
+    def stopSearch(self, request):
+        if request is self.request and not request.isDone():
+            self.send("stop")
+            
+    # A member function that has the program think on the player's time, about the position after the reply it expects to its last move.
+    def startPondering(self):
+        if not self.ponder or self.request is None or self.request.ponder is None:
+            return
+        
+        self.ponderMove = self.request.ponder
+        command = "position " + self.position + " moves " + " ".join(self.moves + [self.ponderMove])
+        self.send(command)
+        self.syncedPosition = command
+        self.ponderRequest = MoveRequest(self.readMove)
+        self.go(self.ponderRequest, True)
+        
+    # A member function that decides, once the player has moved, whether the program has been pondering on the right move. If so, its search
+    # goes on as a normal one; otherwise, it is stopped, and the program will search the actual position once asked.
+    def checkPonderMove(self, move):
+        if move == self.ponderMove:
+            self.send("ponderhit")
+            self.request = self.ponderRequest
+            self.ponderHit = True
+            self.limitSearch(self.request)
+        else:
+            self.send("stop")
+        self.ponderMove = None
+    
+    # A member function that gets the move from the AI program, waiting for it.
+    def getMove(self):
+        return self.requestMove().getMove()
+    
+    # A member function that turns a move in coordinate notation into the cells it goes from and to, and has the promotion it asks for done
+    # once the move has been made. There is no move if the program died while searching.
+    def readMove(self, move):
+        if move is None:
+            return None
+        
+        self.promoting = len(move) > 4
         if len(move) > 4:  # Then, promotion needs to be done.
             newPiece = None
             if move[-1] == "r":
@@ -47,20 +184,112 @@ class StockfishAI:
 
         return move[0], move[1], move[2], move[3]
     
-    # A member function that sends a move made to the program.
+    # A member function that returns a move of the opening book for the current position in coordinate notation, or None if there is none.
+    def getBookMove(self):
+        if self.book is None:
+            return None
+        
+        board = self.master.chessboard.copy()
+        bookMove = self.book.chooseMove(board)
+        if bookMove is None:
+            return None
+        
+        r1, c1, r2, c2, moveType, promotion = bookMove
+        return "".join(board.cellToPos(r1, c1) + board.cellToPos(r2, c2)) + piece.symbols[promotion]
+    
+    # A member function that is told about a move made. Nothing is sent until the program is asked for a move, so that a move and its
+    # promotion go in one command. A capture or a pawn move cannot be undone, so the position after it replaces the moves made so far, which
+    # keeps the command short however long the game is, while the program still sees every move it needs to detect repetitions. Once the
+    # program's own move has been made, it ponders; once the player's has, the pondering is checked against it, unless it is a promotion,
+    # which is only known in full when the promotion is sent.
+    def setMove(self, a1, n1, a2, n2):
+        self.lastMove = a1 + n1 + a2 + n2
+        record = self.master.chessboard.history[-1]
+        if record["captured"] is not None or record["chessPiece"].pieceType == piece.PIECE.PAWN:
+            self.position = "fen " + self.master.chessboard.toFEN()
+            self.moves = []
+        else:
+            self.moves.append(self.lastMove)
+            
+        if self.ponderMove is not None:
+            if not (len(self.ponderMove) > 4 and self.ponderMove[:4] == self.lastMove):
+                self.checkPonderMove(self.lastMove)
+        elif self.master.chessboard.turn in self.master.settings["playAs"] and not self.promoting:
+            self.startPondering()
+        
+    # A member function that is told about a promotion, which follows the pawn move and so replaces the position.
+    def promote(self, symbol):
+        self.position = "fen " + self.master.chessboard.toFEN()
+        self.moves = []
+        
+        if self.promoting:
+            self.promoting = False
+            self.startPondering()
+        elif self.ponderMove is not None:
+            self.checkPonderMove(self.lastMove + symbol)
+        
+    # A member function that sends the current position to the program, unless it already has it.
+    def sync(self):
+        command = "position " + self.position + ("" if not self.moves else " moves " + " ".join(self.moves))
+        if command != self.syncedPosition:
+            self.send(command)
+            self.syncedPosition = command
+        
+    # A member function that gives the program back to the pool, which stops any search and readies it for the next game.
+    def quit(self):
+        self.pool.release(self.engine)
+        if self.book is not None:
+            self.book.close()
+
+
+# A class that plays with the built-in engine, which searches the game's own chessboard and so can play every variant. It has the same
+# interface as the StockfishAI class, but needs no program to be launched and no moves to be sent, as it reads the chessboard directly.
+class NativeAI:
+    # An __init__ member function that gets called as the NativeAI instance is created. It creates the representation of the object.
+    def __init__(self, master, timeManager=None, megabytes=16):
+        self.master = master
+        self.timeManager = timeManager or timecontrol.TimeManager()
+        self.engine = engine.Engine(megabytes=megabytes, book=book.openBook())
+        
+    # A member function that asks for a move and returns the request at once. The engine searches a headless copy of the chessboard in its
+    # own thread, so that the game is neither disturbed nor kept waiting, for as long as the time manager allows.
+    def requestMove(self, clock=None):
+        board = self.master.chessboard.copy()
+        self.engine.maxTime = self.timeManager.getMoveTime(clock, board.turn)
+        request = MoveRequest(lambda move: self.readMove(board, move))
+        
+        searcher = threading.Thread(target=lambda: request.complete(self.engine.search(board)))
+        searcher.daemon = True
+        searcher.start()
+        return request
+    
+    # A member function that gets the move from the engine, waiting for it.
+    def getMove(self):
+        return self.requestMove().getMove()
+    
+    # A member function that turns a move found by the engine into the cells it goes from and to, and has its promotion done once the move
+    # has been made.
+    def readMove(self, board, move):
+        r1, c1, r2, c2, moveType, promotion = move
+        a1, n1 = board.cellToPos(r1, c1)
+        a2, n2 = board.cellToPos(r2, c2)
+        
+        if promotion:
+            self.master.drawingQueue.put(lambda: self.master.chessboard.get(r2, c2).changeTo(self.master.chessboard.get(r2, c2).color * promotion))
+            
+        return a1, n1, a2, n2
+    
+    # A member function that is told about a move made. The engine reads the chessboard itself, so there is nothing to do.
     def setMove(self, a1, n1, a2, n2):
-        self.moves.append(a1 + n1 + a2 + n2)
-        self.process.stdin.write("\r\nposition startpos moves " + " ".join(self.moves) + "\r\n")
-        self.process.stdin.flush()
+        pass
         
-    # A member function that sends information about promotion.
+    # A member function that is told about a promotion. The engine reads the chessboard itself, so there is nothing to do.
     def promote(self, symbol):
-        self.moves[-1] += symbol
-        self.process.stdin.write("\r\nposition startpos moves " + " ".join(self.moves) + "\r\n")
-        self.process.stdin.flush()
+        pass
         
-    # A member function that quits the process.
+    # A member function that stops the AI. The engine runs in the program itself, so there is only its search to stop and the opening book to
+    # close.
     def quit(self):
-        self.process.stdin.write("quit\r\n")
-        self.process.stdin.flush()
-        self.process.wait()
+        self.engine.stopped = True
+        if self.engine.book is not None:
+            self.engine.book.close()
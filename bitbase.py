@@ -0,0 +1,348 @@
+import os
+import sys
+import time
+from collections import deque
+import piece
+import move
+import variant
+import bitboard
+
+try:
+    import mmap
+except ImportError:  # Jython has no mmap, so the bitbase files are read a byte at a time instead.
+    mmap = None
+
+
+# A WDL enumeration class that holds the results a bitbase gives, from the point of view of the player to move.
+class WDL:
+    LOSS = -1
+    DRAW = 0
+    WIN = 1
+
+
+# The endgames with a bitbase, each of a king and one other piece against a lone king, indexed by the type of that piece. KPK comes last, as
+# its pawn promotes into the other two.
+ENDGAMES = [(piece.PIECE.QUEEN, "KQK"), (piece.PIECE.ROOK, "KRK"), (piece.PIECE.PAWN, "KPK")]
+NAMES = dict(ENDGAMES)
+
+# A king and a bishop or a knight cannot checkmate a lone king, so those endgames are drawn without a bitbase.
+DRAWN = [piece.PIECE.BISHOP, piece.PIECE.KNIGHT]
+
+# A position is indexed by the player to move, the cell of the king of the side with the extra piece (the strong side), the cell of the
+# lone king and the cell of the extra piece. Cells are numbered r * 8 + c as seen from the strong side, whose pawn moves towards row 0. A
+# bitbase holds one bit for every index, set if the strong side wins; it is clear for drawn and for impossible positions.
+STRONG, WEAK = 0, 1
+SIZE = 8
+CELLS = SIZE * SIZE
+POSITIONS = 2 * CELLS * CELLS * CELLS
+FORWARD = -1
+UNKNOWN = 255  # The number of moves left of a position of the lone king where it can capture the piece, which it is never forced out of.
+
+DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+# A function that returns the path of the file of a bitbase.
+def getPath(name, directory=DIRECTORY):
+    return os.path.join(directory, name + ".bitbase")
+
+
+# A function that returns the index of a position.
+def getIndex(toMove, strongKing, weakKing, other):
+    return ((toMove * CELLS + strongKing) * CELLS + weakKing) * CELLS + other
+
+
+# A function that returns the player to move and the three cells of the position of an index.
+def getPosition(index):
+    return index >> 18, index >> 12 & 63, index >> 6 & 63, index & 63
+
+
+# A Rules class that holds how the pieces of an endgame move, read from the move types of the pieces and the geometry of a standard
+# chessboard, with cells numbered as in the bitbases.
+class Rules:
+    # An __init__ member function that gets called when a Rules instance is created. It creates the representation of the object.
+    def __init__(self, pieceType):
+        geometry = variant.Standard.getGeometry()
+        cells = [(i // SIZE, i % SIZE) for i in xrange(CELLS)]
+        toIndices = lambda table: [tuple(r * SIZE + c for r, c in table[r][c]) for r, c in cells]
+
+        self.pieceType = pieceType
+        self.kingCells = toIndices(geometry.kingCells)
+        self.adjacent = [set(kingCells) for kingCells in self.kingCells]
+
+        directions = list()
+        if move.RankFile in piece.numToPiece[pieceType].moves:
+            directions += geometry.orthogonal
+        if move.Diagonal in piece.numToPiece[pieceType].moves:
+            directions += geometry.diagonal
+        self.rays = [[tuple(r * SIZE + c for r, c in geometry.rays[direction][r][c]) for direction in directions] for r, c in cells]
+
+        if pieceType == piece.PIECE.PAWN:
+            self.pushes = toIndices(geometry.pawnPushes[FORWARD])
+            self.doublePushes = toIndices(geometry.pawnDoublePushes[FORWARD])
+            self.attacks = [dict((target, ()) for target in captures) for captures in toIndices(geometry.pawnCaptures[FORWARD])]
+        else:  # The cells attacked by the piece from every cell, each with the cells in between, which a king may block.
+            self.attacks = [dict((ray[i], ray[:i]) for ray in rays for i in xrange(len(ray))) for rays in self.rays]
+
+    # A member function that determines if a position is possible with a player to move, which may not give check.
+    def isLegal(self, toMove, strongKing, weakKing, other):
+        if strongKing == weakKing or other in (strongKing, weakKing) or weakKing in self.adjacent[strongKing]:
+            return False
+        if self.pieceType == piece.PIECE.PAWN and not 0 < other // SIZE < SIZE - 1:
+            return False
+        return toMove == WEAK or not self.attacksFrom(other, weakKing, strongKing)
+
+    # A member function that returns the cells the piece can move to from a position, with the promotions kept as moves to the last row.
+    def getPieceMoves(self, strongKing, weakKing, other):
+        occupied = (strongKing, weakKing)
+
+        if self.pieceType == piece.PIECE.PAWN:
+            moves = [cell for cell in self.pushes[other] if cell not in occupied]
+            if moves:
+                moves += [cell for cell in self.doublePushes[other] if cell not in occupied]
+            return moves
+
+        moves = list()
+        for ray in self.rays[other]:
+            for cell in ray:
+                if cell in occupied:
+                    break
+                moves.append(cell)
+        return moves
+
+    # A member function that returns the cells the piece may have come from to reach a position, other than by promoting.
+    def getPieceUnmoves(self, strongKing, weakKing, other):
+        occupied = (strongKing, weakKing)
+
+        if self.pieceType != piece.PIECE.PAWN:
+            return self.getPieceMoves(strongKing, weakKing, other)
+
+        unmoves = list()
+        behind = other - FORWARD * SIZE
+        if behind < CELLS and behind not in occupied:
+            unmoves.append(behind)
+            if behind + SIZE < CELLS and other in self.doublePushes[behind + SIZE] and behind + SIZE not in occupied:
+                unmoves.append(behind + SIZE)
+        return unmoves
+
+    # A member function that returns the cells the lone king can move to from a position, the cell of the piece included if it is unprotected.
+    def getWeakKingMoves(self, strongKing, weakKing, other):
+        return [cell for cell in self.kingCells[weakKing] if cell != strongKing and cell not in self.adjacent[strongKing] and \
+                not self.attacksFrom(other, cell, strongKing)]
+
+    # A member function that determines if the piece attacks a cell while the strong king stands on another one.
+    def attacksFrom(self, other, target, strongKing):
+        between = self.attacks[other].get(target)
+        return between is not None and strongKing not in between
+
+
+# The state of a worker process generating a bitbase: the rules of the endgame and the bitbases its pawn promotes into.
+workerRules = None
+workerPromotions = dict()
+
+
+# A function that readies a worker process. It runs once in every worker as the pool starts.
+def initializeWorker(pieceType, promotions):
+    global workerRules, workerPromotions
+    workerRules = Rules(pieceType)
+    workerPromotions = dict((promotion, bytearray(bits)) for promotion, bits in promotions.items())
+
+
+# A function that looks at every position with the strong king on a cell, going forward from it by one move. It returns whether each
+# position is possible, how many moves the lone king has in each of its positions, and the positions won at once: those where the lone king
+# is checkmated and those where a pawn promotes into a won position.
+def analyseKingCell(strongKing):
+    rules = workerRules
+    legal = bytearray(2 * CELLS * CELLS)
+    counts = bytearray(CELLS * CELLS)
+    won = list()
+
+    for weakKing in xrange(CELLS):
+        for other in xrange(CELLS):
+            i = weakKing * CELLS + other
+
+            if rules.isLegal(WEAK, strongKing, weakKing, other):
+                legal[CELLS * CELLS + i] = 1
+                moves = rules.getWeakKingMoves(strongKing, weakKing, other)
+                counts[i] = UNKNOWN if other in moves else len(moves)
+                if not moves and rules.attacksFrom(other, weakKing, strongKing):
+                    won.append(getIndex(WEAK, strongKing, weakKing, other))
+
+            if rules.isLegal(STRONG, strongKing, weakKing, other):
+                legal[i] = 1
+                if rules.pieceType == piece.PIECE.PAWN:
+                    for cell in rules.getPieceMoves(strongKing, weakKing, other):
+                        if cell < SIZE and any(isSet(bits, getIndex(WEAK, strongKing, weakKing, cell)) for bits in workerPromotions.values()):
+                            won.append(getIndex(STRONG, strongKing, weakKing, other))
+                            break
+
+    return strongKing, legal, counts, won
+
+
+# A function that determines if the bit of an index is set in a packed bit array.
+def isSet(bits, index):
+    return bits[index >> 3] >> (index & 7) & 1 == 1
+
+
+# A function that generates the bitbase of an endgame by retrograde analysis, and returns it as a packed bit array. The positions won at once
+# are found by going forward from every position, which is spread over a pool of worker processes, and the win is then carried backwards
+# by unmaking moves: a position of the strong side is won if one of its moves wins, and one of the lone king if all of its moves lose.
+def generate(pieceType, promotions=dict(), workers=None):
+    legal = bytearray(POSITIONS)
+    counts = bytearray(POSITIONS // 2)
+    queue = deque()
+
+    try:
+        import multiprocessing  # It is only needed here, so that probing the bitbases does not slow down loading the rules.
+    except ImportError:  # Jython has no multiprocessing, so the bitbases are generated in a single process there.
+        multiprocessing = None
+
+    if multiprocessing is not None and workers != 1:
+        pool = multiprocessing.Pool(workers, initializeWorker, (pieceType, dict((key, bytes(bits)) for key, bits in promotions.items())))
+        results = pool.imap_unordered(analyseKingCell, xrange(CELLS))
+    else:
+        pool = None
+        initializeWorker(pieceType, promotions)
+        results = (analyseKingCell(strongKing) for strongKing in xrange(CELLS))
+
+    for strongKing, kingLegal, kingCounts, won in results:
+        for toMove in (STRONG, WEAK):
+            start = getIndex(toMove, strongKing, 0, 0)
+            legal[start:start + CELLS * CELLS] = kingLegal[toMove * CELLS * CELLS:(toMove + 1) * CELLS * CELLS]
+        counts[strongKing * CELLS * CELLS:(strongKing + 1) * CELLS * CELLS] = kingCounts
+        queue.extend(won)
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    rules = Rules(pieceType)
+    bits = bytearray(POSITIONS // 8)
+    for index in queue:
+        bits[index >> 3] |= 1 << (index & 7)
+
+    while queue:
+        toMove, strongKing, weakKing, other = getPosition(queue.popleft())
+
+        if toMove == WEAK:  # The strong side moved last, with its king or its piece.
+            previous = [getIndex(STRONG, cell, weakKing, other) for cell in rules.kingCells[strongKing] if cell not in (weakKing, other)] + \
+                       [getIndex(STRONG, strongKing, weakKing, cell) for cell in rules.getPieceUnmoves(strongKing, weakKing, other)]
+            for index in previous:
+                if legal[index] and not isSet(bits, index):
+                    bits[index >> 3] |= 1 << (index & 7)
+                    queue.append(index)
+        else:  # The lone king moved last.
+            for cell in rules.kingCells[weakKing]:
+                index = getIndex(WEAK, strongKing, cell, other)
+                if cell not in (strongKing, other) and legal[index] and not isSet(bits, index):
+                    counts[index - POSITIONS // 2] -= 1
+                    if counts[index - POSITIONS // 2] == 0:
+                        bits[index >> 3] |= 1 << (index & 7)
+                        queue.append(index)
+
+    return bits
+
+
+# A function that generates the bitbases of every endgame and writes them to their files.
+def generateAll(directory=DIRECTORY, workers=None, out=sys.stdout):
+    bitbases = dict()
+
+    for pieceType, name in ENDGAMES:
+        start = time.time()
+        promotions = dict((promotion, bitbases[promotion]) for promotion in bitbases) if pieceType == piece.PIECE.PAWN else dict()
+        bitbases[pieceType] = generate(pieceType, promotions, workers)
+
+        with open(getPath(name, directory), "wb") as bitbaseFile:
+            bitbaseFile.write(bytes(bitbases[pieceType]))
+        out.write("%s: %d won positions in %.2f s\n" % (name, sum(bin(byte).count("1") for byte in bitbases[pieceType]), time.time() - start))
+
+
+# A Bitbase class that reads the bits of a bitbase file. The file is memory-mapped where possible, so that a probe reads a single byte.
+class Bitbase:
+    # An __init__ member function that gets called when a Bitbase instance is created. It creates the representation of the object.
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if mmap is not None else None
+
+    # A member function that determines if the strong side wins the position of an index.
+    def isWon(self, index):
+        if self.data is not None:
+            byte = self.data[index >> 3:(index >> 3) + 1]
+        else:
+            self.file.seek(index >> 3)
+            byte = self.file.read(1)
+        return ord(byte) >> (index & 7) & 1 == 1
+
+    # A member function that closes the file.
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+        self.file.close()
+
+
+# A dictionary of the bitbases that have been opened, indexed by the type of the extra piece. An endgame whose file is missing maps to None.
+bitbases = dict()
+
+
+# A function that returns the bitbase of an endgame, opening it the first time it is needed, or None if it has not been generated.
+def getBitbase(pieceType):
+    if pieceType not in bitbases:
+        path = getPath(NAMES[pieceType])
+        bitbases[pieceType] = Bitbase(path) if os.path.exists(path) else None
+
+    return bitbases[pieceType]
+
+
+# A function that returns the cell of a piece as numbered in the bitbases, as seen from the side of a color.
+def getCell(board, chessPiece, color):
+    a, n = board.cellToPos(chessPiece.r, chessPiece.c)
+    r = SIZE - int(n) if color == piece.COLOR.WHITE else int(n) - 1
+    return r * SIZE + board.alpha.index(a)
+
+
+# A function that returns the result of a position of a chessboard for the player to move, or None if no bitbase covers it. A bitbase covers
+# a standard chessboard with the two kings and one other piece, and no castling right left.
+def probe(board):
+    if board.bitboards is None or board.castlingRights:
+        return None
+
+    occupied = board.bitboards.occupied
+    rest = occupied & (occupied - 1)
+    rest &= rest - 1
+    if rest == 0 or rest & (rest - 1):  # There are not exactly three pieces.
+        return None
+
+    pieces = [board.get(r, c) for r, c in bitboard.getCells(occupied)]
+    others = [chessPiece for chessPiece in pieces if chessPiece.pieceType != piece.PIECE.KING]
+    if len(others) != 1:
+        return None
+
+    other = others[0]
+    if other.pieceType in DRAWN:
+        return WDL.DRAW
+    bitbase_ = getBitbase(other.pieceType)
+    if bitbase_ is None:
+        return None
+
+    kings = dict((chessPiece.color, chessPiece) for chessPiece in pieces if chessPiece.pieceType == piece.PIECE.KING)
+    if len(kings) != 2:
+        return None
+
+    cell = getCell(board, other, other.color)
+    if other.pieceType == piece.PIECE.PAWN and not 0 < cell // SIZE < SIZE - 1:  # A pawn on its own first row, as in Horde, is not covered.
+        return None
+
+    toMove = STRONG if board.turn == other.color else WEAK
+    index = getIndex(toMove, getCell(board, kings[other.color], other.color), getCell(board, kings[-other.color], other.color), cell)
+
+    if bitbase_.isWon(index):
+        return WDL.WIN if toMove == STRONG else WDL.LOSS
+    return WDL.DRAW
+
+
+def main():
+    # Usage: python bitbase.py [workers]
+    generateAll(workers=int(sys.argv[1]) if len(sys.argv) > 1 else None)
+
+
+if __name__ == "__main__":
+    main()
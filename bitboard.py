@@ -0,0 +1,239 @@
+import os
+import piece
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+# A bitboard is an integer whose bit r * 8 + c is set if the cell (r, c) of an 8x8 chessboard is in the set it represents.
+SIZE = 8
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+
+# The directions in which sliding pieces move. Positive directions go towards higher bits, negative ones towards lower bits.
+ORTHOGONAL = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+DIAGONAL = [(1, 1), (1, -1), (-1, -1), (-1, 1)]
+POSITIVE = set([(0, 1), (1, 0), (1, 1), (1, -1)])
+
+
+# The lines that sliding pieces move along, each given by its two directions. The cells of a line inside its two ends form an occupancy
+# index of 6 bits, which is all that decides where a sliding piece on the line stops.
+LINES = [[(0, 1), (0, -1)], [(1, 0), (-1, 0)], [(1, 1), (-1, -1)], [(1, -1), (-1, 1)]]
+RANK, FILE, DIAGONAL_LINE, ANTI_DIAGONAL_LINE = xrange(4)
+
+FILE_A = sum(1 << (r * SIZE) for r in xrange(SIZE))
+FILE_TO_RANK = sum(1 << (CELLS - SIZE - (SIZE - 1) * r) for r in xrange(SIZE))  # Multiplying a file by this gathers its cells in the last rank.
+
+# The file where the sliding attack tables are cached between runs.
+CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "slidingAttacks.pickle")
+
+
+# A function that determines if a variant can be represented with bitboards.
+def supports(variant_):
+    return variant_.rows == SIZE and variant_.cols == SIZE
+
+
+# A function that returns the bitboard of the cells reached by jumping from every cell by the given offsets.
+def createJumpTable(offsets):
+    table = list()
+
+    for r in xrange(SIZE):
+        for c in xrange(SIZE):
+            mask = 0
+            for dr, dc in offsets:
+                if 0 <= r + dr < SIZE and 0 <= c + dc < SIZE:
+                    mask |= 1 << ((r + dr) * SIZE + c + dc)
+            table.append(mask)
+
+    return table
+
+
+# A function that returns, for every direction, the bitboard of the cells passed by walking from every cell until the edge of the chessboard.
+def createRayTable():
+    table = dict()
+
+    for dr, dc in ORTHOGONAL + DIAGONAL:
+        table[dr, dc] = list()
+        for r in xrange(SIZE):
+            for c in xrange(SIZE):
+                mask = 0
+                r2, c2 = r + dr, c + dc
+                while 0 <= r2 < SIZE and 0 <= c2 < SIZE:
+                    mask |= 1 << (r2 * SIZE + c2)
+                    r2 += dr
+                    c2 += dc
+                table[dr, dc].append(mask)
+
+    return table
+
+
+# A function that returns the bitboard of the cells strictly between every two cells on a common rank, file or diagonal.
+def createBetweenTable():
+    table = [[0] * CELLS for i in xrange(CELLS)]
+
+    for direction in ORTHOGONAL + DIAGONAL:
+        for i in xrange(CELLS):
+            ray = RAYS[direction][i]
+            while ray:
+                j = lowestCell(ray)
+                table[i][j] = RAYS[direction][i] & ~RAYS[direction][j] & ~(1 << j)
+                ray &= ray - 1
+
+    return table
+
+
+# A function that returns the index of the lowest set bit of a bitboard.
+def lowestCell(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+# A function that returns the index of the highest set bit of a bitboard.
+def highestCell(mask):
+    return mask.bit_length() - 1
+
+
+# A function that returns the cells of a bitboard as (r, c) tuples.
+def getCells(mask):
+    cells = list()
+
+    while mask:
+        low = mask & -mask
+        cells.append(CELL_OF_BIT[low])
+        mask ^= low
+
+    return cells
+
+
+# A function that returns the bitboard of the cells attacked by a sliding piece along the given directions, stopping at the first occupied cell.
+def getSlidingAttacks(i, occupied, directions):
+    attacks = 0
+
+    for direction in directions:
+        ray = RAYS[direction][i]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= RAYS[direction][lowestCell(blockers) if direction in POSITIVE else highestCell(blockers)]
+        attacks |= ray
+
+    return attacks
+
+
+# A function that returns the cells of a line through a cell whose occupancy is described by an occupancy index.
+def getLineOccupancy(line, i, index):
+    r, c = divmod(i, SIZE)
+    occupied = 0
+
+    for j in xrange(6):
+        if index >> j & 1:
+            if line == RANK:
+                occupied |= 1 << (r * SIZE + j + 1)
+            elif line == FILE:
+                occupied |= 1 << ((j + 1) * SIZE + c)
+            else:
+                r2 = r + (j + 1 - c) * (1 if line == DIAGONAL_LINE else -1)  # The cell of the diagonal in column j + 1.
+                if 0 <= r2 < SIZE:
+                    occupied |= 1 << (r2 * SIZE + j + 1)
+
+    return occupied
+
+
+# A function that returns the tables of sliding attacks, indexed by line, cell and occupancy index. They are loaded from the cache file
+# if it exists, and otherwise generated and saved there so that later runs start quickly.
+def loadSlidingAttacks():
+    try:
+        with open(CACHE, "rb") as cache:
+            tables = pickle.load(cache)
+        if len(tables) == len(LINES) and all(len(table) == CELLS for table in tables):
+            return tables
+    except (IOError, OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+
+    tables = [[[getSlidingAttacks(i, getLineOccupancy(line, i, index), LINES[line]) for index in xrange(64)] for i in xrange(CELLS)] \
+              for line in xrange(len(LINES))]
+
+    try:
+        with open(CACHE, "wb") as cache:
+            pickle.dump(tables, cache, pickle.HIGHEST_PROTOCOL)
+    except (IOError, OSError):  # The tables are still usable if the cache cannot be written.
+        pass
+
+    return tables
+
+
+# A function that returns the bitboard of the cells attacked along ranks and files by a sliding piece, by looking up its rank and its file.
+# The file is projected onto the last rank by a multiplication whose partial products never overlap, so its index is read from fixed bits.
+def getOrthogonalAttacks(i, occupied):
+    return SLIDING_ATTACKS[RANK][i][occupied >> ((i & ~(SIZE - 1)) + 1) & 63] | \
+           SLIDING_ATTACKS[FILE][i][((occupied >> (i & (SIZE - 1))) & FILE_A) * FILE_TO_RANK >> (CELLS - SIZE + 1) & 63]
+
+
+# A function that returns the bitboard of the cells attacked along diagonals by a sliding piece, by looking up both of its diagonals.
+# Each diagonal is projected onto the last rank in the same way, with every cell landing in its own column.
+def getDiagonalAttacks(i, occupied):
+    return SLIDING_ATTACKS[DIAGONAL_LINE][i][(occupied & LINE_MASKS[DIAGONAL_LINE][i]) * FILE_A >> (CELLS - SIZE + 1) & 63] | \
+           SLIDING_ATTACKS[ANTI_DIAGONAL_LINE][i][(occupied & LINE_MASKS[ANTI_DIAGONAL_LINE][i]) * FILE_A >> (CELLS - SIZE + 1) & 63]
+
+
+KNIGHT = createJumpTable([(2, -1), (2, 1), (1, -2), (1, 2), (-1, -2), (-1, 2), (-2, -1), (-2, 1)])
+KING = createJumpTable(ORTHOGONAL + DIAGONAL)
+PAWN_ATTACKS = {1: createJumpTable([(1, -1), (1, 1)]), -1: createJumpTable([(-1, -1), (-1, 1)])}  # Indexed by the forward direction of the pawn.
+RAYS = createRayTable()
+BETWEEN = createBetweenTable()
+LINE_MASKS = [[RAYS[line[0]][i] | RAYS[line[1]][i] for i in xrange(CELLS)] for line in LINES]
+SLIDING_ATTACKS = loadSlidingAttacks()
+CELL_OF_BIT = dict((1 << (r * SIZE + c), (r, c)) for r in xrange(SIZE) for c in xrange(SIZE))
+
+
+# A Bitboards class that mirrors the pieces of a chessboard as bitboards, one for each piece of each color, one for each color and one for all.
+class Bitboards:
+    # An __init__ member function that gets called when a Bitboards instance is created. It creates the representation of the object.
+    def __init__(self, chessboard):
+        self.pieces = dict((color * pieceType, 0) for color in (piece.COLOR.WHITE, piece.COLOR.BLACK) for pieceType in xrange(1, len(piece.numToPiece)))
+        self.colors = {piece.COLOR.WHITE: 0, piece.COLOR.BLACK: 0}
+        self.occupied = 0
+
+        for r in xrange(SIZE):
+            for c in xrange(SIZE):
+                if chessboard.chessboard[r][c] is not None:
+                    self.place(r, c, chessboard.chessboard[r][c])
+
+    # A member function that adds a piece to a cell.
+    def place(self, r, c, chessPiece):
+        bit = 1 << (r * SIZE + c)
+        self.pieces[chessPiece.color * chessPiece.pieceType] |= bit
+        self.colors[chessPiece.color] |= bit
+        self.occupied |= bit
+
+    # A member function that removes a piece from a cell.
+    def remove(self, r, c, chessPiece):
+        bit = ~(1 << (r * SIZE + c))
+        self.pieces[chessPiece.color * chessPiece.pieceType] &= bit
+        self.colors[chessPiece.color] &= bit
+        self.occupied &= bit
+
+    # A member function that determines if a cell is occupied.
+    def isOccupied(self, r, c):
+        return self.occupied >> (r * SIZE + c) & 1 == 1
+
+    # A member function that returns the color of the piece occupying a cell. If unoccupied, it returns 0.
+    def cellColor(self, r, c):
+        i = r * SIZE + c
+        if self.colors[piece.COLOR.WHITE] >> i & 1:
+            return piece.COLOR.WHITE
+        elif self.colors[piece.COLOR.BLACK] >> i & 1:
+            return piece.COLOR.BLACK
+        return 0
+
+    # A member function that determines if any cell strictly between two cells on a common line is occupied.
+    def obstructed(self, r1, c1, r2, c2):
+        return BETWEEN[r1 * SIZE + c1][r2 * SIZE + c2] & self.occupied != 0
+
+
+def main():
+    print("Please run the Chess_by_Eric_Liu.pyde file to run the program.")
+
+
+if __name__ == "__main__":
+    main()
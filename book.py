@@ -0,0 +1,203 @@
+import os
+import sys
+import struct
+import random
+import piece
+import move
+import chessboard
+import polyglot
+
+try:
+    import mmap
+except ImportError:  # Jython has no mmap, so the book file is read an entry at a time instead.
+    mmap = None
+
+
+# A book file is a Polyglot book: a sequence of 16-byte entries sorted by key, each the Polyglot key of a position (8 bytes), a move played
+# from it (2), its weight (2) and a learning value that is not used (4), all big-endian. Any Polyglot book can be used, as well as the ones
+# made with createBook.
+ENTRY = struct.Struct(">QHHI")
+
+# The path of the book that the AI programs use, if it exists, and of the opening lines it is made from.
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "book.bin")
+LINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "openings.txt")
+
+# The piece types a move may promote to, indexed by their number in a Polyglot move.
+PROMOTIONS = [0, piece.PIECE.KNIGHT, piece.PIECE.BISHOP, piece.PIECE.ROOK, piece.PIECE.QUEEN]
+
+
+# A function that packs a move into a Polyglot move: the file and rank of the cell it goes to and of the cell it comes from, and the piece
+# type it promotes to. Files and ranks are counted from white's side, and castling is written as the king taking its own rook. The three bits
+# given to a file or rank limit books to chessboards of up to 8 by 8 cells.
+def encodeMove(board, move_):
+    r1, c1, r2, c2, moveType, promotion = move_
+    if moveType is move.Castling:
+        c2 = board.cols - 1 if c2 > c1 else 0
+
+    fromFile, fromRank = board.cellToPos(r1, c1)
+    toFile, toRank = board.cellToPos(r2, c2)
+
+    return PROMOTIONS.index(promotion) << 12 | (int(fromRank) - 1) << 9 | board.alpha.index(fromFile) << 6 | (int(toRank) - 1) << 3 | board.alpha.index(toFile)
+
+
+# A BookFile class that reads the entries of a book file. The file is memory-mapped where possible, so that only the pages that are looked
+# at are read, and it is otherwise read an entry at a time. Either way, it is never loaded as a whole.
+class BookFile:
+    # An __init__ member function that gets called when a BookFile instance is created. It creates the representation of the object.
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.size = os.path.getsize(path) // ENTRY.size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if mmap is not None and self.size else None
+
+    # A member function that returns the key, move, weight and learning value of an entry.
+    def readEntry(self, i):
+        if self.data is not None:
+            return ENTRY.unpack_from(self.data, i * ENTRY.size)
+
+        self.file.seek(i * ENTRY.size)
+        return ENTRY.unpack(self.file.read(ENTRY.size))
+
+    # A member function that returns the index of the first entry whose key is not less than a key, by binary search.
+    def findFirst(self, key):
+        low, high = 0, self.size
+
+        while low < high:
+            middle = (low + high) // 2
+            if self.readEntry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    # A member function that returns the Polyglot moves stored for a key, with their weights.
+    def getEntries(self, key):
+        entries = list()
+        i = self.findFirst(key)
+
+        while i < self.size:
+            entryKey, code, weight, learn = self.readEntry(i)
+            if entryKey != key:
+                break
+            entries.append((code, weight))
+            i += 1
+        return entries
+
+    # A member function that closes the file.
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+        self.file.close()
+
+
+# An OpeningBook class that gives the moves to play in the positions of a book file, so that the AI does not need to search them.
+class OpeningBook:
+    # An __init__ member function that gets called when an OpeningBook instance is created. It creates the representation of the object.
+    def __init__(self, path=DEFAULT_PATH, generator=None):
+        self.file = BookFile(path)
+        self.generator = generator or random.Random()
+
+    # A member function that returns the legal moves of a position that the book holds, each with its weight.
+    def getMoves(self, board):
+        if not polyglot.supports(board):
+            return list()
+
+        entries = self.file.getEntries(polyglot.getKey(board))
+        if not entries:
+            return list()
+
+        weights = dict(entries)
+        return [(move_, weights[encodeMove(board, move_)]) for move_ in board.getLegalMoves() if encodeMove(board, move_) in weights]
+
+    # A member function that picks a book move of a position at random, a move being as likely as its weight makes it, so that games vary.
+    # It returns None if the book holds no move for the position.
+    def chooseMove(self, board):
+        moves = [(move_, weight) for move_, weight in self.getMoves(board) if weight > 0]
+        if not moves:
+            return None
+
+        choice = self.generator.uniform(0, sum(weight for move_, weight in moves))
+        for move_, weight in moves:
+            choice -= weight
+            if choice < 0:
+                return move_
+        return moves[-1][0]
+
+    # A member function that closes the book file.
+    def close(self):
+        self.file.close()
+
+
+# A function that opens a book file, returning None if there is none, so that the AI programs play without a book.
+def openBook(path=DEFAULT_PATH):
+    return OpeningBook(path) if os.path.exists(path) else None
+
+
+# A function that writes a book file from (key, Polyglot move, weight) entries.
+def writeBook(path, entries):
+    with open(path, "wb") as bookFile:
+        for key, code, weight in sorted(entries):
+            bookFile.write(ENTRY.pack(key, code, min(weight, 0xFFFF), 0))
+
+
+# A function that creates a book file from opening lines, each a list of moves in coordinate notation as in "e2e4" or "e7e8q", played from
+# the starting position of a chessboard created by the given function. A move's weight is the number of lines that play it. It returns the
+# lines that have a move which is not legal, which are kept up to that move.
+def createBook(path, lines, createChessboard=chessboard.Chessboard):
+    weights = dict()
+    wrongLines = list()
+
+    for line in lines:
+        board = createChessboard()
+        for notation in line:
+            move_ = findMove(board, notation)
+            if move_ is None:
+                wrongLines.append(line)
+                break
+            key = polyglot.getKey(board), encodeMove(board, move_)
+            weights[key] = weights.get(key, 0) + 1
+            board.makeMove(*move_)
+
+    writeBook(path, [(key, code, weight) for (key, code), weight in weights.items()])
+    return wrongLines
+
+
+# A function that reads opening lines from a text file, one line of moves in coordinate notation per row. Rows that are empty or start with
+# a # are left out.
+def readLines(path=LINES_PATH):
+    with open(path) as linesFile:
+        return [row.split() for row in linesFile if row.strip() and not row.lstrip().startswith("#")]
+
+
+# A function that returns the legal move of a chessboard written in coordinate notation, or None if there is no such move.
+def findMove(board, notation):
+    r1, c1 = board.posToCell(notation[0], notation[1:2])
+    r2, c2 = board.posToCell(notation[2], notation[3:4])
+    promotion = piece.symbols.index(notation[4]) if len(notation) > 4 else 0
+
+    for move_ in board.getLegalMoves():
+        if move_[:4] == (r1, c1, r2, c2) and move_[5] == promotion:
+            return move_
+    return None
+
+
+def main():
+    # Usage: python book.py create [lines file] [book file]  or  python book.py show [FEN]
+    if len(sys.argv) > 1 and sys.argv[1] == "create":
+        linesPath = sys.argv[2] if len(sys.argv) > 2 else LINES_PATH
+        bookPath = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_PATH
+        lines = readLines(linesPath)
+        for line in createBook(bookPath, lines):
+            print("Not a legal line, kept up to the wrong move: %s" % " ".join(line))
+        print("%d lines written to %s (%d entries)" % (len(lines), bookPath, os.path.getsize(bookPath) // ENTRY.size))
+    elif len(sys.argv) > 1 and sys.argv[1] == "show":
+        board = chessboard.Chessboard.fromFEN(sys.argv[2]) if len(sys.argv) > 2 else chessboard.Chessboard()
+        openingBook = OpeningBook()
+        for move_, weight in sorted(openingBook.getMoves(board), key=lambda entry: -entry[1]):
+            print("%s %d" % ("".join(board.cellToPos(*move_[:2]) + board.cellToPos(*move_[2:4])) + piece.symbols[move_[5]], weight))
+        openingBook.close()
+    else:
+        print("Please run the Chess_by_Eric_Liu.pyde file to run the program, or make the opening book with: python book.py create [lines file] [book file]")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from Queue import Queue
 import chessboard
+import gameboard
 import variant
 import piece
 import widget
 import AI
+import timecontrol
+import engineconfig
 
 
 # A GUI enumeration class that holds the GUI state of the program.
@@ -19,11 +22,26 @@ class THEME:
     CLASSIC = "Classic"
 
 
+# An ENGINE enumeration class that holds the AI programs that can be played against.
+class ENGINE:
+    STOCKFISH = "Stockfish"
+    NATIVE = "Built-in"
+
+
+# A TIME_CONTROL enumeration class that holds the clocks a game can be played with, as the minutes of each player and the seconds they get
+# back after each move.
+class TIME_CONTROL:
+    NONE = None
+    BLITZ = (5, 3)
+    RAPID = (15, 10)
+
+
 # A Chess class that controls all the other classes in the program.
 class Chess:
     # An __init__ member function that gets called as the Chess instance is created. It creates the representation of the object.
     def __init__(self):
         self.resetVars()
+        AI.getStockfishPool(engineconfig.getProfile(self.settings["engineProfile"]))  # The Stockfish AI program is launched while the menu is shown, so that the first game does not wait for it.
         self.switchTo(GUI.MAIN)
         
     # A member function that resets the variables of the Chess instance.
@@ -39,6 +57,8 @@ class Chess:
         self.hasPopUp = False
         self.popUp = None
         self.AI = None
+        self.moveRequest = None  # The move the AI is thinking of, if it has been asked for one.
+        self.clock = None
         self.boardAngle = 0
         self.currentBoardAngle = 0
         self.resetSettings()
@@ -62,6 +82,10 @@ class Chess:
                 "variant": variant.Standard,
                 "color": piece.COLOR.BLACK,
                 "AI": False,
+                "engine": ENGINE.STOCKFISH,
+                "engineProfile": engineconfig.DEFAULT_PROFILE,  # The profile of data/engines.ini the Stockfish AI program is run with.
+                "timeControl": TIME_CONTROL.NONE,
+                "maxMoveTime": None,  # The longest the AI may think about a move, in seconds, whatever the clock.
                 "playAs": []
                 }
         
@@ -82,8 +106,10 @@ class Chess:
 
         self.addThemeChoicesToSettingsPopUp()
         self.addColorChoicesToSettingsPopUp()
-        if not self.settings["AI"]:  # Stockfish AI can only play in standard variant
-            self.addVariantChoicesToSettingsPopUp()
+        self.addVariantChoicesToSettingsPopUp()
+        self.addTimeControlChoicesToSettingsPopUp()
+        if self.settings["AI"]:
+            self.addEngineChoicesToSettingsPopUp()
         
     # A member function that adds theme choices to settings pop up.
     def addThemeChoicesToSettingsPopUp(self):
@@ -116,6 +142,29 @@ class Chess:
                            lambda var: self.settings.__setitem__("variant", var), lambda: self.settings["variant"], variant.Chess960, True),
                            ])
         
+    # A member function that adds engine choices to settings pop up. Stockfish AI can only play in standard variant, so the built-in engine
+    # plays the other variants whichever is chosen.
+    def addEngineChoicesToSettingsPopUp(self):
+        self.popUp.extend([
+                           widget.TXT(1.3 * self.xUnit, 6 * self.yUnit, "Engine: ", 0.45 * self.yUnit, color(255), False),
+                           widget.Choice(width / 2.0 - self.xUnit, 6 * self.yUnit, 1.9 * self.xUnit, self.yUnit, "Stockfish", 0.45 * self.yUnit, color(0), color(255), color(0), 5,
+                           lambda var: self.settings.__setitem__("engine", var), lambda: self.settings["engine"], ENGINE.STOCKFISH, True),
+                           widget.Choice(width / 2.0 + self.xUnit, 6 * self.yUnit, 1.9 * self.xUnit, self.yUnit, "Built-in", 0.45 * self.yUnit, color(0), color(255), color(0), 5,
+                           lambda var: self.settings.__setitem__("engine", var), lambda: self.settings["engine"], ENGINE.NATIVE, True),
+                           ])
+        
+    # A member function that adds time control choices to settings pop up.
+    def addTimeControlChoicesToSettingsPopUp(self):
+        self.popUp.extend([
+                           widget.TXT(self.xUnit, 7 * self.yUnit, "Clock: ", 0.45 * self.yUnit, color(255), False),
+                           widget.Choice(width / 2.0 - 2 * self.xUnit, 7 * self.yUnit, 1.9 * self.xUnit, 0.8 * self.yUnit, "None", 0.4 * self.yUnit, color(0), color(255), color(0), 5,
+                           lambda var: self.settings.__setitem__("timeControl", var), lambda: self.settings["timeControl"], TIME_CONTROL.NONE, True),
+                           widget.Choice(width / 2.0, 7 * self.yUnit, 1.9 * self.xUnit, 0.8 * self.yUnit, "5 + 3", 0.4 * self.yUnit, color(0), color(255), color(0), 5,
+                           lambda var: self.settings.__setitem__("timeControl", var), lambda: self.settings["timeControl"], TIME_CONTROL.BLITZ, True),
+                           widget.Choice(width / 2.0 + 2 * self.xUnit, 7 * self.yUnit, 1.9 * self.xUnit, 0.8 * self.yUnit, "15 + 10", 0.4 * self.yUnit, color(0), color(255), color(0), 5,
+                           lambda var: self.settings.__setitem__("timeControl", var), lambda: self.settings["timeControl"], TIME_CONTROL.RAPID, True),
+                           ])
+        
     # A member function that makes the popup disappear.
     def destroyPopUp(self):
         self.hasPopUp = False
@@ -175,7 +224,7 @@ class Chess:
     # A member function that creates the chessboard that will be displayed during the game.
     def createChessboard(self):
         dimension = min(self.xUnit * 8, self.yUnit * 8)
-        self.chessboard = chessboard.Chessboard(master=self, x=width / 2.0, y=height / 2.0, w=dimension, h=dimension, variant=self.settings["variant"], orientation=self.settings["color"])
+        self.chessboard = gameboard.GameChessboard(self, x=width / 2.0, y=height / 2.0, w=dimension, h=dimension, variant=self.settings["variant"], orientation=self.settings["color"])
     
     # A member function that gets the mouse location and adjusts accordingly depending on whether or not the board is rotated.
     def getBoardMouseLocation(self):
@@ -229,13 +278,19 @@ class Chess:
                 pass
             elif self.guiState == GUI.GAME:
                 mouseLocation = self.getBoardMouseLocation()
+                self.checkClock()
                 
                 if self.chessboard.turn not in self.settings["playAs"] and self.chessboard.result == chessboard.RESULT.UNDETERMINED:
                     if self.waitingTime == 0:  # This only true when the player is playing against AI.
-                        move = self.AI.getMove()
-                        initialCell = self.chessboard.posToCell(move[0], move[1])
-                        finalCell = self.chessboard.posToCell(move[2], move[3])
-                        self.chessboard.instantlyMakeMove(initialCell[0], initialCell[1], finalCell[0], finalCell[1])
+                        if self.moveRequest is None:  # The AI thinks in the background, and the move is only made once it has answered.
+                            self.moveRequest = self.AI.requestMove(self.clock)
+                        elif self.moveRequest.isDone():
+                            move = self.moveRequest.getMove()
+                            self.moveRequest = None
+                            if move is not None:  # There is no move if the AI program died while thinking, so it is asked again.
+                                initialCell = self.chessboard.posToCell(move[0], move[1])
+                                finalCell = self.chessboard.posToCell(move[2], move[3])
+                                self.chessboard.instantlyMakeMove(initialCell[0], initialCell[1], finalCell[0], finalCell[1])
                     else:
                         self.waitingTime = max(self.waitingTime - 1 / frameRate, 0)
                 
@@ -260,6 +315,7 @@ class Chess:
             background(255)
             self.chessboard.display()
             popMatrix()
+            self.displayClock()
             
         for widget in self.widgets:
             widget.display()
@@ -282,15 +338,24 @@ class Chess:
             self.importImages()
             self.createChessboard()
             
+            if self.settings["timeControl"] is not TIME_CONTROL.NONE:
+                minutes, increment = self.settings["timeControl"]
+                self.clock = timecontrol.Clock(60 * minutes, increment)
+            
             if self.settings["AI"]:
                 self.settings["playAs"] = {self.settings["color"]}
-                self.AI = AI.StockfishAI(self)
+                timeManager = timecontrol.TimeManager(maxMoveTime=self.settings["maxMoveTime"])
+                if self.settings["engine"] == ENGINE.STOCKFISH and self.settings["variant"] == variant.Standard:
+                    self.AI = AI.StockfishAI(self, timeManager, profile=engineconfig.getProfile(self.settings["engineProfile"]))
+                else:
+                    self.AI = AI.NativeAI(self, timeManager)
             else:
                 self.settings["playAs"] = {piece.COLOR.BLACK, piece.COLOR.WHITE}
                 
             self.drawingQueue.put(lambda: self.switchTo(GUI.GAME))
         elif guiState == GUI.GAME:
-            pass
+            if self.clock is not None:
+                self.clock.start(self.chessboard.turn)
             
         self.guiState = guiState
         
@@ -305,12 +370,42 @@ class Chess:
                 self.AI.quit()
             self.resetVars()
             
+    # A member function that stops the clock once the game is over, and ends the game once the player to move has run out of time.
+    def checkClock(self):
+        if self.clock is None or self.clock.running is None:
+            return
+        
+        if self.chessboard.result != chessboard.RESULT.UNDETERMINED:
+            self.clock.stop()
+        elif self.clock.hasFlagged(self.chessboard.turn):
+            self.clock.stop()
+            self.chessboard.result = -self.chessboard.turn
+            self.chessboard.createResultPopUp()
+            
+    # A member function that displays the time left to each player, the player at the bottom of the chessboard below it.
+    def displayClock(self):
+        if self.clock is None:
+            return
+        
+        pushStyle()
+        textSize(0.45 * self.yUnit)
+        for color_, y in ((-self.settings["color"], 0.5 * self.yUnit), (self.settings["color"], 9.5 * self.yUnit)):
+            if color_ == self.clock.running:
+                fill(200, 0, 0)
+            else:
+                fill(0)
+            text(self.clock.format(color_), width / 2.0, y)
+        popStyle()
+        
     # A member function that rotates the board.
     def rotate(self, delta):
         self.boardAngle = (self.boardAngle + delta) % TWO_PI
         
     # A member function that gets called after each move.
     def takeCareOfMove(self, record):
+        if self.clock is not None:
+            self.clock.press()
+        
         if self.settings["AI"]:  # If the player is playing against the AI, each move must be sent to the program.
             a1, n1 = self.chessboard.cellToPos(*record["from"])
             a2, n2 = self.chessboard.cellToPos(*record["to"])
@@ -1,9 +1,10 @@
 from copy import deepcopy
 import piece
 import move
+import bitboard
+import zobrist
+import bitbase
 import variant
-import chess
-import widget
 
 
 # A RESULT enumeration class that holds the possible results.
@@ -12,95 +13,179 @@ class RESULT:
     STALEMATE = 0
     WHITE = 1
     UNDETERMINED = 2
+    DRAW = 3  # A position a bitbase finds drawn, which neither player can win with the best play.
 
 
-# A Chessboard class that controls each pieces.
+# The piece types a pawn may be promoted to.
+promotions = [piece.PIECE.QUEEN, piece.PIECE.ROOK, piece.PIECE.BISHOP, piece.PIECE.KNIGHT]
+
+
+# A Legality class that holds the pieces checking and pinning a king, found by looking outward from the king once. A move of any other piece
+# than the king is legal if it resolves every check and keeps a pinned piece on its pin.
+class Legality:
+    # An __init__ member function that gets called when a Legality instance is created. It creates the representation of the object.
+    def __init__(self, chessboard, color, r, c):
+        self.kingCell = r, c
+        self.checkers = set()
+        self.evasions = set()  # The cells that block or capture the checking piece.
+        self.pins = dict()  # The cells that each pinned piece can move to while staying on its pin.
+        
+        self.findSlidingAttacks(chessboard, color, r, c)
+        self.findJumpingAttacks(chessboard, color, r, c)
+        
+    # A member function that walks each rank, file and diagonal from the king, finding the checks and pins by sliding pieces.
+    def findSlidingAttacks(self, chessboard, color, kingR, kingC):
+        for directions, slidingMove in ((chessboard.geometry.orthogonal, move.RankFile), (chessboard.geometry.diagonal, move.Diagonal)):
+            for direction in directions:
+                ray = list()
+                pinned = None
+                
+                for r, c in chessboard.geometry.rays[direction][kingR][kingC]:
+                    ray.append((r, c))
+                    chessPiece = chessboard.get(r, c)
+                    
+                    if chessPiece is not None:
+                        if chessPiece.color == color:
+                            if pinned is not None:  # Two pieces of the king's color shield the king.
+                                break
+                            pinned = r, c
+                        else:
+                            if slidingMove in chessPiece.moves:
+                                if pinned is None:
+                                    self.checkers.add((r, c))
+                                    self.evasions.update(ray)
+                                else:
+                                    self.pins[pinned] = set(ray)
+                            break
+                
+    # A member function that finds the checks by pieces that do not slide, which can only be evaded by capturing the checking piece.
+    def findJumpingAttacks(self, chessboard, color, kingR, kingC):
+        enemyForward = chessboard.orientation * color  # The forward direction of the enemy pieces.
+        
+        for moveType, cells in ((move.LJump, chessboard.geometry.knightCells[kingR][kingC]), (move.Adjacent, chessboard.geometry.kingCells[kingR][kingC]), \
+                                (move.ForwardDiagonal, chessboard.geometry.pawnCaptures[-enemyForward][kingR][kingC])):
+            for r, c in cells:
+                if chessboard.cellColor(r, c) == -color and moveType in chessboard.get(r, c).moves:
+                    self.checkers.add((r, c))
+                    self.evasions.add((r, c))
+                    
+    # A member function that determines if a piece other than the king can move from a cell to another without exposing the king.
+    def allows(self, r1, c1, r2, c2):
+        if self.checkers and (len(self.checkers) > 1 or (r2, c2) not in self.evasions):
+            return False
+        
+        return (r1, c1) not in self.pins or (r2, c2) in self.pins[r1, c1]
+
+
+# A Chessboard class that controls each pieces. It holds the rules of the game only, and so needs nothing from Processing: it is what perft,
+# the engines and the bitbases play on, and the chessboard of the game adds the display and the mouse to it.
 class Chessboard:
     # An __init__ member function that gets called when a Chessboard instance is created. It creates the representation of the object.
-    def __init__(self, master=None, x=0, y=0, w=0, h=0, orientation=1, variant=variant.Standard, copyFrom=None):
-        self.master = master
+    # A position in Forsyth-Edwards Notation may be given, which the chessboard is set up in instead of the starting position of the variant.
+    def __init__(self, orientation=1, variant=variant.Standard, fen=None):
         self.orientation = orientation
         self.variant = variant
         self.turn = piece.COLOR.WHITE
-        self.copyFrom = copyFrom
-        self.isTemporary = copyFrom is not None
         self.count = 1
+        self.alpha = "abcdefghijklmnopqrstuvwxyz"
+        self.result = RESULT.UNDETERMINED
+        self.isInCheck = False
         
-        self.createChessboard()
-        
-        if not self.isTemporary:  # If it is just created just to check if the move cause enemy check, there is no need to create unneccesarily member variables.
-            self.alpha = "abcdefghijklmnopqrstuvwxyz"
-            self.x = x
-            self.xL = x - w / 2.0
-            self.xR = x + w / 2.0
-            self.y = y
-            self.yU = y - h / 2.0
-            self.yD = y + h / 2.0
-            self.w = w
-            self.h = h
-            self.selected = None
-            self.highlighted = None
-            self.result = RESULT.UNDETERMINED
-            self.isInCheck = False
-            
-            self.calculateGeometry()
-            self.getColors()
-            self.checkResults()
+        self.createChessboard(fen)
+        if fen is not None:  # A position set up from Forsyth-Edwards Notation may have its side to move in check.
+            self.checkForCheck()
+        self.checkResults()
+        
+    # A static method that returns a chessboard set up in a position in Forsyth-Edwards Notation, without replaying the moves that led to it.
+    @staticmethod
+    def fromFEN(fen, variant=variant.Standard, orientation=1):
+        return Chessboard(orientation, variant, fen)
         
-    # A member function that creates the chessboard using the variant chosen by the user.
-    def createChessboard(self):
-        self.chessboard = self.variant.getChessboard(self) if not self.isTemporary else self.copyChessboard(self.copyFrom)
+    # A member function that creates the chessboard using the variant chosen by the user, in its starting position or in a position in
+    # Forsyth-Edwards Notation.
+    def createChessboard(self, fen=None):
         self.rows = self.variant.rows
         self.cols = self.variant.cols
+        self.geometry = self.variant.getGeometry()
+        self.history = list()
+        self.undoStack = list()
+        self.legality = dict()
+        self.startingHalfmoves = 0  # The halfmove clock of the position the chessboard was set up in.
+        if fen is None:
+            self.chessboard = self.variant.getChessboard(self)
+        else:
+            self.readFEN(fen)
+        self.bitboards = bitboard.Bitboards(self) if bitboard.supports(self.variant) else None
+        self.createAttackMaps()
+        self.createZobristKey()
+        
+    # A member function that creates the attack maps, which hold for every color and cell the pieces of the color attacking the cell. Each
+    # piece stands for a bit of an integer, so that adding and removing attackers are single operations. The maps are kept up to date by
+    # the moves instead of being rebuilt after each one.
+    def createAttackMaps(self):
+        self.attackers = dict((color, [[0] * self.cols for r in xrange(self.rows)]) for color in (piece.COLOR.WHITE, piece.COLOR.BLACK))
+        self.attackingPieces = list()  # The pieces indexed by their bit.
+        self.slidingBits = 0
         
-        self.vulnerabilityTable = [[False] * self.cols for r in xrange(self.rows)]
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                if self.chessboard[r][c] is not None:
+                    self.addAttacks(self.chessboard[r][c])
+        
+    # A member function that creates the Zobrist key of the position, which the moves then update incrementally.
+    def createZobristKey(self):
+        self.zobrist = zobrist.getKeys(self.rows, self.cols)
+        self.pieceKeys = self.zobrist.getPieceKeys(self.orientation)
+        self.enPassantKeys = self.zobrist.getEnPassantKeys(self.orientation)
+        self.castlingRights = self.getCastlingRights()
+        self.enPassantColumn = None
+        if self.history:  # A position set up from Forsyth-Edwards Notation may follow a pawn that has just moved two cells forward.
+            self.enPassantColumn = self.getEnPassantColumn(self.history[-1]["to"][0], self.history[-1]["to"][1], self.history[-1]["move"])
+        self.zobristKey = self.computeZobristKey()
+        
+    # A member function that computes the Zobrist key of the position from scratch.
+    def computeZobristKey(self):
+        key = self.zobrist.castling[self.castlingRights]
         
-        if not self.isTemporary:
-            self.alertTable = [[False] * self.cols for r in xrange(self.rows)]
-            self.hintTable = [[False] * self.cols for r in xrange(self.rows)]
-            self.effectTable = [[False] * self.cols for r in xrange(self.rows)]
-            self.history = list()
-
-    # A member function that returns a copy of the chessboard matrix.
-    def copyChessboard(self, other):
-        chessboard = [[None] * other.cols for r in xrange(other.rows)]
-
-        for r in xrange(other.rows):
-            for c in xrange(other.cols):
-                if other.isOccupied(r, c):
-                    chessboard[r][c] = piece.numToPiece[other.get(r, c).pieceType](self, other.cellColor(r, c), r, c, None) 
-
-        return chessboard
-        
-    # A member function that calculates the cell width and height of the chessboard.
-    def calculateGeometry(self):
-        self.cellWidth = float(self.w) / self.cols
-        self.cellHeight = float(self.h) / self.rows
-        
-    # A member function that creates the color representation based on the game's selected theme.
-    def getColors(self):
-        if self.master is not None:
-            if self.master.settings["theme"] == chess.THEME.CLASSIC:
-                self.color1 = color(153, 102, 51)
-                self.color2 = color(255, 204, 153)
-                self.borderColor = color(102, 51, 0)
-            elif self.master.settings["theme"] == chess.THEME.MODERN:
-                self.color1 = color(255,255,240)
-                self.color2 = color(105)
-                self.borderColor = color(0)
-        
-    # A member frunction that converts from mouse coordinates to the cell row and column.
-    def coordToCell(self, x, y):  # Here, (0, 0) is the top left of the chessboard.
-        r = int(float(y - self.yU) / self.h * self.rows)
-        c = int(float(x - self.xL) / self.w * self.cols)
-        return r, c
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                if self.chessboard[r][c] is not None:
+                    key ^= self.pieceKeys[self.chessboard[r][c].color * self.chessboard[r][c].pieceType][r][c]
+        if self.turn == piece.COLOR.BLACK:
+            key ^= self.zobrist.side
+        if self.enPassantColumn is not None:
+            key ^= self.enPassantKeys[self.enPassantColumn]
+            
+        return key
     
-    # A member function that converts from the cell row and column to mouse coordinates.
-    def cellToCoord(self, r, c):  # Here, (0, 0) is the top left of the chessboard. 
-        x = (c + 0.5) * self.cellWidth + self.xL
-        y = (r + 0.5) * self.cellHeight + self.yU
-        return x, y
+    # A member function that returns the castling rights of the position. A side may castle with a rook that has never moved, standing in a
+    # corner of the row of its king, which has never moved either.
+    def getCastlingRights(self):
+        rights = 0
+        
+        for color, kingside, queenside in ((piece.COLOR.WHITE, zobrist.WHITE_KINGSIDE, zobrist.WHITE_QUEENSIDE), \
+                                           (piece.COLOR.BLACK, zobrist.BLACK_KINGSIDE, zobrist.BLACK_QUEENSIDE)):
+            kingCell = self.getKingCell(color)
+            if kingCell is None or not self.get(*kingCell).neverMoved or kingCell[1] not in (3, 4):
+                continue
+            
+            for right, c in ((kingside, self.cols - 1 if self.orientation == 1 else 0), (queenside, 0 if self.orientation == 1 else self.cols - 1)):
+                rook = self.get(kingCell[0], c)
+                if rook is not None and rook.color == color and rook.pieceType == piece.PIECE.ROOK and rook.neverMoved:
+                    rights |= right
+                    
+        return rights
     
+    # A member function that returns the column of a pawn that has just moved two cells forward next to a pawn of the other color, which may
+    # capture it en passant. It returns None otherwise.
+    def getEnPassantColumn(self, r, c, moveType):
+        if moveType is move.DoubleForward:
+            for c2 in (c - 1, c + 1):
+                if 0 <= c2 < self.cols and self.chessboard[r][c2] is not None and self.chessboard[r][c2].color == -self.chessboard[r][c].color and \
+                     self.chessboard[r][c2].pieceType == piece.PIECE.PAWN:
+                    return c
+        return None
+        
     # A member function that converts from cell row and column to chess position notation.
     def cellToPos(self, r, c):
         if self.orientation == 1:
@@ -116,24 +201,144 @@ class Chessboard:
         else:
             return n - 1, self.cols - self.alpha.index(a) - 1
         
-    # A member function that determines if the chessboard contains the passed coordinates.
-    def containsCoord(self, x, y):
-        return self.xL <= x < self.xR and self.yU <= y < self.yD
+    # A member function that sets up the chessboard in a position in Forsyth-Edwards Notation: its pieces, the side to move, the castling
+    # rights, the cell passed over by a pawn that has just moved two cells forward and the move counters. The castling rights may be written
+    # as KQkq, as the files of the rooks (Shredder-FEN) or as both (X-FEN), as Chess960 positions are. The rules only castle with a rook in a
+    # corner, so a right to castle with any other rook is dropped.
+    def readFEN(self, fen):
+        fields = fen.split()
+        rows = fields[0].split("/") if fields else []
+        if len(fields) < 4 or len(rows) != self.rows or fields[1] not in ("w", "b"):
+            raise ValueError("%s is not a position in Forsyth-Edwards Notation for a %dx%d chessboard" % (fen, self.rows, self.cols))
+        
+        self.chessboard = [[None] * self.cols for r in xrange(self.rows)]
+        kings = dict()  # The cells of the kings, indexed by their color.
+        for n, row in zip(xrange(self.rows, 0, -1), rows):
+            file_, empty = 0, ""
+            for symbol in row + "/":
+                if symbol.isdigit():
+                    empty += symbol
+                    continue
+                file_ += int(empty or 0)
+                empty = ""
+                if symbol == "/":
+                    break
+                if symbol.lower() not in piece.symbols[1:] or file_ >= self.cols:
+                    raise ValueError("%s is not a valid row of the position %s" % (row, fen))
+                
+                r, c = self.posToCell(self.alpha[file_], n)
+                chessPiece = piece.numToPiece[piece.symbols.index(symbol.lower())](self, piece.COLOR.WHITE if symbol.isupper() else piece.COLOR.BLACK, r, c)
+                chessPiece.neverMoved = chessPiece.pieceType == piece.PIECE.PAWN and bool(self.geometry.pawnDoublePushes[chessPiece.forward][r][c])
+                self.chessboard[r][c] = chessPiece
+                if chessPiece.pieceType == piece.PIECE.KING:
+                    kings[chessPiece.color] = r, c
+                file_ += 1
+            if file_ != self.cols:
+                raise ValueError("%s is not a valid row of the position %s" % (row, fen))
+        
+        self.turn = piece.COLOR.WHITE if fields[1] == "w" else piece.COLOR.BLACK
+        self.startingHalfmoves = int(fields[4]) if len(fields) > 4 else 0
+        fullmoves = int(fields[5]) if len(fields) > 5 else 1
+        self.count = 2 * fullmoves - (1 if self.turn == piece.COLOR.WHITE else 0)
+        
+        for symbol in fields[2].strip("-"):
+            color = piece.COLOR.WHITE if symbol.isupper() else piece.COLOR.BLACK
+            if color not in kings or symbol.lower() not in "kq" + self.alpha[:self.cols]:
+                raise ValueError("%s is not a valid castling right of the position %s" % (symbol, fen))
+            
+            kingR, kingC = kings[color]
+            kingFile, n = self.cellToPos(kingR, kingC)
+            files = [self.cellToPos(kingR, c)[0] for c in xrange(self.cols) if self.chessboard[kingR][c] is not None and \
+                     self.chessboard[kingR][c].color * self.chessboard[kingR][c].pieceType == color * piece.PIECE.ROOK]
+            if symbol.lower() == "k":  # The outermost rook on the side of the king, as X-FEN reads it.
+                files = [max(files)] if files and max(files) > kingFile else []
+            elif symbol.lower() == "q":
+                files = [min(files)] if files and min(files) < kingFile else []
+            else:
+                files = [symbol.lower()] if symbol.lower() in files else []
+            
+            for a in files:
+                r, c = self.posToCell(a, n)
+                self.chessboard[r][c].neverMoved = self.chessboard[kingR][kingC].neverMoved = True
+        
+        if fields[3] != "-":  # The pawn is recorded as having just moved, which is what allows it to be captured en passant.
+            r, c = self.posToCell(fields[3][0], fields[3][1:]) if fields[3][0] in self.alpha[:self.cols] and fields[3][1:].isdigit() else (-1, -1)
+            pawns = [self.chessboard[r + forward][c] for forward in (1, -1) if 0 <= r + forward < self.rows and 0 <= c < self.cols and \
+                     self.chessboard[r + forward][c] is not None and self.chessboard[r + forward][c].pieceType == piece.PIECE.PAWN and \
+                     self.chessboard[r + forward][c].color == -self.turn and self.chessboard[r + forward][c].forward == forward]
+            if not pawns:
+                raise ValueError("%s is not a valid en passant cell of the position %s" % (fields[3], fen))
+            
+            pawns[0].lastMoved = self.count - 1
+            self.history.append({
+                    "from": (r - pawns[0].forward, c),
+                    "to": (pawns[0].r, c),
+                    "move": move.DoubleForward,
+                    "chessPiece": pawns[0],
+                    "captured": None
+                    })
     
+    # A member function that returns the position in Forsyth-Edwards Notation, from the top row as seen by white to the move counters. The
+    # castling rights are written as KQkq, which X-FEN reads as the rooks in the corners, or as the files of the rooks for Shredder-FEN.
+    def toFEN(self, shredder=False):
+        rows = list()
+        for n in xrange(self.rows, 0, -1):
+            row, empty = "", 0
+            for a in self.alpha[:self.cols]:
+                chessPiece = self.get(*self.posToCell(a, n))
+                if chessPiece is None:
+                    empty += 1
+                    continue
+                symbol = piece.symbols[chessPiece.pieceType]
+                row += (str(empty) if empty else "") + (symbol.upper() if chessPiece.color == piece.COLOR.WHITE else symbol)
+                empty = 0
+            rows.append(row + (str(empty) if empty else ""))
+
+        castling = ""
+        for bit, color, symbol, file_ in ((zobrist.WHITE_KINGSIDE, piece.COLOR.WHITE, "k", self.cols - 1), (zobrist.WHITE_QUEENSIDE, piece.COLOR.WHITE, "q", 0), \
+                                          (zobrist.BLACK_KINGSIDE, piece.COLOR.BLACK, "k", self.cols - 1), (zobrist.BLACK_QUEENSIDE, piece.COLOR.BLACK, "q", 0)):
+            if self.castlingRights & bit:
+                if shredder:  # The file of the rook in the corner.
+                    symbol = self.alpha[file_]
+                castling += symbol.upper() if color == piece.COLOR.WHITE else symbol
+        enPassant = "-"
+        if self.enPassantColumn is not None:  # The cell passed over by the pawn that has just moved two cells forward.
+            (r1, _), (r2, c2) = self.history[-1]["from"], self.history[-1]["to"]
+            enPassant = "".join(self.cellToPos((r1 + r2) // 2, c2))
+
+        return " ".join(["/".join(rows), "w" if self.turn == piece.COLOR.WHITE else "b", castling or "-", enPassant, str(self.getHalfmoveClock()), \
+                         str((self.count + 1) // 2)])
+
+    # A member function that returns the number of moves made since the last capture or pawn move, counting those made before the position the
+    # chessboard was set up in.
+    def getHalfmoveClock(self):
+        halfmoves = 0
+        for record in reversed(self.history):
+            if record["captured"] is not None or record["chessPiece"].pieceType == piece.PIECE.PAWN:
+                return halfmoves
+            halfmoves += 1
+        return halfmoves + self.startingHalfmoves
+
     # A member function that determines of the chessboard contains a cell.
     def containsCell(self, r, c):
         return self.variant.isValidPosition(r, c)
     
     # A member function that determines if a cell in the chessboard is occupied by a piece.
     def isOccupied(self, r, c):
+        if self.bitboards is not None:
+            return self.bitboards.isOccupied(r, c)
         return self.chessboard[r][c] is not None    
     
     # A member function that determines if a cell in the chessboard is empty (unoccupied by any piece).
     def isEmpty(self, r, c):
+        if self.bitboards is not None:
+            return not self.bitboards.isOccupied(r, c)
         return self.chessboard[r][c] is None
     
     # A member function that returns the color of the piece occupying a particular cell. If unoccupied, it returns 0.
     def cellColor(self, r, c):
+        if self.bitboards is not None:
+            return self.bitboards.cellColor(r, c)
         return 0 if self.chessboard[r][c] is None else self.chessboard[r][c].color
         
     # A member function that gets the piece from a cell of the chessboard.
@@ -142,10 +347,22 @@ class Chessboard:
         
     # A member function that sets a cell to a piece value in a chessboard.
     def set(self, r, c, piece):
+        if self.chessboard[r][c] is not None:
+            self.zobristKey ^= self.pieceKeys[self.chessboard[r][c].color * self.chessboard[r][c].pieceType][r][c]
+            if self.bitboards is not None:
+                self.bitboards.remove(r, c, self.chessboard[r][c])
+        if piece is not None:
+            self.zobristKey ^= self.pieceKeys[piece.color * piece.pieceType][r][c]
+            if self.bitboards is not None:
+                self.bitboards.place(r, c, piece)
+                
         self.chessboard[r][c] = piece
         
     # A member function that, based on the first and second location, determines of a path is obstructed or not
     def obstructed(self, r1, c1, r2, c2):
+        if self.bitboards is not None:
+            return self.bitboards.obstructed(r1, c1, r2, c2)
+        
         if r1 == r2:
             step = 1 if c1 < c2 else -1
             
@@ -170,200 +387,263 @@ class Chessboard:
         
         return False
     
-    # A member function that clears the table that flags all the cells that can be attacked.
-    def clearVulnerabilityTable(self):
-        for r in xrange(self.rows):
-            for c in xrange(self.cols):
-                self.vulnerabilityTable[r][c] = False
+    # A member function that returns the cell of a piece of a color attacking a cell, or None if the cell is not attacked.
+    def getSquareAttacker(self, r, c, byColor):
+        attackers = self.attackers[byColor][r][c]
+        
+        if attackers:
+            attacker = self.attackingPieces[(attackers & -attackers).bit_length() - 1]
+            return attacker.r, attacker.c
+        return None
+    
+    # A member function that returns the pieces of a color attacking a cell.
+    def getAttackers(self, r, c, byColor):
+        attackers = list()
+        mask = self.attackers[byColor][r][c]
+        
+        while mask:
+            attackers.append(self.attackingPieces[(mask & -mask).bit_length() - 1])
+            mask &= mask - 1
+        return attackers
+    
+    # A member function that determines if a cell is attacked by any piece of a color.
+    def isSquareAttacked(self, r, c, byColor):
+        return self.attackers[byColor][r][c] != 0
+    
+    # A member function that determines if a king can step to an adjacent cell without being attacked there. Besides the attack maps, a
+    # sliding piece checking the king still attacks the cell right behind the king, which the king itself hides from it.
+    def isSafeForKing(self, king, r, c):
+        if self.attackers[-king.color][r][c]:
+            return False
+        
+        sliders = self.attackers[-king.color][king.r][king.c] & self.slidingBits
+        while sliders:
+            slider = self.attackingPieces[(sliders & -sliders).bit_length() - 1]
+            sliders &= sliders - 1
+            dr, dc = king.r - slider.r, king.c - slider.c
+            distance = max(abs(dr), abs(dc))
+            if (dr == 0 or dc == 0 or abs(dr) == abs(dc)) and (r - king.r) * distance == dr and (c - king.c) * distance == dc:
+                return False
+        return True
+    
+    # A member function that adds the cells attacked by a piece to the attack maps. A piece entering them for the first time is given its bit.
+    def addAttacks(self, chessPiece):
+        if not chessPiece.bit:
+            chessPiece.bit = 1 << len(self.attackingPieces)
+            self.attackingPieces.append(chessPiece)
+            if chessPiece.slides:
+                self.slidingBits |= chessPiece.bit
+        
+        chessPiece.attacks = self.getAttackedCells(chessPiece)
+        attackers = self.attackers[chessPiece.color]
+        
+        for r, c in chessPiece.attacks:
+            attackers[r][c] |= chessPiece.bit
+            
+    # A member function that takes the cells attacked by a piece out of the attack maps.
+    def removeAttacks(self, chessPiece):
+        attackers = self.attackers[chessPiece.color]
+        mask = ~chessPiece.bit
+        
+        for r, c in chessPiece.attacks:
+            attackers[r][c] &= mask
+        chessPiece.attacks = None
+        
+    # A member function that returns the cells attacked by a piece, whatever occupies them.
+    def getAttackedCells(self, chessPiece):
+        cells = list()
+        
+        for moveType in chessPiece.moves:
+            if moveType.isCheckable:
+                cells.extend(moveType.getAttackedCells(self, chessPiece))
+        return cells
+    
+    # A member function that takes out of the attack maps the pieces whose attacks change when the content of some cells changes, and returns
+    # them. These are the pieces on the cells and the sliding pieces attacking the cells, whose rays may get longer or shorter.
+    def detachAttacks(self, cells):
+        detached = list()
+        
+        for r, c in cells:
+            if self.chessboard[r][c] is not None and self.chessboard[r][c].attacks is not None:
+                detached.append(self.chessboard[r][c])
+                self.removeAttacks(self.chessboard[r][c])
                 
-    # A member function that caches the next positions of all possible pieces.
-    def cacheNextPositions(self, disregardCheck=False):
-        for r in xrange(self.rows):
-            for c in xrange(self.cols):
-                if self.chessboard[r][c] is not None:
-                    self.chessboard[r][c].cacheNextPositions(disregardCheck)
-                    
-        for r in xrange(self.rows):
-            for c in xrange(self.cols):
-                if self.isOccupied(r, c) and self.chessboard[r][c].color == self.turn:
-                    for nextPosition in self.chessboard[r][c].getNextPositions():
-                        if self.chessboard[r][c].nextPositions[nextPosition].isCheckable:
-                            self.vulnerabilityTable[nextPosition[0]][nextPosition[1]] = True
+            sliders = (self.attackers[piece.COLOR.WHITE][r][c] | self.attackers[piece.COLOR.BLACK][r][c]) & self.slidingBits
+            while sliders:
+                slider = self.attackingPieces[(sliders & -sliders).bit_length() - 1]
+                sliders &= sliders - 1
+                detached.append(slider)
+                self.removeAttacks(slider)
+        return detached
+    
+    # A member function that puts back into the attack maps the pieces taken out by detachAttacks, except for those no longer on the chessboard.
+    def attachAttacks(self, pieces):
+        for chessPiece in pieces:
+            if chessPiece.attacks is None and self.chessboard[chessPiece.r][chessPiece.c] is chessPiece:
+                self.addAttacks(chessPiece)
                     
     # A member function that finds the cell occupied by a King piece of a particular color.
     def getKingCell(self, color):
+        if self.bitboards is not None:
+            kings = self.bitboards.pieces[color * piece.PIECE.KING]
+            return bitboard.CELL_OF_BIT[kings & -kings] if kings else None
+        
         for r in xrange(self.rows):
             for c in xrange(self.cols):
                 if self.isOccupied(r, c) and self.cellColor(r, c) * self.chessboard[r][c].pieceType == color * piece.PIECE.KING:
                     return r, c
         return None
     
-    # A member function that determines if a cell is vulnerable or not (can be attacked).
+    # A member function that determines if the king of a color is attacked. A color without a king is never in check.
+    def isKingInCheck(self, color):
+        kingCell = self.getKingCell(color)
+        return kingCell is not None and self.isSquareAttacked(kingCell[0], kingCell[1], -color)
+    
+    # A member function that determines if a color has any piece left on the chessboard.
+    def hasPieces(self, color):
+        if self.bitboards is not None:
+            return self.bitboards.colors[color] != 0
+        return any(chessPiece is not None and chessPiece.color == color for row in self.chessboard for chessPiece in row)
+    
+    # A member function that determines if the position has occurred before with the same player to move, which is read from the Zobrist
+    # keys saved for taking back the moves.
+    def isRepetition(self):
+        for i in xrange(len(self.undoStack) - 2, -1, -2):
+            if self.undoStack[i][5] == self.zobristKey:
+                return True
+        return False
+    
+    # A member function that returns the pins and checks against the king of a color, which are found once per position. It returns None
+    # if the color has no king, in which case every move is legal.
+    def getLegality(self, color):
+        if color not in self.legality:
+            kingCell = self.getKingCell(color)
+            self.legality[color] = Legality(self, color, *kingCell) if kingCell is not None else None
+            
+        return self.legality[color]
+    
+    # A member function that determines if a cell is vulnerable or not (can be attacked by the player to move).
     def isVulnerable(self, r, c):
-        return self.vulnerabilityTable[r][c]
-                    
-    # A member function that returns a copy the chessboard object.
-    def copy(self):
-        newBoard = Chessboard(orientation=self.orientation, variant=self.variant, copyFrom=self)
-        newBoard.turn = self.turn
-        newBoard.count = self.count
-        return newBoard
-        
-    # A member function that displays the chessboard.
-    def display(self):
-        pushMatrix()
-        pushStyle()
-        self.displayFrame()
-        self.displayCells()
-        self.displayPieces()
-        self.displayAlerts()
-        self.displayEffects()
-        self.displayHints()
-        self.displayHighlight()
-        popStyle()
-        popMatrix()
-        
-    # A member function that displays the frame of the chessboard.
-    def displayFrame(self):
-        fill(self.borderColor)
-        stroke(self.borderColor)
-        strokeWeight(50)
-        rect(self.x, self.y, self.w, self.h)
-        
-    # A member function that displays all the individual cells of the chessboard.
-    def displayCells(self):
-        strokeWeight(0)
-        
-        for r in xrange(self.rows):
-            for c in xrange(self.rows):
-                if r + c & 1:
-                    fill(self.color1)
-                    stroke(self.color1)
-                else:
-                    fill(self.color2)
-                    stroke(self.color2)
-                
-                coord = self.cellToCoord(r, c)
-                
-                rect(coord[0], coord[1], self.cellWidth, self.cellHeight)
-                
-    # A member function that displays all the pieces on the board.
-    def displayPieces(self):
-        for r in xrange(self.rows):
-            for c in xrange(self.cols):
-                if self.isOccupied(r, c):
-                    self.get(r, c).display()
+        return self.attackers[self.turn][r][c] != 0
                     
-    # A member function that displays the alerted cells on the board.
-    def displayAlerts(self):
-        strokeWeight(0)
+    # A member function that returns a copy of the chessboard object, which can be played on without affecting it. The tables that chessboards
+    # of the same size share, the geometry and the Zobrist keys, are never changed by a move, and so are shared by the copy rather than copied.
+    def copy(self, memo=None):
+        memo = dict() if memo is None else memo
+        for table in (self.geometry, self.zobrist, self.pieceKeys, self.enPassantKeys):
+            memo[id(table)] = table
+        return deepcopy(self, memo)
+        
+    # A member function that makes a move in place, without updating the game. Everything that the move changes is recorded so that it can
+    # be restored by unmakeMove, which makes trying out a move cost a few assignments instead of a copy of the chessboard.
+    def makeMove(self, r1, c1, r2, c2, moveType, promotion=0):
+        chessPiece = self.chessboard[r1][c1]
+        affectedCells = moveType.getAffectedCells(self, chessPiece, r2, c2)
+        cells = [(r, c, self.chessboard[r][c]) for r, c in affectedCells]
+        pieces = [(cell[2], cell[2].r, cell[2].c, cell[2].neverMoved, cell[2].lastMoved) for cell in cells if cell[2] is not None]
+        self.undoStack.append((cells, pieces, self.turn, self.count, self.legality, self.zobristKey, self.castlingRights, self.enPassantColumn))
+        self.legality = dict()
+        
+        self.zobristKey ^= self.zobrist.side ^ self.zobrist.castling[self.castlingRights]
+        if self.enPassantColumn is not None:
+            self.zobristKey ^= self.enPassantKeys[self.enPassantColumn]
+        
+        self.history.append({
+                "from": (r1, c1),
+                "to": (r2, c2),
+                "move": moveType,
+                "chessPiece": chessPiece,
+                "captured": self.chessboard[r2][c2]
+                })
+        
+        detached = self.detachAttacks(affectedCells)
+        chessPiece.lastMoved = self.count
+        moveType.makeMove(self, chessPiece, r2, c2)
+        chessPiece.neverMoved = False
+        self.attachAttacks(detached)
+        
+        if promotion:
+            self.promote(r2, c2, promotion)
+            
+        for movedPiece, r, c, neverMoved, lastMoved in pieces:  # Only the first move of a king or rook, or its capture, changes the castling rights.
+            if neverMoved and movedPiece.pieceType in (piece.PIECE.KING, piece.PIECE.ROOK):
+                self.castlingRights = self.getCastlingRights()
+                break
+        self.enPassantColumn = self.getEnPassantColumn(r2, c2, moveType)
         
-        for r in xrange(self.rows):
-            for c in xrange(self.cols):
-                if self.alertTable[r][c]:
-                    self.alertTable[r][c] = max(100, self.alertTable[r][c] - 255 / frameRate)
-                    
-                    fill(255, 0, 0, self.alertTable[r][c])
-                    stroke(255, 0, 0, self.alertTable[r][c])
-                    x, y = self.cellToCoord(r, c)
-                    rect(x, y, self.cellWidth, self.cellHeight)
+        self.zobristKey ^= self.zobrist.castling[self.castlingRights]
+        if self.enPassantColumn is not None:
+            self.zobristKey ^= self.enPassantKeys[self.enPassantColumn]
         
-    # A member function that displays the possible moves of a selected piece. It does not display anything if no piece is selected.
-    def displayHints(self):
-        fill(0, 255, 0, 100)
-        stroke(0, 255, 0, 100)
-        strokeWeight(0)
+        self.turn *= -1
+        self.count += 1
         
-        for r in xrange(self.rows):
-            for c in xrange(self.cols):
-                if self.hintTable[r][c]:
-                    x, y = self.cellToCoord(r, c)
-                    rect(x, y, self.cellWidth, self.cellHeight)
+    # A member function that takes back the last move made by makeMove.
+    def unmakeMove(self):
+        cells, pieces, self.turn, self.count, self.legality, zobristKey, self.castlingRights, self.enPassantColumn = self.undoStack.pop()
+        self.history.pop()
+        detached = self.detachAttacks([(r, c) for r, c, chessPiece in cells])
         
-    # A member function that displays the board's effects.
-    def displayEffects(self):
-        strokeWeight(0)
-
-        for r in xrange(self.rows):
-            for c in xrange(self.cols):
-                if self.effectTable[r][c]:
-                    self.effectTable[r][c] = max(0, self.effectTable[r][c] - 255 / frameRate)
-                    fill(0, 0, 255, self.effectTable[r][c])
-                    stroke(0, 0, 255, self.effectTable[r][c])
-                    
-                    x, y = self.cellToCoord(r, c)
-                    rect(x, y, self.cellWidth, self.cellHeight)
-                    
-    # A member function that displays the highlight a highlighted cell on the board.
-    def displayHighlight(self):
-        if self.highlighted is not None:
-            x, y = self.cellToCoord(*self.highlighted)
-            fill(1, 50)
-            stroke(1, 50)
-            noStroke()
-            rect(x, y, self.cellWidth, self.cellHeight)
-                    
-    # A member function that selects a cell for highlighting.
-    def highlight(self, r, c):
-        self.highlighted = r, c
+        for r, c, chessPiece in cells:
+            self.set(r, c, chessPiece)
+            
+        for chessPiece, r, c, neverMoved, lastMoved in pieces:
+            chessPiece.r = r
+            chessPiece.c = c
+            chessPiece.neverMoved = neverMoved
+            chessPiece.lastMoved = lastMoved
+            
+        self.attachAttacks(detached + [chessPiece for chessPiece, r, c, neverMoved, lastMoved in pieces])
+        self.zobristKey = zobristKey
+        
+    # A member function that replaces a pawn by a piece of another type, without updating the game.
+    def promote(self, r, c, pieceType):
+        pawn = self.chessboard[r][c]
+        newChessPiece = piece.numToPiece[pieceType](self, pawn.color, r, c)
+        newChessPiece.neverMoved = False
+        newChessPiece.lastMoved = pawn.lastMoved
+        
+        if pawn.attacks is not None:
+            self.removeAttacks(pawn)
+        self.set(r, c, newChessPiece)
+        self.addAttacks(newChessPiece)
+        
+    # A member function that promotes a pawn once the move that brought it to the last row has been made, and updates the game.
+    def changePiece(self, r, c, pieceType):
+        self.promote(r, c, pieceType)
+        self.checkForCheck()
+        self.deleteCache()
+        self.checkResults()
+        
+    # A member function that determines if a piece moving to a cell gets promoted.
+    def isPromotion(self, chessPiece, r):
+        return chessPiece.pieceType == piece.PIECE.PAWN and r == (0 if chessPiece.forward == -1 else self.rows - 1)
+        
+    # A member function that returns all the legal moves of the player to move, as (r1, c1, r2, c2, moveType, promotion) tuples that can
+    # be passed to makeMove. A move reaching the last row is listed once for every piece type it can be promoted to. If only captures and
+    # promotions are asked for, the other moves are left out before their legality is checked.
+    def getLegalMoves(self, capturesOnly=False):
+        moves = list()
         
-    # A member function that deselects a highlighted cell.
-    def dehighlight(self):
-        self.highlighted = None
-    
-    # A member function that clears all the alerts on the board.
-    def clearAlerts(self):
         for r in xrange(self.rows):
             for c in xrange(self.cols):
-                self.alertTable[r][c] = False
-                
-    # A member function that clears the hints (possible next moves) on the board.
-    def clearHints(self):
-        for r in xrange(self.rows):
-            for c in xrange(self.cols):
-                self.hintTable[r][c] = False
-                
-    # A member function that creates an effect on a cell.
-    def createEffect(self, r, c):
-        self.effectTable[r][c] = 255
-    
-    # A member function that creates an alert on a cell.
-    def createAlert(self, r, c):
-        self.alertTable[r][c] = 255
-      
-    # A member function that selects a cell. If the cell is occupied, its possible next moves are marked in the hintTable member variable.
-    def select(self, r, c):
-        self.clearHints()
-        
-        if self.cellColor(r, c) == self.turn and (r, c) != self.selected:
-            self.selected = r, c
-    
-            if self.isOccupied(r, c):
-                nextPositions = self.get(r, c).getNextPositions()
-                
-                for r, c in nextPositions:
-                    self.hintTable[r][c] = True
-        else:
-            self.selected = None
-
-    # A member function that makes a move in the chesstable.
-    def makeMove(self, r, c):
-        self.recordMove(r, c)
-        self.get(*self.selected).lastMoved = self.count
-        self.get(*self.selected).move(r, c)
-        self.update()
-        
-    # A member function that records a move in the history member variable.
-    def recordMove(self, r, c):
-        record = {
-                "from": self.selected,
-                "to": (r, c),
-                "move": self.get(*self.selected).nextPositions[r, c],
-                "chessPiece": self.get(*self.selected),
-                "captured": self.get(r, c)
-                }
-        
-        self.history.append(record)
+                if self.cellColor(r, c) == self.turn:
+                    chessPiece = self.chessboard[r][c]
+                    for moveType in chessPiece.moves:
+                        if capturesOnly:
+                            nextPositions = [(r2, c2) for r2, c2 in moveType.getNextPositions(self, chessPiece, True) \
+                                             if (self.cellColor(r2, c2) == -self.turn or moveType is move.EnPassant or self.isPromotion(chessPiece, r2)) and \
+                                             not moveType.causeEnemyCheck(self, chessPiece, (r2, c2))]
+                        else:
+                            nextPositions = moveType.getNextPositions(self, chessPiece)
+                            
+                        for r2, c2 in nextPositions:
+                            if self.isPromotion(chessPiece, r2):
+                                moves.extend((r, c, r2, c2, moveType, promotion) for promotion in promotions)
+                            else:
+                                moves.append((r, c, r2, c2, moveType, 0))
+        
+        return moves
         
     # A member function that updates all the pieces on the chessboard.
     def updatePieces(self):
@@ -374,29 +654,22 @@ class Chessboard:
 
     # A member function that updates the chessboard. This is called after each move.
     def update(self):
-        self.clearVulnerabilityTable()
-        self.turn *= -1
-        
-        if not self.isTemporary:
-            self.deleteCache()
-            self.clearAlerts()
-            self.clearHints()
-            self.count += 1
-            self.updatePieces()
-            self.checkForCheck()
-            self.checkResults()
-            self.master.takeCareOfMove(self.history[-1])
+        self.deleteCache()
+        self.updatePieces()
+        self.checkForCheck()
+        self.checkResults()
             
-    # A member function that checks if a king is in check.
+    # A member function that checks if the king of the player to move is in check. It returns the cells of the king and of a piece checking
+    # it if so, and None otherwise.
     def checkForCheck(self):
         self.isInCheck = False
         kingCell = self.getKingCell(self.turn)
         if kingCell is not None:
-            checkingPieceCell = self.get(*kingCell).isInCheck()
+            checkingPieceCell = self.getSquareAttacker(kingCell[0], kingCell[1], -self.turn)
             if checkingPieceCell is not None:
-                self.createAlert(*kingCell)
-                self.createAlert(*checkingPieceCell)
                 self.isInCheck = True
+                return kingCell, checkingPieceCell
+        return None
         
     # A member function that counts the pieces of each color.
     def getChessPieceCount(self):
@@ -428,24 +701,9 @@ class Chessboard:
                 self.result = -self.turn
             elif hasNoValidMove:
                 self.result = RESULT.STALEMATE
-            
-        if self.result != RESULT.UNDETERMINED:
-            self.createResultPopUp()
-            
-    # A member function that creates a pop up notifying that the game is over and displaying the results.
-    def createResultPopUp(self):
-        if self.result == RESULT.BLACK:
-            heading = "Black Wins!"
-        elif self.result == RESULT.WHITE:
-            heading = "White Wins!"
-        else:
-            heading = "Stalemate"
-        
-        self.master.createPopUp([widget.Rect(width / 2.0, height / 2.0, width, height, color(1, 200), color(1, 200), 0, False), \
-                    widget.TXT(width / 2.0, self.master.yUnit * 2, heading, 1 * self.master.yUnit, color(255), False), \
-                    widget.Button(width / 2.0, height / 2.0, 5 * self.master.xUnit, 1.5 * self.master.yUnit, "Return to Menu", 0.7 * self.master.yUnit, color(0), \
-                                color(255, 200), color(0), 5, lambda: self.master.destroyPopUp() or self.master.switchTo(chess.GUI.MAIN), True)])
-            
+            elif bitbase.probe(self) == bitbase.WDL.DRAW:
+                self.result = RESULT.DRAW
+
     # A member function that returns if it a player is able to make a move.
     def canMakeMove(self):
         for r in xrange(self.rows):
@@ -457,26 +715,12 @@ class Chessboard:
     
     # A member function that deletes all the cached moves.
     def deleteCache(self):
+        self.legality = dict()
+        
         for r in xrange(self.rows):
             for c in xrange(self.cols):
                 if self.isOccupied(r, c):
                     self.get(r, c).deleteCache()
-    
-    # A member function that invokes different member function based on the coordinates where the action occurred (as in mouse being pressed).
-    def actionAtCoord(self, x, y, status):
-        if self.result != RESULT.UNDETERMINED: return
-
-        r, c = self.coordToCell(x, y)
-        
-        if self.hintTable[r][c]:
-            self.makeMove(r, c)
-        elif status:
-            self.select(r, c)
-    
-    # A member function that instantly selects a piece
-    def instantlyMakeMove(self, r1, c1, r2, c2):
-        self.select(r1, c1)
-        self.makeMove(r2, c2)
 
 
 def main():
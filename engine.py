@@ -0,0 +1,384 @@
+import sys
+import time
+import piece
+import transposition
+import ordering
+import exchange
+import bitbase
+import perft
+
+
+# Scores are in centipawns, from the point of view of the player to move. A checkmate scores MATE less the number of plies it takes, so
+# that a quicker one is preferred, and every score from a checkmate is further than MATE_BOUND from zero.
+MATE = 30000
+MATE_BOUND = MATE - 1000
+INFINITY = 32000
+
+# The bonus for each cell a piece of a type is away from the edge of the chessboard, indexed by piece type. The king stays away from the centre.
+CENTRALITY = [0, -10, 4, 8, 12, 2, 4]
+PAWN_ADVANCE = 8  # The bonus for each row a pawn has advanced.
+
+# The score of a position a bitbase finds won, to which its progress towards checkmate is added. It is above any material advantage and
+# below every checkmate score.
+KNOWN_WIN = 10000
+
+ASPIRATION_WINDOW = 50
+NODES_BETWEEN_CHECKS = 16  # How often the search looks at the clock, which costs far less than a node, so that it stops soon after its time.
+
+
+# A function that returns the tables of the positional bonus of each piece type on each cell of a chessboard, indexed by piece type, forward
+# direction, row and column. They are built once for each size.
+def getPositionalTables(rows, cols):
+    if (rows, cols) not in positionalTables:
+        tables = [None] * len(piece.numToPiece)
+        for pieceType in xrange(1, len(piece.numToPiece)):
+            tables[pieceType] = dict()
+            for forward in (1, -1):
+                startRow = 1 if forward == 1 else rows - 2
+                tables[pieceType][forward] = [[CENTRALITY[pieceType] * min(r, rows - 1 - r, c, cols - 1 - c) + \
+                                               (PAWN_ADVANCE * max(0, (r - startRow) * forward) if pieceType == piece.PIECE.PAWN else 0) \
+                                               for c in xrange(cols)] for r in xrange(rows)]
+        positionalTables[rows, cols] = tables
+
+    return positionalTables[rows, cols]
+
+
+# A dictionary of the positional tables that have been built, indexed by the number of rows and columns.
+positionalTables = dict()
+
+
+# A function that evaluates a position from the point of view of the player to move, by counting material and the positional bonuses.
+def evaluate(board):
+    tables = getPositionalTables(board.rows, board.cols)
+    score = 0
+
+    for row in board.chessboard:
+        for chessPiece in row:
+            if chessPiece is not None:
+                score += chessPiece.color * (chessPiece.value + tables[chessPiece.pieceType][chessPiece.forward][chessPiece.r][chessPiece.c])
+
+    return score * board.turn
+
+
+# A function that returns the score of a position whose player to move has no legal move, at a number of plies from the root. As in
+# Chessboard.checkResults, a player without pieces or whose king is in check has lost, and the game is otherwise drawn by stalemate.
+def getTerminalScore(board, ply):
+    if board.isKingInCheck(board.turn) or not board.hasPieces(board.turn):
+        return -MATE + ply
+    return 0
+
+
+# A function that returns the score of a position a bitbase finds won or lost for the player to move. The score grows as the lone king is
+# driven towards the edge, as the winning king comes closer to it and as material is won, so that the search makes progress.
+def getKnownWinScore(board, outcome):
+    winner = board.turn * outcome
+    winningKing, losingKing = board.getKingCell(winner), board.getKingCell(-winner)
+    edge = min(losingKing[0], board.rows - 1 - losingKing[0], losingKing[1], board.cols - 1 - losingKing[1])
+    distance = max(abs(winningKing[0] - losingKing[0]), abs(winningKing[1] - losingKing[1]))
+
+    return outcome * (KNOWN_WIN + 20 * (3 - edge) - 10 * distance) + evaluate(board)
+
+
+# A function that turns a score relative to a node into a score relative to the position stored in the transposition table, so that a
+# checkmate is stored as a number of plies from where it is found rather than from the root of the search.
+def scoreToTable(score, ply):
+    if score > MATE_BOUND:
+        return score + ply
+    elif score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+# A function that does the opposite of scoreToTable.
+def scoreFromTable(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    elif score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+# An Engine class that searches the positions of a chessboard with the project's own rules, so that it plays every variant. It deepens an
+# alpha-beta search one ply at a time until its time or node budget runs out, and plays the best move of the deepest completed search. A
+# position found in its opening book, if it has one, is played from the book without a search.
+class Engine:
+    # An __init__ member function that gets called when an Engine instance is created. It creates the representation of the object.
+    def __init__(self, megabytes=16, maxTime=1.0, maxNodes=None, maxDepth=64, book=None):
+        self.table = transposition.TranspositionTable(megabytes)
+        self.orderer = ordering.MoveOrderer()
+        self.book = book
+        self.maxTime = maxTime
+        self.maxNodes = maxNodes
+        self.maxDepth = maxDepth
+        self.resetSearch()
+
+    # A member function that resets what is known about the last search. The time budget is counted from the given start time, if any.
+    def resetSearch(self, startTime=None):
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        self.bestMove = None
+        self.stopped = False
+        self.startTime = startTime if startTime is not None else time.time()
+
+    # A member function that returns the best move of the player to move, as a (r1, c1, r2, c2, moveType, promotion) tuple, or None if the
+    # player has no legal move. The chessboard is searched in place and left as it was.
+    def search(self, board):
+        self.resetSearch()
+        if self.book is not None:
+            self.bestMove = self.book.chooseMove(board)
+            if self.bestMove is not None:
+                return self.bestMove
+
+        self.table.newSearch()
+        self.orderer.newSearch()
+
+        moves = board.getLegalMoves()
+        if not moves:
+            return None
+        self.bestMove = moves[0]
+
+        for depth in xrange(1, self.maxDepth + 1):
+            score, bestMove = self.searchWithAspiration(board, moves, depth)
+            if self.stopped:
+                if self.depth == 0 and score > -INFINITY:  # The first iteration ran out of time, so the best of the moves it searched is played.
+                    self.bestMove = bestMove
+                break
+
+            self.depth = depth
+            self.score = score
+            self.bestMove = bestMove
+            moves.remove(bestMove)
+            moves.insert(0, bestMove)  # The best move is searched first in the next iteration.
+
+            if abs(score) > MATE_BOUND or self.isOutOfBudget(True):
+                break
+
+        return self.bestMove
+
+    # A member function that searches the root at a depth inside a narrow window around the score of the previous depth, which cuts off
+    # more of the tree. If the score falls outside the window, the root is searched again with the full window.
+    def searchWithAspiration(self, board, moves, depth):
+        if depth >= 3 and abs(self.score) < MATE_BOUND:
+            alpha, beta = self.score - ASPIRATION_WINDOW, self.score + ASPIRATION_WINDOW
+            score, bestMove = self.searchRoot(board, moves, depth, alpha, beta)
+            if self.stopped or alpha < score < beta:
+                return score, bestMove
+
+        return self.searchRoot(board, moves, depth, -INFINITY, INFINITY)
+
+    # A member function that searches every root move to a depth and returns the best score and move.
+    def searchRoot(self, board, moves, depth, alpha, beta):
+        originalAlpha = alpha
+        bestScore, bestMove = -INFINITY, moves[0]
+
+        for i, move_ in enumerate(moves):
+            board.makeMove(*move_)
+            if i == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+            else:
+                score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, 1)
+                if alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+            board.unmakeMove()
+
+            if self.stopped:
+                break
+            if score > bestScore:
+                bestScore, bestMove = score, move_
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if not self.stopped:
+            self.storeResult(board, depth, bestScore, beta, originalAlpha, bestMove, 0)
+        return bestScore, bestMove
+
+    # A member function that returns the score of a position searched to a depth, using principal variation search: the first move is
+    # searched with the full window, and the others only to show that they are worse, unless they turn out not to be.
+    def negamax(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % NODES_BETWEEN_CHECKS == 0 and self.isOutOfBudget():
+            self.stopped = True
+        if self.stopped:
+            return 0
+
+        if board.isRepetition():
+            return 0
+        if ply > 0 and bitbase.probe(board) == bitbase.WDL.DRAW:
+            return 0
+
+        originalAlpha = alpha
+        tableMove = transposition.NO_MOVE
+        entry = self.table.probe(board.zobristKey)
+        if entry is not None:
+            entryDepth, bound, entryScore, tableMove = entry
+            entryScore = scoreFromTable(entryScore, ply)
+            if entryDepth >= depth and (bound == transposition.BOUND.EXACT or (bound == transposition.BOUND.LOWER and entryScore >= beta) or \
+                                        (bound == transposition.BOUND.UPPER and entryScore <= alpha)):
+                return entryScore
+
+        if depth <= 0:
+            return self.quiescence(board, alpha, beta, ply)
+        moves = board.getLegalMoves()
+        if not moves:
+            return getTerminalScore(board, ply)
+
+        self.orderer.orderMoves(board, moves, tableMove, ply)
+        bestScore, bestMove = -INFINITY, None
+
+        for i, move_ in enumerate(moves):
+            board.makeMove(*move_)
+            if i == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmakeMove()
+
+            if self.stopped:
+                return 0
+            if score > bestScore:
+                bestScore, bestMove = score, move_
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self.orderer.recordCutoff(board, move_, depth, ply, i)
+                break
+
+        self.storeResult(board, depth, bestScore, beta, originalAlpha, bestMove, ply)
+        return bestScore
+
+    # A member function that returns the score of a position once its captures and promotions are played out, so that the search does not
+    # stop in the middle of an exchange. The player to move may stand pat on the evaluation instead, unless in check, where every move is
+    # searched. Captures that lose material by static exchange evaluation are not searched. A position a bitbase covers stands pat on its
+    # exact result instead of the evaluation.
+    def quiescence(self, board, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % NODES_BETWEEN_CHECKS == 0 and self.isOutOfBudget():
+            self.stopped = True
+        if self.stopped:
+            return 0
+
+        inCheck = board.isKingInCheck(board.turn)
+        if inCheck:
+            bestScore = -INFINITY
+            moves = board.getLegalMoves()
+            if not moves:
+                return getTerminalScore(board, ply)
+        else:
+            outcome = bitbase.probe(board)
+            if outcome == bitbase.WDL.DRAW:
+                return 0
+
+            bestScore = evaluate(board) if outcome is None else getKnownWinScore(board, outcome)
+            if bestScore >= beta:
+                return bestScore
+            alpha = max(alpha, bestScore)
+            moves = board.getLegalMoves(True)
+
+        self.orderer.orderMoves(board, moves, transposition.NO_MOVE, ply)
+
+        for move_ in moves:
+            if not inCheck and not move_[5] and exchange.getStaticExchange(board, *move_) < 0:
+                continue
+
+            board.makeMove(*move_)
+            score = -self.quiescence(board, -beta, -alpha, ply + 1)
+            board.unmakeMove()
+
+            if self.stopped:
+                return 0
+            if score > bestScore:
+                bestScore = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        return bestScore
+
+    # A member function that stores the result of searching a position in the transposition table, with the bound given by the window.
+    def storeResult(self, board, depth, score, beta, originalAlpha, bestMove, ply):
+        if score >= beta:
+            bound = transposition.BOUND.LOWER
+        elif score <= originalAlpha:
+            bound = transposition.BOUND.UPPER
+        else:
+            bound = transposition.BOUND.EXACT
+
+        self.table.store(board.zobristKey, depth, bound, scoreToTable(score, ply), self.encodeMove(board, bestMove))
+
+    # A member function that packs a move for the transposition table.
+    def encodeMove(self, board, move_):
+        if move_ is None:
+            return transposition.NO_MOVE
+        return transposition.encodeMove(move_[0], move_[1], move_[2], move_[3], move_[5], board.cols)
+
+    # A member function that determines if the search has used up its budget. An iteration may only start if it is likely to finish, which
+    # is taken to be when no more than half of the time is used. The whole time is a hard limit, which stops even the first iteration, as an
+    # answer must never take longer than that; there is always a legal move to play, if not a searched one.
+    def isOutOfBudget(self, beforeIteration=False):
+        if self.maxNodes is not None and self.nodes >= self.maxNodes:
+            return True
+        return self.maxTime is not None and time.time() - self.startTime >= (self.maxTime / 2.0 if beforeIteration else self.maxTime)
+
+    # A member function that returns the moves the search expects to be played from a position, read from the transposition table.
+    def getPrincipalVariation(self, board, maxLength=None):
+        variation = list()
+
+        while maxLength is None or len(variation) < maxLength:
+            entry = self.table.probe(board.zobristKey)
+            if entry is None or entry[3] == transposition.NO_MOVE or board.isRepetition():
+                break
+
+            found = [move_ for move_ in board.getLegalMoves() if self.encodeMove(board, move_) == entry[3]]
+            if not found:
+                break
+            variation.append(found[0])
+            board.makeMove(*found[0])
+
+        for move_ in variation:
+            board.unmakeMove()
+        return variation
+
+
+# A function that searches every reference position of perft to a fixed depth, each with a new engine so that the results can be compared
+# from one run to the next, then reports the nodes searched, the speed and how well the moves were sorted: the share of the cutoffs made by
+# the first move searched, which is high when few moves are searched before one is good enough. It also reports how the transposition table
+# was used: the share of its probes that found their position, and how full it is, which stays within its fixed size however long the search.
+def benchmark(depth=4, out=sys.stdout):
+    totalNodes = 0
+    totalTime = 0.0
+
+    for name, variant_, expected in perft.positions:
+        searcher = Engine(maxTime=None, maxDepth=depth)
+        board = perft.createChessboard(variant_)
+        start = time.time()
+        searcher.search(board)
+        elapsed = time.time() - start
+
+        totalNodes += searcher.nodes
+        totalTime += elapsed
+        out.write("%-12s depth %d: %8d nodes %8.3f s %8.0f nps  first-move cutoffs %5.1f%%\n" % (name, searcher.depth, searcher.nodes, elapsed,
+                  searcher.nodes / max(elapsed, 1e-9), 100 * searcher.orderer.getFirstMoveCutoffRate()))
+        statistics = searcher.table.getStatistics()
+        out.write("%-12s table: %8d probes %5.1f%% hits %8d stores %8d replacements %7.3f%% of %d entries (%d MB) filled\n" % ("",
+                  statistics["probes"], 100 * statistics["hitRate"], statistics["stores"], statistics["replacements"], 100 * statistics["fillRate"],
+                  statistics["entries"], statistics["megabytes"]))
+
+    out.write("Total: %d nodes in %.3f s (%.0f nps)\n" % (totalNodes, totalTime, totalNodes / max(totalTime, 1e-9)))
+
+
+def main():
+    # Usage: python engine.py bench [depth]
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+    else:
+        print("Please run the Chess_by_Eric_Liu.pyde file to run the program, or benchmark the engine with: python engine.py bench [depth]")
+
+
+if __name__ == "__main__":
+    main()
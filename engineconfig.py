@@ -0,0 +1,120 @@
+import os
+import sys
+import time
+from Queue import Empty
+try:
+    from ConfigParser import RawConfigParser
+except ImportError:
+    from configparser import RawConfigParser
+import enginepool
+
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))  # The folder of the program, which relative paths in the configuration start from.
+CONFIG_PATH = os.path.join(DIRECTORY, "data", "engines.ini")
+DEFAULT_PROFILE = "Default"
+DEFAULT_ENGINE = os.path.join("data", "stockfish_9_x64.exe")
+
+# The UCI options a profile may set, as their keys in the configuration file and their names in the program.
+OPTIONS = [("threads", "Threads"), ("hash", "Hash"), ("multipv", "MultiPV"), ("skill level", "Skill Level")]
+
+# The positions every profile is benchmarked on, from the opening to the endgame.
+BENCH_POSITIONS = ["rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                   "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                   "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP2BPPP/R2QKB1R w KQ - 0 8",
+                   "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"]
+BENCH_TIME = 2.0  # How long each position is searched, in seconds.
+
+
+# A Profile class that holds how a UCI program is run: the file it is launched from and the options it is given.
+class Profile:
+    # An __init__ member function that gets called as the Profile instance is created. It creates the representation of the object.
+    def __init__(self, name, path=DEFAULT_ENGINE, options=None):
+        self.name = name
+        self.path = os.path.normpath(os.path.join(DIRECTORY, path))
+        self.options = options or []  # The options as pairs of their names and values, in the order they are set.
+
+
+# A function that reads the profiles of a configuration file, in the order they are written. Each section of the file is a profile, which
+# may give the path of its program, relative to the folder of the program or not, and any of the options. Without the file, there is only the
+# default profile, which runs the Stockfish AI program in the data folder with its own defaults.
+def loadProfiles(path=CONFIG_PATH):
+    parser = RawConfigParser()
+    parser.read(path)
+
+    profiles = []
+    for section in parser.sections():
+        enginePath = parser.get(section, "path") if parser.has_option(section, "path") else DEFAULT_ENGINE
+        options = [(name, parser.get(section, key)) for key, name in OPTIONS if parser.has_option(section, key)]
+        profiles.append(Profile(section, enginePath, options))
+
+    return profiles or [Profile(DEFAULT_PROFILE)]
+
+
+# A function that returns the profile of a name from a configuration file.
+def getProfile(name=DEFAULT_PROFILE, path=CONFIG_PATH):
+    for profile in loadProfiles(path):
+        if profile.name == name:
+            return profile
+    raise ValueError("there is no engine profile named %s in %s" % (name, path))
+
+
+# A function that measures how fast the program of a profile searches with its options, by having it search each position for a while, and
+# returns the nodes it searched and the seconds it took. A program that dies or does not finish a search in time fails the bench.
+def bench(profile, positions=BENCH_POSITIONS, moveTime=BENCH_TIME):
+    process = enginepool.EngineProcess(profile.path)
+    if not process.isReady(enginepool.STARTUP_TIMEOUT):
+        process.quit()
+        raise RuntimeError("the engine at %s does not answer" % profile.path)
+
+    process.setOptions(profile.options)
+    process.isReady(enginepool.STARTUP_TIMEOUT)  # A bigger hash table takes a while to be made.
+
+    nodes = 0
+    seconds = 0.0
+    for fen in positions:
+        process.clearLines()
+        process.send("ucinewgame", "position fen " + fen, "go movetime %d" % (1000 * moveTime))
+        start = time.time()
+        deadline = start + moveTime + enginepool.HEALTH_CHECK_TIMEOUT
+        searched = 0
+        try:
+            line = process.lines.get(True, max(0, deadline - time.time()))
+            while not line.startswith("bestmove"):
+                words = line.split()
+                if "nodes" in words:
+                    searched = int(words[words.index("nodes") + 1])
+                line = process.lines.get(True, max(0, deadline - time.time()))
+        except Empty:
+            process.quit()
+            raise RuntimeError("the engine at %s did not finish searching %s in time" % (profile.path, fen))
+
+        nodes += searched
+        seconds += time.time() - start
+
+    process.quit()
+    return nodes, seconds
+
+
+def main():
+    # Usage: python engineconfig.py bench [profile ...]
+    if len(sys.argv) < 2 or sys.argv[1] != "bench":
+        print("Please run the Chess_by_Eric_Liu.pyde file to run the program, or bench the engine profiles with: python engineconfig.py bench [profile ...]")
+        return
+
+    profiles = loadProfiles()
+    if len(sys.argv) > 2:
+        profiles = [getProfile(name) for name in sys.argv[2:]]
+
+    for profile in profiles:
+        try:
+            nodes, seconds = bench(profile)
+        except (OSError, RuntimeError) as error:
+            print("%-12s could not be run: %s" % (profile.name, error))
+            continue
+
+        options = ", ".join("%s %s" % option for option in profile.options) or "defaults"
+        print("%-12s %12d nodes %8.3f s %10d nps   (%s)" % (profile.name, nodes, seconds, nodes / seconds, options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import atexit
+import time
+import threading
+from collections import deque
+from subprocess import Popen, PIPE
+from Queue import Queue, Empty
+
+
+# Times are in seconds.
+POOL_SIZE = 1  # How many processes are launched ahead of the first game, so that it needs no handshake.
+MAX_PROCESSES = 4  # How many processes may run at once, however many games are being played.
+STARTUP_TIMEOUT = 10.0  # How long a process may take to answer its first handshake.
+HEALTH_CHECK_TIMEOUT = 2.0  # How long a running process may take to answer a health check.
+
+
+# An EngineProcess class that runs a UCI program and reads what it prints in its own thread. A best move completes the request of the oldest
+# search, and any other line is queued for whoever waits for it. A search that was stopped still answers, which completes a request nobody
+# waits for; if the program dies, the searches it owes are completed with no move.
+class EngineProcess:
+    # An __init__ member function that gets called as the EngineProcess instance is created. It creates the representation of the object.
+    def __init__(self, path):
+        self.path = path
+        self.process = Popen(path, stdin=PIPE, stdout=PIPE)
+        self.lines = Queue()  # The lines printed by the program, other than its best moves.
+        self.searches = deque()  # The requests of the searches the program has been told to start, in order, each waiting for a best move.
+        self.writing = threading.Lock()  # A search may be stopped from a timer thread while the game sends commands.
+        self.options = dict()  # The options that have been set, which last from one game to the next.
+        self.unanswered = 0  # The health checks that timed out, whose answers may still come.
+        self.reader = threading.Thread(target=self.readOutput)
+        self.reader.daemon = True
+        self.reader.start()
+
+    # A member function that sends commands to the program. A program that has died cannot be written to, which is left to the health check.
+    def send(self, *commands):
+        with self.writing:
+            try:
+                self.process.stdin.write("".join(command + "\r\n" for command in commands))
+                self.process.stdin.flush()
+            except (IOError, OSError, ValueError):
+                pass
+
+    # A member function that sets options, given as pairs of their names and values. Only those that have changed are sent, as some, like the
+    # size of the hash table, take a while to be set.
+    def setOptions(self, options):
+        for name, value in options:
+            if self.options.get(name) != str(value):
+                self.send("setoption name %s value %s" % (name, value))
+                self.options[name] = str(value)
+
+    # A member function that reads what the program prints until it quits.
+    def readOutput(self):
+        for line in iter(self.process.stdout.readline, ""):
+            if line.startswith("bestmove") and self.searches:
+                words = line.split()
+                request = self.searches.popleft()
+                request.ponder = words[3] if len(words) > 3 and words[2] == "ponder" else None
+                request.complete(words[1])
+            else:
+                self.lines.put(line)
+
+        while self.searches:
+            self.searches.popleft().complete(None)
+
+    # A member function that waits until the program prints a line containing a text, and returns the line, or None if the program has not
+    # printed it in time. The lines printed before it are read and left out, and the time allowed is for the whole wait, however many of
+    # them there are.
+    def waitFor(self, text, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        try:
+            line = self.lines.get(True, None if deadline is None else max(0, deadline - time.time()))
+            while text not in line:
+                line = self.lines.get(True, None if deadline is None else max(0, deadline - time.time()))
+        except Empty:
+            return None
+        return line
+
+    # A member function that discards the lines that nobody has read, so that they are not taken for the answer to the next command.
+    def clearLines(self):
+        try:
+            while True:
+                if "readyok" in self.lines.get_nowait():
+                    self.unanswered = max(0, self.unanswered - 1)
+        except Empty:
+            pass
+
+    # A member function that determines if the program is still running.
+    def isAlive(self):
+        return self.process.poll() is None
+
+    # A member function that determines if the program is running and answers in time, once it has finished whatever it was doing. The
+    # answers to earlier checks that timed out come first, so they are skipped rather than taken for the answer to this one.
+    def isReady(self, timeout=HEALTH_CHECK_TIMEOUT):
+        if not self.isAlive():
+            return False
+
+        self.clearLines()
+        self.send("isready")
+        deadline = time.time() + timeout
+        while self.waitFor("readyok", deadline - time.time()) is not None:
+            if not self.unanswered:
+                return True
+            self.unanswered -= 1
+
+        self.unanswered += 1
+        return False
+
+    # A member function that readies the program for a new game: any search is stopped and the program forgets the last game.
+    def newGame(self):
+        self.send("stop", "ucinewgame")
+        return self.isReady()
+
+    # A member function that quits the program, killing it if it does not quit in time.
+    def quit(self):
+        self.send("stop", "quit")
+        self.reader.join(HEALTH_CHECK_TIMEOUT)
+        if self.isAlive():
+            self.process.kill()
+        self.process.wait()
+
+
+# An EnginePool class that keeps UCI programs running between games, so that a game starts without launching one. A game borrows a process
+# and gives it back once over, when it is readied for the next game. Every process is checked before it is lent, and one that has died or
+# does not answer is replaced. Games that are played at once each get their own process, up to a limit, after which a game waits for one to
+# be given back.
+class EnginePool:
+    # An __init__ member function that gets called as the EnginePool instance is created. It creates the representation of the object.
+    def __init__(self, path, size=POOL_SIZE, limit=MAX_PROCESSES):
+        self.path = path
+        self.size = size
+        self.limit = limit
+        self.idle = []  # The processes that are ready for a game.
+        self.count = 0  # How many processes are running or being launched, whether idle or lent.
+        self.closed = False
+        self.condition = threading.Condition()
+
+    # A member function that launches processes in the background until the pool has enough of them ready for the next games.
+    def warm(self):
+        warmer = threading.Thread(target=self.fill)
+        warmer.daemon = True
+        warmer.start()
+
+    # A member function that launches processes until the pool has enough of them ready.
+    def fill(self):
+        while True:
+            with self.condition:
+                if self.closed or len(self.idle) >= self.size or self.count >= self.limit:
+                    return
+                self.count += 1
+
+            process = self.launch()
+            with self.condition:
+                if process is None:
+                    self.count -= 1
+                    return
+                self.idle.append(process)
+                self.condition.notify()
+
+    # A member function that launches a process and waits for its handshake, and returns it, or None if it could not be launched or does
+    # not answer.
+    def launch(self):
+        try:
+            process = EngineProcess(self.path)
+        except (IOError, OSError):
+            return None
+
+        if not process.isReady(STARTUP_TIMEOUT):
+            process.quit()
+            return None
+        return process
+
+    # A member function that lends a process to a game. An idle process is lent if there is a healthy one; otherwise, one is launched if the
+    # limit allows, or the game waits for one to be given back.
+    def acquire(self):
+        while True:
+            with self.condition:
+                while not self.idle and self.count >= self.limit and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    raise RuntimeError("the engine pool has been closed")
+
+                if self.idle:
+                    process = self.idle.pop()
+                else:
+                    process = None
+                    self.count += 1
+
+            if process is None:
+                process = self.launch()
+                if process is None:
+                    with self.condition:
+                        self.count -= 1
+                        self.condition.notify()
+                    raise RuntimeError("the engine at %s could not be launched" % self.path)
+                return process
+
+            if process.isReady():
+                return process
+            self.discard(process)
+
+    # A member function that takes back a process once its game is over, readying it for the next game, or replacing it if it has died.
+    def release(self, process):
+        if process.newGame():
+            with self.condition:
+                if not self.closed:
+                    self.idle.append(process)
+                    self.condition.notify()
+                    return
+            process.quit()
+            with self.condition:
+                self.count -= 1
+        else:
+            self.discard(process)
+            self.warm()
+
+    # A member function that replaces a process that has died during a game with a new one, which the game keeps.
+    def restart(self, process):
+        self.discard(process)
+        return self.acquire()
+
+    # A member function that quits a process and removes it from the pool.
+    def discard(self, process):
+        process.quit()
+        with self.condition:
+            self.count -= 1
+            self.condition.notify()
+
+    # A member function that quits every idle process, and has every lent one quit once it is given back.
+    def close(self):
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.count -= len(idle)
+            self.condition.notifyAll()
+
+        for process in idle:
+            process.quit()
+
+
+# A dictionary of the engine pools that have been created, indexed by the path of the program they run.
+pools = dict()
+
+
+# A function that returns the pool of the processes of a program, creating it and launching its first processes the first time it is needed.
+def getPool(path):
+    if path not in pools:
+        pools[path] = EnginePool(path)
+        pools[path].warm()
+
+    return pools[path]
+
+
+# A function that closes every pool, which is done when the program exits, so that no process is left running.
+def closePools():
+    for pool in pools.values():
+        pool.close()
+
+
+atexit.register(closePools)
+
+
+def main():
+    print("Please run the Chess_by_Eric_Liu.pyde file to run the program.")
+
+
+if __name__ == "__main__":
+    main()
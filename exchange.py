@@ -0,0 +1,85 @@
+import piece
+import move
+
+
+# What the king is worth when trading pieces: it captures last, as it is the one piece that may not be lost.
+KING_VALUE = 20000
+
+
+# A function that returns what a piece is worth when trading pieces.
+def getExchangeValue(chessPiece):
+    return KING_VALUE if chessPiece.pieceType == piece.PIECE.KING else chessPiece.value
+
+
+# A function that returns the piece captured by a move, or None if the move captures nothing.
+def getCapturedPiece(board, r1, c1, r2, c2, moveType):
+    if moveType is move.EnPassant:
+        return board.get(r1, c2)
+    return board.get(r2, c2)
+
+
+# A function that returns the sliding piece that attacks a cell through another cell once the piece on that cell has left, or None if there
+# is none. The cells in the removed set count as empty.
+def getHiddenAttacker(board, r, c, r2, c2, removed):
+    dr, dc = r2 - r, c2 - c
+    if not (dr == 0 or dc == 0 or abs(dr) == abs(dc)):
+        return None
+
+    direction = (dr > 0) - (dr < 0), (dc > 0) - (dc < 0)
+    slidingMove = move.RankFile if 0 in direction else move.Diagonal
+
+    for r3, c3 in board.geometry.rays[direction][r2][c2]:
+        if board.isOccupied(r3, c3) and (r3, c3) not in removed:
+            chessPiece = board.get(r3, c3)
+            return chessPiece if slidingMove in chessPiece.moves else None
+    return None
+
+
+# A function that returns the material a move wins for the player making it once every capture on its target cell that pays off has been
+# made, the players always capturing with their least valuable piece and free to stop. It is static, as it only looks at the pieces that
+# attack the target cell, directly or from behind other attackers, and ignores pins and checks. A negative result is a losing capture.
+def getStaticExchange(board, r1, c1, r2, c2, moveType, promotion=0):
+    chessPiece = board.get(r1, c1)
+    captured = getCapturedPiece(board, r1, c1, r2, c2, moveType)
+    attackers = dict((color, set(board.getAttackers(r2, c2, color))) for color in (piece.COLOR.WHITE, piece.COLOR.BLACK))
+    removed = set([(r1, c1)])
+
+    attackers[chessPiece.color].discard(chessPiece)
+    hiddenAttacker = getHiddenAttacker(board, r2, c2, r1, c1, removed)
+    if hiddenAttacker is not None:
+        attackers[hiddenAttacker.color].add(hiddenAttacker)
+
+    gains = [captured.value if captured is not None else 0]
+    if promotion:
+        gains[0] += piece.numToPiece[promotion].value - chessPiece.value
+        valueOnCell = piece.numToPiece[promotion].value
+    else:
+        valueOnCell = getExchangeValue(chessPiece)
+    color = -chessPiece.color
+
+    while attackers[color]:
+        attacker = min(attackers[color], key=getExchangeValue)
+        gains.append(valueOnCell - gains[-1])
+        if max(-gains[-2], gains[-1]) < 0:  # Neither player can gain from going on.
+            break
+
+        valueOnCell = getExchangeValue(attacker)
+        attackers[color].discard(attacker)
+        removed.add((attacker.r, attacker.c))
+        hiddenAttacker = getHiddenAttacker(board, r2, c2, attacker.r, attacker.c, removed)
+        if hiddenAttacker is not None:
+            attackers[hiddenAttacker.color].add(hiddenAttacker)
+        color = -color
+
+    for i in xrange(len(gains) - 1, 0, -1):
+        gains[i - 1] = -max(-gains[i - 1], gains[i])
+
+    return gains[0]
+
+
+def main():
+    print("Please run the Chess_by_Eric_Liu.pyde file to run the program.")
+
+
+if __name__ == "__main__":
+    main()
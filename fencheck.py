@@ -0,0 +1,115 @@
+import sys
+import chessboard
+import move
+
+
+# Positions that must come back unchanged from being set up from Forsyth-Edwards Notation and written out again: the starting position,
+# Kiwipete, a pawn that may be captured en passant, one that may not as the capture would leave the king in check, and move counters.
+ROUND_TRIPS = ["rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+               "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+               "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+               "8/8/8/8/k2Pp2Q/8/8/3K4 b - d3 0 1",
+               "4k3/8/8/8/8/8/8/4K2R b K - 37 60"]
+
+# Text that is not a position of a chessboard of 8 by 8 cells, which must be refused.
+INVALID = ["x",
+           "8/8 w - - 0 1",
+           "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+           "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1",
+           "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+           "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkz - 0 1",
+           "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e3 0 1"]
+
+
+# A function that checks that positions come back unchanged, with the Zobrist key they would have had if they had been played to.
+def checkRoundTrips():
+    for fen in ROUND_TRIPS:
+        board = chessboard.Chessboard.fromFEN(fen)
+        if board.toFEN() != fen:
+            return "%s came back as %s" % (fen, board.toFEN())
+        if board.zobristKey != board.computeZobristKey():
+            return "%s has the wrong Zobrist key" % fen
+    return None
+
+
+# A function that checks that a pawn that has just moved two cells forward may be captured en passant, unless the capture is not legal.
+def checkEnPassant():
+    for fen, captures in (("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3", 1), ("8/8/8/8/k2Pp3/8/8/3K4 b - d3 0 1", 1),
+                          ("8/8/8/8/k2Pp2Q/8/8/3K4 b - d3 0 1", 0)):
+        board = chessboard.Chessboard.fromFEN(fen)
+        found = len([move_ for move_ in board.getLegalMoves() if move_[4] is move.EnPassant])
+        if found != captures:
+            return "%s has %d en passant captures instead of %d" % (fen, found, captures)
+    return None
+
+
+# A function that checks that the castling rights are written as the files of the rooks for Shredder-FEN, and read back from them.
+def checkShredderFEN():
+    board = chessboard.Chessboard()
+    if board.toFEN(True).split()[2] != "HAha":
+        return "the starting position has the castling rights %s" % board.toFEN(True).split()[2]
+    if chessboard.Chessboard.fromFEN(board.toFEN(True)).toFEN() != board.toFEN():
+        return "%s came back as %s" % (board.toFEN(True), chessboard.Chessboard.fromFEN(board.toFEN(True)).toFEN())
+    return None
+
+
+# A function that checks that a position set up in check, checkmate or stalemate is found to be so.
+def checkResults():
+    for fen, result, isInCheck, moves in (("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3", chessboard.RESULT.BLACK, True, 0),
+                                          ("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1", chessboard.RESULT.STALEMATE, False, 0),
+                                          ("4k3/8/8/8/8/8/8/R3K2r w Q - 0 1", chessboard.RESULT.UNDETERMINED, True, 3)):
+        board = chessboard.Chessboard.fromFEN(fen)
+        found = board.result, board.isInCheck, len(board.getLegalMoves())
+        if found != (result, isInCheck, moves):
+            return "%s has the result, check and number of moves %s instead of %s" % (fen, found, (result, isInCheck, moves))
+    return None
+
+
+# A function that checks that the move counters carry on from those of the position.
+def checkMoveCounters():
+    board = chessboard.Chessboard.fromFEN("4k3/8/8/8/8/8/8/4K2R b K - 37 60")
+    board.makeMove(*[move_ for move_ in board.getLegalMoves() if move_[:4] == (0, 4, 0, 3)][0])
+    if board.toFEN().split()[4:] != ["38", "61"]:
+        return "the counters after a king move are %s" % " ".join(board.toFEN().split()[4:])
+    return None
+
+
+# A function that checks that text that is not a position is refused.
+def checkInvalid():
+    for fen in INVALID:
+        try:
+            chessboard.Chessboard.fromFEN(fen)
+        except ValueError:
+            continue
+        return "%s was accepted" % fen
+    return None
+
+
+# A list of the checks, with their names.
+checks = [("Round trips", checkRoundTrips),
+          ("En passant", checkEnPassant),
+          ("Shredder-FEN", checkShredderFEN),
+          ("Check and results", checkResults),
+          ("Move counters", checkMoveCounters),
+          ("Invalid positions", checkInvalid)]
+
+
+# A function that runs every check, then reports whether each passed, and returns whether they all did.
+def runChecks(out=sys.stdout):
+    passed = True
+
+    for name, check in checks:
+        failure = check()
+        passed = passed and failure is None
+        out.write("%-20s %s\n" % (name, "ok" if failure is None else "FAILED (%s)" % failure))
+
+    return passed
+
+
+def main():
+    # Usage: python fencheck.py
+    sys.exit(0 if runChecks() else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+import piece
+import variant
+import exchange
+import chessboard
+import chess
+import widget
+
+
+# A HINT enumeration class that holds how the cells a selected piece can move to are shown.
+class HINT:
+    NONE = False
+    MOVE = 1
+    LOSING_CAPTURE = 2  # A capture that loses material once the exchange on the cell is played out.
+
+
+# A GameChessboard class that is the chessboard of the game. It adds to the rules of the Chessboard class everything that needs Processing:
+# it displays the chessboard and its pieces, is played with the mouse, shows the pop ups of promotion and results, and tells the game about
+# the moves made.
+class GameChessboard(chessboard.Chessboard):
+    # An __init__ member function that gets called when a GameChessboard instance is created. It creates the representation of the object.
+    def __init__(self, master, x=0, y=0, w=0, h=0, orientation=1, variant=variant.Standard, fen=None):
+        self.master = master
+        self.x = x
+        self.xL = x - w / 2.0
+        self.xR = x + w / 2.0
+        self.y = y
+        self.yU = y - h / 2.0
+        self.yD = y + h / 2.0
+        self.w = w
+        self.h = h
+        self.selected = None
+        self.highlighted = None
+        self.imageCells = dict()  # The cells the images of the pieces are drawn at, which move towards the cells of the pieces.
+
+        chessboard.Chessboard.__init__(self, orientation, variant, fen)
+        self.calculateGeometry()
+        self.getColors()
+
+    # A member function that creates the chessboard using the variant chosen by the user, along with the tables of what is shown on its cells.
+    def createChessboard(self, fen=None):
+        chessboard.Chessboard.createChessboard(self, fen)
+        self.alertTable = [[False] * self.cols for r in xrange(self.rows)]
+        self.hintTable = [[False] * self.cols for r in xrange(self.rows)]
+        self.effectTable = [[False] * self.cols for r in xrange(self.rows)]
+
+    # A member function that calculates the cell width and height of the chessboard.
+    def calculateGeometry(self):
+        self.cellWidth = float(self.w) / self.cols
+        self.cellHeight = float(self.h) / self.rows
+
+    # A member function that creates the color representation based on the game's selected theme.
+    def getColors(self):
+        if self.master.settings["theme"] == chess.THEME.CLASSIC:
+            self.color1 = color(153, 102, 51)
+            self.color2 = color(255, 204, 153)
+            self.borderColor = color(102, 51, 0)
+        elif self.master.settings["theme"] == chess.THEME.MODERN:
+            self.color1 = color(255,255,240)
+            self.color2 = color(105)
+            self.borderColor = color(0)
+
+    # A member frunction that converts from mouse coordinates to the cell row and column.
+    def coordToCell(self, x, y):  # Here, (0, 0) is the top left of the chessboard.
+        r = int(float(y - self.yU) / self.h * self.rows)
+        c = int(float(x - self.xL) / self.w * self.cols)
+        return r, c
+
+    # A member function that converts from the cell row and column to mouse coordinates.
+    def cellToCoord(self, r, c):  # Here, (0, 0) is the top left of the chessboard.
+        x = (c + 0.5) * self.cellWidth + self.xL
+        y = (r + 0.5) * self.cellHeight + self.yU
+        return x, y
+
+    # A member function that determines if the chessboard contains the passed coordinates.
+    def containsCoord(self, x, y):
+        return self.xL <= x < self.xR and self.yU <= y < self.yD
+
+    # A member function that returns a headless copy of the chessboard, which has the rules only, and so can be played on, in any thread,
+    # without affecting the game.
+    def copy(self):
+        board = chessboard.Chessboard.copy(self, {id(self.master): None, id(self.imageCells): None})
+        board.__class__ = chessboard.Chessboard
+        return board
+
+    # A member function that displays the chessboard.
+    def display(self):
+        pushMatrix()
+        pushStyle()
+        self.displayFrame()
+        self.displayCells()
+        self.displayPieces()
+        self.displayAlerts()
+        self.displayEffects()
+        self.displayHints()
+        self.displayHighlight()
+        popStyle()
+        popMatrix()
+
+    # A member function that displays the frame of the chessboard.
+    def displayFrame(self):
+        fill(self.borderColor)
+        stroke(self.borderColor)
+        strokeWeight(50)
+        rect(self.x, self.y, self.w, self.h)
+
+    # A member function that displays all the individual cells of the chessboard.
+    def displayCells(self):
+        strokeWeight(0)
+
+        for r in xrange(self.rows):
+            for c in xrange(self.rows):
+                if r + c & 1:
+                    fill(self.color1)
+                    stroke(self.color1)
+                else:
+                    fill(self.color2)
+                    stroke(self.color2)
+
+                coord = self.cellToCoord(r, c)
+
+                rect(coord[0], coord[1], self.cellWidth, self.cellHeight)
+
+    # A member function that displays all the pieces on the board. The image of a piece that has just moved glides to its cell, and pieces no
+    # longer on the chessboard are forgotten.
+    def displayPieces(self):
+        imageCells = dict()
+
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                if self.isOccupied(r, c):
+                    chessPiece = self.get(r, c)
+                    imageCells[chessPiece] = self.imageCells.get(chessPiece, [r, c])
+                    self.displayPiece(chessPiece, imageCells[chessPiece])
+
+        self.imageCells = imageCells
+
+    # A member function that moves the image of a chess piece towards its cell and displays it.
+    def displayPiece(self, chessPiece, imageCell):
+        imageCell[0] += (chessPiece.r - imageCell[0]) * min(1, 15 / frameRate)
+        imageCell[1] += (chessPiece.c - imageCell[1]) * min(1, 15 / frameRate)
+
+        coord = self.cellToCoord(*imageCell)
+        image(self.master.chessPieceImages[chessPiece.color * chessPiece.pieceType], coord[0], coord[1], 0.95 * self.cellWidth, 0.95 * self.cellHeight)
+
+    # A member function that displays the alerted cells on the board.
+    def displayAlerts(self):
+        strokeWeight(0)
+
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                if self.alertTable[r][c]:
+                    self.alertTable[r][c] = max(100, self.alertTable[r][c] - 255 / frameRate)
+
+                    fill(255, 0, 0, self.alertTable[r][c])
+                    stroke(255, 0, 0, self.alertTable[r][c])
+                    x, y = self.cellToCoord(r, c)
+                    rect(x, y, self.cellWidth, self.cellHeight)
+
+    # A member function that displays the possible moves of a selected piece, with the captures that lose material in orange. It does not
+    # display anything if no piece is selected.
+    def displayHints(self):
+        strokeWeight(0)
+
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                if self.hintTable[r][c]:
+                    if self.hintTable[r][c] == HINT.LOSING_CAPTURE:
+                        fill(255, 165, 0, 100)
+                        stroke(255, 165, 0, 100)
+                    else:
+                        fill(0, 255, 0, 100)
+                        stroke(0, 255, 0, 100)
+                    x, y = self.cellToCoord(r, c)
+                    rect(x, y, self.cellWidth, self.cellHeight)
+
+    # A member function that displays the board's effects.
+    def displayEffects(self):
+        strokeWeight(0)
+
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                if self.effectTable[r][c]:
+                    self.effectTable[r][c] = max(0, self.effectTable[r][c] - 255 / frameRate)
+                    fill(0, 0, 255, self.effectTable[r][c])
+                    stroke(0, 0, 255, self.effectTable[r][c])
+
+                    x, y = self.cellToCoord(r, c)
+                    rect(x, y, self.cellWidth, self.cellHeight)
+
+    # A member function that displays the highlight a highlighted cell on the board.
+    def displayHighlight(self):
+        if self.highlighted is not None:
+            x, y = self.cellToCoord(*self.highlighted)
+            fill(1, 50)
+            stroke(1, 50)
+            noStroke()
+            rect(x, y, self.cellWidth, self.cellHeight)
+
+    # A member function that selects a cell for highlighting.
+    def highlight(self, r, c):
+        self.highlighted = r, c
+
+    # A member function that deselects a highlighted cell.
+    def dehighlight(self):
+        self.highlighted = None
+
+    # A member function that clears all the alerts on the board.
+    def clearAlerts(self):
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                self.alertTable[r][c] = False
+
+    # A member function that clears the hints (possible next moves) on the board.
+    def clearHints(self):
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                self.hintTable[r][c] = False
+
+    # A member function that creates an effect on a cell.
+    def createEffect(self, r, c):
+        self.effectTable[r][c] = 255
+
+    # A member function that creates an alert on a cell.
+    def createAlert(self, r, c):
+        self.alertTable[r][c] = 255
+
+    # A member function that selects a cell. If the cell is occupied, its possible next moves are marked in the hintTable member variable.
+    def select(self, r, c):
+        self.clearHints()
+
+        if self.cellColor(r, c) == self.turn and (r, c) != self.selected:
+            self.selected = r, c
+
+            if self.isOccupied(r, c):
+                chessPiece = self.get(r, c)
+
+                for r2, c2 in chessPiece.getNextPositions():
+                    if self.isOccupied(r2, c2) and exchange.getStaticExchange(self, r, c, r2, c2, chessPiece.nextPositions[r2, c2]) < 0:
+                        self.hintTable[r2][c2] = HINT.LOSING_CAPTURE
+                    else:
+                        self.hintTable[r2][c2] = HINT.MOVE
+        else:
+            self.selected = None
+
+    # A member function that plays the selected piece to a cell in the game.
+    def playMove(self, r, c):
+        r1, c1 = self.selected
+        self.makeMove(r1, c1, r, c, self.get(r1, c1).nextPositions[r, c])
+        self.update()
+
+    # A member function that promotes a pawn once the player or the AI has chosen the piece, which closes the pop up of promotion and is sent
+    # to the AI.
+    def changePiece(self, r, c, pieceType):
+        self.master.destroyPopUp()
+        chessboard.Chessboard.changePiece(self, r, c, pieceType)
+        self.master.sendPromotionToAI(piece.symbols[pieceType])
+
+    # A member function that replaces a pawn by a piece of another type, whose image takes over from the image of the pawn.
+    def promote(self, r, c, pieceType):
+        pawn = self.get(r, c)
+        chessboard.Chessboard.promote(self, r, c, pieceType)
+        if pawn in self.imageCells:
+            self.imageCells[self.get(r, c)] = self.imageCells[pawn]
+
+    # A member function that updates the chessboard and tells the game about the move. This is called after each move.
+    def update(self):
+        self.clearAlerts()
+        self.clearHints()
+        chessboard.Chessboard.update(self)
+        self.master.takeCareOfMove(self.history[-1])
+
+    # A member function that updates all the pieces on the chessboard, and lets the player choose the piece a pawn of theirs that has reached
+    # the last row is promoted to.
+    def updatePieces(self):
+        chessboard.Chessboard.updatePieces(self)
+
+        for r in (0, self.rows - 1):
+            for c in xrange(self.cols):
+                chessPiece = self.get(r, c)
+                if chessPiece is not None and self.isPromotion(chessPiece, r) and chessPiece.color in self.master.settings["playAs"]:
+                    self.createPromotionPopUp(chessPiece)
+
+    # A member function that checks if a king is in check, and alerts the cells of the king and of the piece checking it if so.
+    def checkForCheck(self):
+        cells = chessboard.Chessboard.checkForCheck(self)
+        if cells is not None:
+            for r, c in cells:
+                self.createAlert(r, c)
+        return cells
+
+    # A member function that checks if the game is finished, and shows the results if so.
+    def checkResults(self):
+        chessboard.Chessboard.checkResults(self)
+        if self.result != chessboard.RESULT.UNDETERMINED:
+            self.createResultPopUp()
+
+    # A member function that creates a pop up that allows the player to choose the piece a pawn is promoted to.
+    def createPromotionPopUp(self, pawn):
+        xC, yC = self.cellToCoord(pawn.r, pawn.c)
+        imageWidth = 0.95 * self.cellWidth
+        imageHeight = 0.95 * self.cellHeight
+        cellYOffset = self.cellHeight
+        fC = color(255) if pawn.color == piece.COLOR.BLACK else color(0)
+        sC = color(0) if pawn.color == piece.COLOR.BLACK else color(255)
+
+        if self.master.boardAngle != 0:
+            xC = width / 2.0 + (width / 2.0 - xC)
+            yC = height / 2.0 + (height / 2.0 - yC)
+            cellYOffset *= -1
+
+        self.master.createPopUp([widget.Rect(width / 2.0, height / 2.0, width, height, color(1, 200), color(1, 200), 0, False), \
+                                 widget.Ellipse(xC, yC - pawn.forward * cellYOffset, self.cellWidth, self.cellHeight, fC, sC, 5, True), \
+                                 widget.Ellipse(xC, yC - pawn.forward * 2 * cellYOffset, self.cellWidth, self.cellHeight, fC, sC, 5, True), \
+                                 widget.Ellipse(xC, yC - pawn.forward * 3 * cellYOffset, self.cellWidth, self.cellHeight, fC, sC, 5, True), \
+                                 widget.Ellipse(xC, yC - pawn.forward * 4 * cellYOffset, self.cellWidth, self.cellHeight, fC, sC, 5, True), \
+                                 widget.ImageButton(xC, yC - pawn.forward * cellYOffset, imageWidth, imageHeight, \
+                                                    self.master.chessPieceImages[pawn.color * piece.PIECE.QUEEN], lambda: pawn.changeTo(pawn.color * piece.PIECE.QUEEN), False), \
+                                 widget.ImageButton(xC, yC - pawn.forward * 2 * cellYOffset, imageWidth, imageHeight, \
+                                                    self.master.chessPieceImages[pawn.color * piece.PIECE.KNIGHT], lambda: pawn.changeTo(pawn.color * piece.PIECE.KNIGHT), False), \
+                                 widget.ImageButton(xC, yC - pawn.forward * 3 * cellYOffset, imageWidth, imageHeight, \
+                                                    self.master.chessPieceImages[pawn.color * piece.PIECE.ROOK], lambda: pawn.changeTo(pawn.color * piece.PIECE.ROOK), False), \
+                                 widget.ImageButton(xC, yC - pawn.forward * 4 * cellYOffset, imageWidth, imageHeight, \
+                                                    self.master.chessPieceImages[pawn.color * piece.PIECE.BISHOP], lambda: pawn.changeTo(pawn.color * piece.PIECE.BISHOP), False)])
+
+    # A member function that creates a pop up notifying that the game is over and displaying the results.
+    def createResultPopUp(self):
+        if self.result == chessboard.RESULT.BLACK:
+            heading = "Black Wins!"
+        elif self.result == chessboard.RESULT.WHITE:
+            heading = "White Wins!"
+        elif self.result == chessboard.RESULT.DRAW:
+            heading = "Draw"
+        else:
+            heading = "Stalemate"
+
+        self.master.createPopUp([widget.Rect(width / 2.0, height / 2.0, width, height, color(1, 200), color(1, 200), 0, False), \
+                    widget.TXT(width / 2.0, self.master.yUnit * 2, heading, 1 * self.master.yUnit, color(255), False), \
+                    widget.Button(width / 2.0, height / 2.0, 5 * self.master.xUnit, 1.5 * self.master.yUnit, "Return to Menu", 0.7 * self.master.yUnit, color(0), \
+                                color(255, 200), color(0), 5, lambda: self.master.destroyPopUp() or self.master.switchTo(chess.GUI.MAIN), True)])
+
+    # A member function that invokes different member function based on the coordinates where the action occurred (as in mouse being pressed).
+    def actionAtCoord(self, x, y, status):
+        if self.result != chessboard.RESULT.UNDETERMINED: return
+
+        r, c = self.coordToCell(x, y)
+
+        if self.hintTable[r][c]:
+            self.playMove(r, c)
+        elif status:
+            self.select(r, c)
+
+    # A member function that instantly selects a piece
+    def instantlyMakeMove(self, r1, c1, r2, c2):
+        self.select(r1, c1)
+        self.playMove(r2, c2)
+
+
+def main():
+    print("Please run the Chess_by_Eric_Liu.pyde file to run the program.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,115 @@
 import piece
+import bitboard
 
 
 # A Move base class that provides an interface for move type classes which would be inherited from this class.
 class Move:
     possiblePositions = list()
     isCheckable = True
+    isSliding = False  # If set, the cells attacked by the move depend on the cells it passes over.
+    needsVerification = False  # If set, the pins and checks of the position cannot tell if a move is legal, so it needs to be tried out.
         
-    # A class method that gets the next possible positions of the piece.
+    # A class method that gets the next possible positions of the piece. On a chessboard with bitboards, they are read from the bitboard of
+    # the cells the move can reach; otherwise the cells of the chessboard are walked.
     @classmethod
     def getNextPositions(cls, chessboard, chessPiece, disregardCheck=False):
+        if chessboard.bitboards is None:
+            return cls.getGridPositions(chessboard, chessPiece, disregardCheck)
+        
+        return [position for position in bitboard.getCells(cls.getTargets(chessboard.bitboards, chessPiece)) \
+                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)]
+        
+    # A class method that gets the next possible positions of the piece by walking the cells of the chessboard.
+    @classmethod
+    def getGridPositions(cls, chessboard, chessPiece, disregardCheck=False):
         nextPositions = list()
         
-        for possiblePosition in cls.possiblePositions:
-            position = chessPiece.r + chessPiece.forward * possiblePosition[0], chessPiece.c + possiblePosition[1]
-            if chessboard.containsCell(*position) and chessboard.cellColor(*position) != chessPiece.color and \
+        for position in cls.getPossibleCells(chessboard.geometry, chessPiece):
+            if chessboard.cellColor(*position) != chessPiece.color and \
                  (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)):
                 nextPositions.append(position)
                 
         return nextPositions
         
-    # A class method that determines if a move causes enemy check. 
+    # A class method that returns the cells the move can reach from the piece's cell on an empty chessboard, read from the geometry tables.
+    @classmethod
+    def getPossibleCells(cls, geometry, chessPiece):
+        return geometry.getJumps(cls.possiblePositions, chessPiece.forward)[chessPiece.r][chessPiece.c]
+        
+    # A class method that gets the next possible positions of a sliding piece, walking each direction until the first occupied cell.
+    @classmethod
+    def getSlidingPositions(cls, chessboard, chessPiece, directions, disregardCheck=False):
+        nextPositions = list()
+        
+        for direction in directions:
+            for r, c in chessboard.geometry.rays[direction][chessPiece.r][chessPiece.c]:
+                if chessboard.isEmpty(r, c):  # Empty cell
+                    if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
+                        nextPositions.append((r, c))
+                elif chessboard.cellColor(r, c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
+                    break
+                else:  # Cell occupied by a chessPiece of the different color
+                    if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
+                        nextPositions.append((r, c))
+                    break
+                
+        return nextPositions
+        
+    # A class method that returns the bitboard of the cells the move can reach, disregarding check.
+    @classmethod
+    def getTargets(cls, bitboards, chessPiece):
+        targets = 0
+        
+        for possiblePosition in cls.possiblePositions:
+            r, c = chessPiece.r + chessPiece.forward * possiblePosition[0], chessPiece.c + possiblePosition[1]
+            if 0 <= r < bitboard.SIZE and 0 <= c < bitboard.SIZE:
+                targets |= 1 << (r * bitboard.SIZE + c)
+                
+        return targets & ~bitboards.colors[chessPiece.color]
+        
+    # A class method that returns the cells the piece attacks with this move type, whatever occupies them, so that the cells defended by the
+    # piece are included. Move types that can give check override this.
+    @classmethod
+    def getAttackedCells(cls, chessboard, chessPiece):
+        return ()
+        
+    # A class method that returns the cells a sliding piece attacks in the given directions, each direction ending at its first occupied cell.
+    @classmethod
+    def getRayCells(cls, chessboard, chessPiece, directions):
+        cells = list()
+        
+        for direction in directions:
+            for r, c in chessboard.geometry.rays[direction][chessPiece.r][chessPiece.c]:
+                cells.append((r, c))
+                if chessboard.isOccupied(r, c):
+                    break
+                
+        return cells
+        
+    # A class method that determines if a move causes enemy check. The pins and checks of the position decide for most moves, the attack maps
+    # decide for moves of the king, and moves that need verification are tried out.
     @classmethod
     def causeEnemyCheck(cls, chessboard, chessPiece, position):
-        newBoard = chessboard.copy()
-        newBoard.get(chessPiece.r, chessPiece.c).lastMoved = newBoard.count
-        cls.makeMove(newBoard, newBoard.get(chessPiece.r, chessPiece.c), position[0], position[1])
-        newBoard.update()
-        newBoard.cacheNextPositions(True)
-        kingCell = newBoard.getKingCell(chessPiece.color)
-        
-        if kingCell is not None and newBoard.isVulnerable(*kingCell):
-            return True
-            
-        return False
+        legality = chessboard.getLegality(chessPiece.color)
+        
+        if legality is None:
+            return False
+        elif cls.needsVerification:
+            return cls.verifyEnemyCheck(chessboard, chessPiece, position)
+        elif (chessPiece.r, chessPiece.c) == legality.kingCell:
+            return not chessboard.isSafeForKing(chessPiece, position[0], position[1])
+        
+        return not legality.allows(chessPiece.r, chessPiece.c, position[0], position[1])
+        
+    # A class method that determines if a move causes enemy check by trying the move in place and taking it back afterwards.
+    @classmethod
+    def verifyEnemyCheck(cls, chessboard, chessPiece, position):
+        chessboard.makeMove(chessPiece.r, chessPiece.c, position[0], position[1], cls)
+        kingCell = chessboard.getKingCell(chessPiece.color)
+        isInCheck = kingCell is not None and chessboard.isSquareAttacked(kingCell[0], kingCell[1], -chessPiece.color)
+        chessboard.unmakeMove()
+        
+        return isInCheck
         
     # A static method that makes a move of the chess piece, given the chessboard and the piece.
     @staticmethod
@@ -42,6 +119,11 @@ class Move:
         chessPiece.r = r
         chessPiece.c = c
         
+    # A static method that returns the cells whose content is changed by the move, so that the move can be taken back.
+    @staticmethod
+    def getAffectedCells(chessboard, chessPiece, r, c):
+        return [(chessPiece.r, chessPiece.c), (r, c)]
+        
 
 # Implementation of individual move type classes follow. Each contains possible positions and overrides member function from base Move class if necessary.
 
@@ -49,6 +131,18 @@ class Move:
 class Adjacent(Move):
     possiblePositions = [(1, -1), (1, 0), (1, 1), (0, -1), (0, 1), (-1, -1), (-1, 0), (-1, 1)]
         
+    @classmethod
+    def getPossibleCells(cls, geometry, chessPiece):
+        return geometry.kingCells[chessPiece.r][chessPiece.c]
+
+    @classmethod
+    def getTargets(cls, bitboards, chessPiece):
+        return bitboard.KING[chessPiece.r * bitboard.SIZE + chessPiece.c] & ~bitboards.colors[chessPiece.color]
+
+    @classmethod
+    def getAttackedCells(cls, chessboard, chessPiece):
+        return chessboard.geometry.kingCells[chessPiece.r][chessPiece.c]
+
     @staticmethod
     def makeMove(chessboard, chessPiece, r, c):
         Move.makeMove(chessboard, chessPiece, r, c)
@@ -57,6 +151,7 @@ class Adjacent(Move):
 class Castling(Move):
     possiblePositions = [(0, -2), (0, 2)]
     isCheckable = False
+    needsVerification = True  # The king moves two cells at once, which the attack maps are only read for one step at a time.
 
     @classmethod
     def getNextPositions(cls, chessboard, chessPiece, disregardCheck=False):
@@ -70,7 +165,9 @@ class Castling(Move):
                  not chessboard.obstructed(chessPiece.r, chessPiece.c, *rookPosition) and (chessboard.isOccupied(*rookPosition) and \
                 chessboard.get(*rookPosition).pieceType * chessboard.get(*rookPosition).color == chessPiece.color * piece.PIECE.ROOK) and \
                  chessboard.get(*rookPosition).neverMoved and chessPiece.neverMoved and \
-                (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)):
+                (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position) and \
+                 not chessboard.isSquareAttacked(chessPiece.r, chessPiece.c, -chessPiece.color) and \
+                 not chessboard.isSquareAttacked(position[0], (chessPiece.c + position[1]) / 2, -chessPiece.color)):  # The king may not castle out of or through check.
                 nextPositions.append(position)
 
         return nextPositions     
@@ -84,66 +181,31 @@ class Castling(Move):
         chessboard.get(*subsequentRookPosition).r = subsequentRookPosition[0]
         chessboard.get(*subsequentRookPosition).c = subsequentRookPosition[1]
         
-        Move.makeMove(chessboard, chessPiece, r, c)                             
+        Move.makeMove(chessboard, chessPiece, r, c)
+        
+    @staticmethod
+    def getAffectedCells(chessboard, chessPiece, r, c):
+        return [(chessPiece.r, chessPiece.c), (r, c), (chessPiece.r, 7 if chessPiece.c < c else 0), (chessPiece.r, c - 1 if chessPiece.c < c else c + 1)]
 
 
 class RankFile(Move):
     possiblePositions = [(r, 0) for r in xrange(-7, 8) if r] + [(0, c) for c in xrange(-7, 8) if c]
+    isSliding = True
     
     @classmethod
-    def getNextPositions(cls, chessboard, chessPiece, disregardCheck=False):
-        nextPositions = list()
-        
-        # Left
-        for c in xrange(chessPiece.c - 1, -1, -1):
-            if chessboard.isEmpty(chessPiece.r, c):  # Empty cell
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (chessPiece.r, c)):
-                    nextPositions.append((chessPiece.r, c))
-            elif chessboard.cellColor(chessPiece.r, c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
-                break
-            else:  # Cell occupied by a chessPiece of the different color
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (chessPiece.r, c)):
-                    nextPositions.append((chessPiece.r, c))
-                break
-        
-        # Right
-        for c in xrange(chessPiece.c + 1, chessboard.cols):
-            if chessboard.isEmpty(chessPiece.r, c):  # Empty cell
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (chessPiece.r, c)):
-                    nextPositions.append((chessPiece.r, c))
-            elif chessboard.cellColor(chessPiece.r, c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
-                break
-            else:  # Cell occupied by a chessPiece of the different color
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (chessPiece.r, c)):
-                    nextPositions.append((chessPiece.r, c))
-                break
-        
-        # Up
-        for r in xrange(chessPiece.r - 1, -1, -1):
-            if chessboard.isEmpty(r, chessPiece.c):  # Empty cell
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, chessPiece.c)):
-                    nextPositions.append((r, chessPiece.c))
-            elif chessboard.cellColor(r, chessPiece.c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
-                break
-            else:  # Cell occupied by a chessPiece of the different color
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, chessPiece.c)):
-                    nextPositions.append((r, chessPiece.c))
-                break
-            
-        # Down
-        for r in xrange(chessPiece.r + 1, chessboard.rows):
-            if chessboard.isEmpty(r, chessPiece.c):  # Empty cell
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, chessPiece.c)):
-                    nextPositions.append((r, chessPiece.c))
-            elif chessboard.cellColor(r, chessPiece.c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
-                break
-            else:  # Cell occupied by a chessPiece of the different color
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, chessPiece.c)):
-                    nextPositions.append((r, chessPiece.c))
-                break
-        
-        return nextPositions  
-        
+    def getGridPositions(cls, chessboard, chessPiece, disregardCheck=False):
+        return cls.getSlidingPositions(chessboard, chessPiece, chessboard.geometry.orthogonal, disregardCheck)
+
+    @classmethod
+    def getTargets(cls, bitboards, chessPiece):
+        return bitboard.getOrthogonalAttacks(chessPiece.r * bitboard.SIZE + chessPiece.c, bitboards.occupied) & ~bitboards.colors[chessPiece.color]
+
+    @classmethod
+    def getAttackedCells(cls, chessboard, chessPiece):
+        if chessboard.bitboards is not None:
+            return bitboard.getCells(bitboard.getOrthogonalAttacks(chessPiece.r * bitboard.SIZE + chessPiece.c, chessboard.bitboards.occupied))
+        return cls.getRayCells(chessboard, chessPiece, chessboard.geometry.orthogonal)
+
     @staticmethod
     def makeMove(chessboard, chessPiece, r, c):
         Move.makeMove(chessboard, chessPiece, r, c)
@@ -151,61 +213,22 @@ class RankFile(Move):
 
 class Diagonal(Move):
     possiblePositions = [(r, c) for r in xrange(-7, 8) for c in xrange(-7, 8) if r and c and abs(r) == abs(c)]
+    isSliding = True
 
     @classmethod
-    def getNextPositions(cls, chessboard, chessPiece, disregardCheck=False):
-        nextPositions = list()
-        
-        # Up Left
-        for r, c in zip(xrange(chessPiece.r  - 1, -1, -1), xrange(chessPiece.c - 1, -1, -1)):
-            if chessboard.isEmpty(r, c):  # Empty cell
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
-                    nextPositions.append((r, c))
-            elif chessboard.cellColor(r, c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
-                break
-            else:  # Cell occupied by a chessPiece of the different color
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
-                    nextPositions.append((r, c))
-                break
-            
-        # Up Right
-        for r, c in zip(xrange(chessPiece.r - 1, -1, -1), xrange(chessPiece.c + 1, chessboard.cols)):
-            if chessboard.isEmpty(r, c):  # Empty cell
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
-                    nextPositions.append((r, c))
-            elif chessboard.cellColor(r, c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
-                break
-            else:  # Cell occupied by a chessPiece of the different color
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
-                    nextPositions.append((r, c))
-                break
-        
-        # Down Left
-        for r, c in zip(xrange(chessPiece.r + 1, chessboard.rows), xrange(chessPiece.c - 1, -1, -1)):
-            if chessboard.isEmpty(r, c):  # Empty cell
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
-                    nextPositions.append((r, c))
-            elif chessboard.cellColor(r, c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
-                break
-            else:  # Cell occupied by a chessPiece of the different color
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
-                    nextPositions.append((r, c))
-                break
-            
-        # Down Right
-        for r, c in zip(xrange(chessPiece.r + 1, chessboard.rows), xrange(chessPiece.c + 1, chessboard.cols)):
-            if chessboard.isEmpty(r, c):  # Empty cell
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
-                    nextPositions.append((r, c))
-            elif chessboard.cellColor(r, c) == chessPiece.color:  # Cell occupied by a chessPiece of the same color
-                break
-            else:  # Cell occupied by a chessPiece of the different color
-                if disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, (r, c)):
-                    nextPositions.append((r, c))
-                break
-        
-        return nextPositions  
-        
+    def getGridPositions(cls, chessboard, chessPiece, disregardCheck=False):
+        return cls.getSlidingPositions(chessboard, chessPiece, chessboard.geometry.diagonal, disregardCheck)
+
+    @classmethod
+    def getTargets(cls, bitboards, chessPiece):
+        return bitboard.getDiagonalAttacks(chessPiece.r * bitboard.SIZE + chessPiece.c, bitboards.occupied) & ~bitboards.colors[chessPiece.color]
+
+    @classmethod
+    def getAttackedCells(cls, chessboard, chessPiece):
+        if chessboard.bitboards is not None:
+            return bitboard.getCells(bitboard.getDiagonalAttacks(chessPiece.r * bitboard.SIZE + chessPiece.c, chessboard.bitboards.occupied))
+        return cls.getRayCells(chessboard, chessPiece, chessboard.geometry.diagonal)
+
     @staticmethod
     def makeMove(chessboard, chessPiece, r, c):
         Move.makeMove(chessboard, chessPiece, r, c)
@@ -214,6 +237,18 @@ class Diagonal(Move):
 class LJump(Move):
     possiblePositions = [(2, -1), (2, 1), (1, -2), (1, 2), (-1, -2), (-1, 2), (-2, -1), (-2, 1)]
 
+    @classmethod
+    def getPossibleCells(cls, geometry, chessPiece):
+        return geometry.knightCells[chessPiece.r][chessPiece.c]
+
+    @classmethod
+    def getTargets(cls, bitboards, chessPiece):
+        return bitboard.KNIGHT[chessPiece.r * bitboard.SIZE + chessPiece.c] & ~bitboards.colors[chessPiece.color]
+
+    @classmethod
+    def getAttackedCells(cls, chessboard, chessPiece):
+        return chessboard.geometry.knightCells[chessPiece.r][chessPiece.c]
+
     @staticmethod
     def makeMove(chessboard, chessPiece, r, c):
         Move.makeMove(chessboard, chessPiece, r, c)
@@ -224,17 +259,22 @@ class Forward(Move):
     isCheckable = False
 
     @classmethod
-    def getNextPositions(cls, chessboard, chessPiece, disregardCheck=False):
+    def getGridPositions(cls, chessboard, chessPiece, disregardCheck=False):
         nextPositions = list()
         
-        for possiblePosition in cls.possiblePositions:
-            position = chessPiece.r + chessPiece.forward * possiblePosition[0], chessPiece.c + possiblePosition[1]
-            if chessboard.containsCell(*position) and chessboard.isEmpty(*position) and \
-                 (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)):
+        for position in chessboard.geometry.pawnPushes[chessPiece.forward][chessPiece.r][chessPiece.c]:
+            if chessboard.isEmpty(*position) and (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)):
                 nextPositions.append(position)
                 
         return nextPositions
 
+    @classmethod
+    def getTargets(cls, bitboards, chessPiece):
+        r = chessPiece.r + chessPiece.forward
+        if 0 <= r < bitboard.SIZE and not bitboards.isOccupied(r, chessPiece.c):
+            return 1 << (r * bitboard.SIZE + chessPiece.c)
+        return 0
+
     @staticmethod
     def makeMove(chessboard, chessPiece, r, c):
         Move.makeMove(chessboard, chessPiece, r, c)
@@ -245,18 +285,23 @@ class DoubleForward(Move):
     isCheckable = False
 
     @classmethod
-    def getNextPositions(cls, chessboard, chessPiece, disregardCheck=False):
+    def getGridPositions(cls, chessboard, chessPiece, disregardCheck=False):
         nextPositions = list()
         
-        for possiblePosition in cls.possiblePositions:
-            position = chessPiece.r + chessPiece.forward * possiblePosition[0], chessPiece.c + possiblePosition[1]
-            if chessboard.containsCell(*position) and chessboard.isEmpty(*position) and not chessboard.obstructed(chessPiece.r, chessPiece.c, *position) and \
-            chessPiece.neverMoved and chessPiece.r == (1 if -chessboard.orientation * chessPiece.color == 1 else 6) and \
+        for position in chessboard.geometry.pawnDoublePushes[chessPiece.forward][chessPiece.r][chessPiece.c]:
+            if chessboard.isEmpty(*position) and not chessboard.obstructed(chessPiece.r, chessPiece.c, *position) and chessPiece.neverMoved and \
                  (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)):
                 nextPositions.append(position)
                 
         return nextPositions
-        
+
+    @classmethod
+    def getTargets(cls, bitboards, chessPiece):
+        if chessPiece.neverMoved and chessPiece.r == (1 if chessPiece.forward == 1 else 6) and \
+             not bitboards.isOccupied(chessPiece.r + chessPiece.forward, chessPiece.c) and not bitboards.isOccupied(chessPiece.r + 2 * chessPiece.forward, chessPiece.c):
+            return 1 << ((chessPiece.r + 2 * chessPiece.forward) * bitboard.SIZE + chessPiece.c)
+        return 0
+
     @staticmethod
     def makeMove(chessboard, chessPiece, r, c):
         Move.makeMove(chessboard, chessPiece, r, c)
@@ -266,17 +311,23 @@ class ForwardDiagonal(Move):
     possiblePositions = [(1, -1), (1, 1)]
 
     @classmethod
-    def getNextPositions(cls, chessboard, chessPiece, disregardCheck=False):
+    def getGridPositions(cls, chessboard, chessPiece, disregardCheck=False):
         nextPositions = list()
         
-        for possiblePosition in cls.possiblePositions:
-            position = chessPiece.r + chessPiece.forward * possiblePosition[0], chessPiece.c + possiblePosition[1]
-            if chessboard.containsCell(*position) and chessboard.cellColor(*position) == -chessPiece.color and \
-                 (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)):
+        for position in chessboard.geometry.pawnCaptures[chessPiece.forward][chessPiece.r][chessPiece.c]:
+            if chessboard.cellColor(*position) == -chessPiece.color and (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)):
                 nextPositions.append(position)
                 
         return nextPositions
-        
+
+    @classmethod
+    def getTargets(cls, bitboards, chessPiece):
+        return bitboard.PAWN_ATTACKS[chessPiece.forward][chessPiece.r * bitboard.SIZE + chessPiece.c] & bitboards.colors[-chessPiece.color]
+
+    @classmethod
+    def getAttackedCells(cls, chessboard, chessPiece):
+        return chessboard.geometry.pawnCaptures[chessPiece.forward][chessPiece.r][chessPiece.c]
+
     @staticmethod
     def makeMove(chessboard, chessPiece, r, c):
         Move.makeMove(chessboard, chessPiece, r, c)
@@ -285,14 +336,14 @@ class ForwardDiagonal(Move):
 class EnPassant(Move):
     possiblePositions = [(1, -1), (1, 1)]
     isCheckable = False
+    needsVerification = True  # Removing the captured pawn can expose the king along the rank.
 
     @classmethod
     def getNextPositions(cls, chessboard, chessPiece, disregardCheck=False):
         nextPositions = list()
 
-        for possiblePosition in cls.possiblePositions:
-            position = chessPiece.r + chessPiece.forward * possiblePosition[0], chessPiece.c + possiblePosition[1]
-            if chessboard.containsCell(*position) and chessboard.isOccupied(position[0] - chessPiece.forward, position[1]) and \
+        for position in chessboard.geometry.pawnCaptures[chessPiece.forward][chessPiece.r][chessPiece.c]:
+            if chessboard.isOccupied(position[0] - chessPiece.forward, position[1]) and \
             chessboard.get(position[0] - chessPiece.forward, position[1]).lastMoved == chessboard.count - 1 and chessboard.history and chessboard.history[-1]["move"] == DoubleForward and \
                  (disregardCheck or not cls.causeEnemyCheck(chessboard, chessPiece, position)):
                 nextPositions.append(position)
@@ -303,9 +354,16 @@ class EnPassant(Move):
     def makeMove(chessboard, chessPiece, r, c):
         chessboard.set(r - chessPiece.forward, c, None)
         Move.makeMove(chessboard, chessPiece, r, c)
+        
+    @staticmethod
+    def getAffectedCells(chessboard, chessPiece, r, c):
+        return [(chessPiece.r, chessPiece.c), (r, c), (r - chessPiece.forward, c)]
 
 
 moves = [Adjacent, Castling, RankFile, Diagonal, LJump, Forward, DoubleForward, ForwardDiagonal, EnPassant]
+
+# A list of the move types that can give check, which are the ones that make up the attack maps of a chessboard.
+checkableMoves = [move_ for move_ in moves if move_.isCheckable]
         
 
 def main():
@@ -0,0 +1,102 @@
+import piece
+import transposition
+import exchange
+
+
+# The ranks given to the moves, from the first searched to the last. Within a rank, captures are sorted by their victim and attacker, and
+# quiet moves by their history score, which is kept below the rank of the killer moves.
+HASH_MOVE = 1 << 30
+CAPTURE = 1 << 24
+KILLER = 1 << 22
+HISTORY_LIMIT = KILLER - 2
+KILLERS_PER_PLY = 2
+
+
+# A MoveOrderer class that sorts the moves of the positions of a search so that the moves likely to be best are searched first, which lets
+# alpha-beta cut off the rest. It ranks the move stored in the transposition table first, then the captures and promotions by the most
+# valuable victim and least valuable attacker, then the two killer moves of the ply, which cut off a sibling position, and then the quiet
+# moves by how often they have cut off anywhere in the search.
+class MoveOrderer:
+    # An __init__ member function that gets called when a MoveOrderer instance is created. It creates the representation of the object.
+    def __init__(self, maxPly=128):
+        self.maxPly = maxPly
+        self.killers = [[transposition.NO_MOVE] * KILLERS_PER_PLY for ply in xrange(maxPly)]
+        self.history = dict()  # Indexed by color, then by the cells the move goes from and to, as given by getHistoryIndex.
+        self.resetStatistics()
+
+    # A member function that readies the orderer for a new search. Killer moves belong to the positions of the last search, so they are
+    # forgotten, while the history scores are halved so that they still help without outweighing what the new search learns.
+    def newSearch(self):
+        self.killers = [[transposition.NO_MOVE] * KILLERS_PER_PLY for ply in xrange(self.maxPly)]
+        for scores in self.history.values():
+            for i in xrange(len(scores)):
+                scores[i] //= 2
+        self.resetStatistics()
+
+    # A member function that resets the counters of the orderer.
+    def resetStatistics(self):
+        self.cutoffs = 0
+        self.firstMoveCutoffs = 0
+
+    # A member function that returns the history scores of a color, which form a butterfly board: one score for every cell a move can go
+    # from and every cell it can go to.
+    def getHistory(self, board, color):
+        if color not in self.history or len(self.history[color]) != (board.rows * board.cols) ** 2:
+            self.history[color] = [0] * (board.rows * board.cols) ** 2
+        return self.history[color]
+
+    # A member function that returns the index of a move in the history scores.
+    def getHistoryIndex(self, board, move_):
+        return (move_[0] * board.cols + move_[1]) * board.rows * board.cols + move_[2] * board.cols + move_[3]
+
+    # A member function that sorts the moves of a position, best first.
+    def orderMoves(self, board, moves, tableMove, ply):
+        killers = self.killers[ply] if ply < self.maxPly else ()
+        history = self.getHistory(board, board.turn)
+        scores = dict()
+
+        for move_ in moves:
+            code = transposition.encodeMove(move_[0], move_[1], move_[2], move_[3], move_[5], board.cols)
+            captured = exchange.getCapturedPiece(board, *move_[:5])
+
+            if code == tableMove:
+                scores[move_] = HASH_MOVE
+            elif captured is not None or move_[5]:
+                gain = (captured.value if captured is not None else 0) + (piece.numToPiece[move_[5]].value if move_[5] else 0)
+                scores[move_] = CAPTURE + 16 * gain - exchange.getExchangeValue(board.get(move_[0], move_[1])) // 100
+            elif code in killers:
+                scores[move_] = KILLER + KILLERS_PER_PLY - killers.index(code)
+            else:
+                scores[move_] = history[self.getHistoryIndex(board, move_)]
+
+        moves.sort(key=scores.__getitem__, reverse=True)
+
+    # A member function that learns from a move that cut off the search of a position, which was the given one in the order of its moves.
+    # A quiet move becomes a killer move of the ply and gains history, by more the deeper the search below it was.
+    def recordCutoff(self, board, move_, depth, ply, index):
+        self.cutoffs += 1
+        if index == 0:
+            self.firstMoveCutoffs += 1
+
+        if exchange.getCapturedPiece(board, *move_[:5]) is not None or move_[5]:
+            return
+
+        code = transposition.encodeMove(move_[0], move_[1], move_[2], move_[3], move_[5], board.cols)
+        if ply < self.maxPly and self.killers[ply][0] != code:
+            self.killers[ply] = [code] + self.killers[ply][:KILLERS_PER_PLY - 1]
+
+        history = self.getHistory(board, board.turn)
+        i = self.getHistoryIndex(board, move_)
+        history[i] = min(HISTORY_LIMIT, history[i] + depth * depth)
+
+    # A member function that returns the share of the cutoffs made by the first move searched, which is high when the moves are well sorted.
+    def getFirstMoveCutoffRate(self):
+        return float(self.firstMoveCutoffs) / self.cutoffs if self.cutoffs else 0.0
+
+
+def main():
+    print("Please run the Chess_by_Eric_Liu.pyde file to run the program.")
+
+
+if __name__ == "__main__":
+    main()
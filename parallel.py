@@ -0,0 +1,197 @@
+import os
+import sys
+import time
+import engine
+import perft
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    import multiprocessing
+except ImportError:  # Jython has no multiprocessing, so only the sequential engine can be used there.
+    multiprocessing = None
+
+
+# The state of a worker process: its own engine, whose transposition table lasts from one task to the next, and the chessboard of the
+# search it is working on, which is only unpickled once per search.
+workerEngine = None
+workerSearch = None, None
+
+
+# A function that readies a worker process. It runs once in every worker as the pool starts.
+def initializeWorker(megabytes):
+    global workerEngine
+    workerEngine = engine.Engine(megabytes=megabytes, maxTime=None)
+
+
+# A function that searches one root move in a worker process, and returns the move with its score, the nodes searched, whether the time
+# ran out and the moves expected to follow it.
+def searchRootMove(task):
+    global workerSearch
+    searchId, data, move_, depth, alpha, beta, startTime, maxTime = task
+
+    if workerSearch[0] != searchId:
+        workerSearch = searchId, pickle.loads(data)
+        workerEngine.table.newSearch()
+        workerEngine.orderer.newSearch()
+    board = workerSearch[1]
+
+    workerEngine.maxTime = maxTime
+    workerEngine.resetSearch(startTime)
+
+    board.makeMove(*move_)
+    score = -workerEngine.negamax(board, depth - 1, -beta, -alpha, 1)
+    variation = workerEngine.getPrincipalVariation(board, depth - 1) if not workerEngine.stopped else list()
+    board.unmakeMove()
+
+    return move_, score, workerEngine.nodes, workerEngine.stopped, variation
+
+
+# A ParallelEngine class that spreads the search of the root moves over a pool of worker processes, each with its own copy of the chessboard
+# and its own transposition table, as the rules are pure Python and threads would take turns. At each depth, the best move of the previous
+# depth is searched first to get a score to beat; the other moves are then searched at the same time, each only to show that it does not
+# beat that score, and the few that do are searched again for their exact score. It has the same interface as the Engine class.
+class ParallelEngine:
+    # An __init__ member function that gets called when a ParallelEngine instance is created. It creates the representation of the object.
+    def __init__(self, workers=None, megabytes=16, maxTime=1.0, maxDepth=64, book=None):
+        if multiprocessing is None:
+            raise RuntimeError("multiprocessing is not available, so the parallel search cannot run")
+
+        self.workers = workers or multiprocessing.cpu_count()
+        self.megabytes = megabytes
+        self.maxTime = maxTime
+        self.maxDepth = maxDepth
+        self.book = book
+        self.pool = multiprocessing.Pool(self.workers, initializeWorker, (megabytes,))
+        self.searches = 0
+        self.depth = 0
+        self.score = 0
+        self.nodes = 0
+        self.bestMove = None
+        self.variation = list()
+
+    # A member function that returns the best move of the player to move, as a (r1, c1, r2, c2, moveType, promotion) tuple, or None if the
+    # player has no legal move.
+    def search(self, board):
+        self.searches += 1
+        self.startTime = time.time()
+        self.depth = 0
+        self.score = 0
+        self.nodes = 0
+        self.variation = list()
+
+        if self.book is not None:
+            self.bestMove = self.book.chooseMove(board)
+            if self.bestMove is not None:
+                return self.bestMove
+
+        moves = board.getLegalMoves()
+        if not moves:
+            self.bestMove = None
+            return None
+        self.bestMove = moves[0]
+
+        searchId = os.getpid(), id(self), self.searches
+        data = pickle.dumps(board.copy(), pickle.HIGHEST_PROTOCOL)
+
+        for depth in xrange(1, self.maxDepth + 1):
+            createTask = lambda move_, alpha, beta: (searchId, data, move_, depth, alpha, beta, self.startTime, self.maxTime)
+            results = self.searchIteration(moves, createTask)
+            if results is None:
+                break
+
+            bestMove, score, variation, scores = results
+            self.depth = depth
+            self.score = score
+            self.bestMove = bestMove
+            self.variation = [bestMove] + variation
+            moves.sort(key=lambda move_: -scores[move_])  # The best move is searched first in the next iteration, then the closest ones.
+
+            if abs(score) > engine.MATE_BOUND or self.isOutOfBudget():
+                break
+
+        return self.bestMove
+
+    # A member function that searches every root move at one depth. It returns the best move, its score and expected continuation, and a
+    # score for every move that can be used to sort them, or None if the time ran out.
+    def searchIteration(self, moves, createTask):
+        move_, alpha, nodes, stopped, variation = self.pool.apply(searchRootMove, (createTask(moves[0], -engine.INFINITY, engine.INFINITY),))
+        self.nodes += nodes
+        if stopped:
+            return None
+
+        bestMove = moves[0]
+        scores = {bestMove: alpha}
+        failedHigh = list()
+
+        for move_, score, nodes, stopped, moveVariation in self.pool.imap_unordered(searchRootMove, [createTask(move_, alpha, alpha + 1) for move_ in moves[1:]]):
+            self.nodes += nodes
+            if stopped:
+                return None
+            scores[move_] = score
+            if score > alpha:
+                failedHigh.append(move_)
+
+        bestScore = alpha
+        for move_, score, nodes, stopped, moveVariation in self.pool.imap_unordered(searchRootMove, [createTask(move_, alpha, engine.INFINITY) for move_ in failedHigh]):
+            self.nodes += nodes
+            if stopped:
+                return None
+            scores[move_] = score
+            if score > bestScore:
+                bestMove, bestScore, variation = move_, score, moveVariation
+
+        return bestMove, bestScore, variation, scores
+
+    # A member function that determines if another iteration should be started, which is when no more than half of the time is used.
+    def isOutOfBudget(self):
+        return self.maxTime is not None and time.time() - self.startTime >= self.maxTime / 2.0
+
+    # A member function that returns the moves expected to be played from the position of the last search, starting with the best move.
+    def getPrincipalVariation(self, board=None, maxLength=None):
+        return self.variation[:maxLength]
+
+    # A member function that stops the worker processes.
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+
+# A function that measures how the parallel search scales, by searching the reference positions to a fixed depth with the sequential engine
+# and with pools of each number of workers, then reporting the time taken and the speedup over the sequential engine.
+def benchmark(depth=4, workerCounts=(1, 2, 4, 8), out=sys.stdout):
+    out.write("%d core(s) available\n" % multiprocessing.cpu_count())
+    timings = dict()
+
+    for workers in (0,) + tuple(workerCounts):
+        searcher = engine.Engine(maxTime=None, maxDepth=depth) if workers == 0 else ParallelEngine(workers, maxTime=None, maxDepth=depth)
+        start = time.time()
+        nodes = 0
+
+        for name, variant_, expected in perft.positions:
+            searcher.search(perft.createChessboard(variant_))
+            nodes += searcher.nodes
+
+        timings[workers] = time.time() - start
+        if workers:
+            searcher.close()
+
+        out.write("%-12s %10d nodes %8.2f s  speedup %.2f\n" % ("sequential" if workers == 0 else "%d worker(s)" % workers, nodes, timings[workers],
+                                                                 timings[0] / timings[workers]))
+
+
+def main():
+    # Usage: python parallel.py [depth] [worker counts...]
+    if multiprocessing is None:
+        print("multiprocessing is not available, so the parallel search cannot run.")
+        return
+
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    benchmark(depth, tuple(int(argument) for argument in sys.argv[2:]) or (1, 2, 4, 8))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import sys
+import time
+import chessboard
+import variant
+import piece
+
+
+# Reference positions follow. Each is a Variant whose template holds the position, so that a headless chessboard can be built from it directly.
+# All of them have white to move and every piece on its home square is treated as never moved, which matches their castling rights.
+
+
+class Kiwipete(variant.Variant):
+    rows = 8
+    cols = 8
+    template = [[-5, 0, 0, 0, -1, 0, 0, -5],
+                [-6, 0, -6, -6, -2, -6, -3, 0],
+                [-3, -4, 0, 0, -6, -4, -6, 0],
+                [0, 0, 0, 6, 4, 0, 0, 0],
+                [0, -6, 0, 0, 6, 0, 0, 0],
+                [0, 0, 4, 0, 0, 2, 0, -6],
+                [6, 6, 6, 3, 3, 6, 6, 6],
+                [5, 0, 0, 0, 1, 0, 0, 5]]
+
+
+class Endgame(variant.Variant):
+    rows = 8
+    cols = 8
+    template = [[0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, -6, 0, 0, 0, 0, 0],
+                [0, 0, 0, -6, 0, 0, 0, 0],
+                [1, 6, 0, 0, 0, 0, 0, -5],
+                [0, 5, 0, 0, 0, -6, 0, -1],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 6, 0, 6, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0]]
+
+
+class Promotions(variant.Variant):
+    rows = 8
+    cols = 8
+    template = [[-5, 0, 0, 0, -1, 0, 0, -5],
+                [6, -6, -6, -6, 0, -6, -6, -6],
+                [0, -3, 0, 0, 0, -4, -3, 4],
+                [-4, 6, 0, 0, 0, 0, 0, 0],
+                [3, 3, 6, 0, 6, 0, 0, 0],
+                [-2, 0, 0, 0, 0, 4, 0, 0],
+                [6, -6, 0, 6, 0, 0, 6, 6],
+                [5, 0, 0, 2, 0, 5, 1, 0]]
+
+
+class Middlegame(variant.Variant):
+    rows = 8
+    cols = 8
+    template = [[-5, -4, -3, -2, 0, -1, 0, -5],
+                [-6, -6, 0, 6, -3, -6, -6, -6],
+                [0, 0, -6, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 3, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [6, 6, 6, 0, 4, -4, 6, 6],
+                [5, 4, 3, 2, 1, 0, 0, 5]]
+
+
+# A list of the reference positions with their published node counts, starting from depth 1.
+positions = [("Initial", variant.Standard, [20, 400, 8902, 197281, 4865609]),
+             ("Kiwipete", Kiwipete, [48, 2039, 97862, 4085603]),
+             ("Endgame", Endgame, [14, 191, 2812, 43238, 674624]),
+             ("Promotions", Promotions, [6, 264, 9467, 422333]),
+             ("Middlegame", Middlegame, [44, 1486, 62379, 2103487])]
+
+# A function that creates a headless chessboard of a variant, with white at the bottom.
+def createChessboard(variant_=variant.Standard):
+    return chessboard.Chessboard(variant=variant_)
+
+
+# A function that converts a move into its coordinate notation, as in "e7e8q".
+def moveToString(board, move_):
+    r1, c1, r2, c2, moveType, promotion = move_
+    return "".join(board.cellToPos(r1, c1) + board.cellToPos(r2, c2)) + piece.symbols[promotion]
+
+
+# A function that counts the leaf nodes of the move tree of a given depth.
+def perft(board, depth):
+    moves = board.getLegalMoves()
+
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+
+    nodes = 0
+    for move_ in moves:
+        board.makeMove(*move_)
+        nodes += perft(board, depth - 1)
+        board.unmakeMove()
+
+    return nodes
+
+
+# A function that counts the leaf nodes under each of the root moves, which is used to find the move where a wrong count comes from.
+def divide(board, depth):
+    counts = dict()
+
+    for move_ in board.getLegalMoves():
+        board.makeMove(*move_)
+        counts[moveToString(board, move_)] = perft(board, depth - 1)
+        board.unmakeMove()
+
+    return counts
+
+
+# A function that runs perft on every reference position up to a depth, then reports the node counts, their correctness and the speed.
+def benchmark(maxDepth=3, out=sys.stdout):
+    passed = True
+    totalNodes = 0
+    totalTime = 0.0
+
+    for name, variant_, expected in positions:
+        for depth in xrange(1, min(maxDepth, len(expected)) + 1):
+            board = createChessboard(variant_)
+            start = time.time()
+            nodes = perft(board, depth)
+            elapsed = time.time() - start
+
+            totalNodes += nodes
+            totalTime += elapsed
+            passed = passed and nodes == expected[depth - 1]
+
+            out.write("%-12s depth %d: %10d nodes %10.3f s %10.0f nps  %s\n" % (name, depth, nodes, elapsed, nodes / max(elapsed, 1e-9),
+                                                                              "ok" if nodes == expected[depth - 1] else "FAILED (expected %d)" % expected[depth - 1]))
+
+    out.write("Total: %d nodes in %.3f s (%.0f nps)\n" % (totalNodes, totalTime, totalNodes / max(totalTime, 1e-9)))
+
+    return passed
+
+
+def main():
+    # Usage: python perft.py [depth]  or  python perft.py divide <position name or FEN> <depth>
+    if len(sys.argv) > 1 and sys.argv[1] == "divide":
+        variants = dict((name, variant_) for name, variant_, expected in positions)
+        board = createChessboard(variants[sys.argv[2]]) if sys.argv[2] in variants else chessboard.Chessboard.fromFEN(sys.argv[2])
+        counts = divide(board, int(sys.argv[3]))
+        for move_ in sorted(counts):
+            print("%s: %d" % (move_, counts[move_]))
+        print("Total: %d" % sum(counts.values()))
+    else:
+        sys.exit(0 if benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3) else 1)
+
+
+if __name__ == "__main__":
+    main()
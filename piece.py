@@ -1,6 +1,4 @@
-from collections import defaultdict
 import move
-import widget
 
 
 # An enumeration class that contains possible chess pieces' colors.
@@ -23,20 +21,21 @@ class PIECE:
 class Piece:
     pieceType = 0
     moves = list()
+    value = 0  # The worth of the piece in centipawns, which the engine counts material with. The king is never traded, so it has none.
     
     # An __init__ member function that gets called as the Piece instance is created. It creates the representation of the object.
-    def __init__(self, chessboard, color, r, c, image):
+    def __init__(self, chessboard, color, r, c):
         self.chessboard = chessboard
         self.color = color
         self.r = r
         self.c = c
-        self.actualR = r
-        self.actualC = c
-        self.image = image
         self.forward = -chessboard.orientation * color
         self.neverMoved = True
         self.cached = False
         self.lastMoved = -1
+        self.slides = any(moveType.isSliding for moveType in self.moves)
+        self.attacks = None  # The cells the piece attacks, while it is in the attack maps of the chessboard.
+        self.bit = 0  # The bit standing for the piece in the attack maps, given when it first enters them.
         
         self.nextPositions = dict()
         
@@ -70,56 +69,18 @@ class Piece:
         self.r = r
         self.c = c
         
-    # A member function that makes a move.
-    def move(self, r, c):
-        self.nextPositions[r, c].makeMove(self.chessboard, self, r, c)
-        self.neverMoved = False
-        self.nextPositions = dict()
-    
     # A member function that updates the piece. This is unnecessary for most implementation of Piece classes. This runs every time a move is made on the chessboard.
     def update(self):
         pass
     
-    # A member function that moves the actual location of the chess piece image.
-    def moveImage(self):
-        self.actualR += (self.r - self.actualR) * min(1, 15 / frameRate)
-        self.actualC += (self.c - self.actualC) * min(1, 15 / frameRate)
-        
-    # A member function that displays the chess piece.
-    def display(self):
-        self.moveImage()
-        coord = self.chessboard.cellToCoord(self.actualR, self.actualC)
-        image(self.image, coord[0], coord[1], 0.95 * self.chessboard.cellWidth, 0.95 * self.chessboard.cellHeight)
-        
     # A member function that determines if a piece is vulnerable. Since this will only be invoked in
-    # instances of King class (which is inherited from Piece class), it is named "isInCheck".
+    # instances of King class (which is inherited from Piece class), it is named "isInCheck". It returns the cell of a checking piece, if any.
     def isInCheck(self):
-        possibleEnemyPositions = defaultdict(set)
-        
-        for move_ in move.moves:
-            if move_.isCheckable:
-                for position in move_.getNextPositions(self.chessboard, self, True):
-                    possibleEnemyPositions[position].add(move_)
-
-        for position, moves in possibleEnemyPositions.items():
-            for move_ in moves:
-                if self.chessboard.isOccupied(*position) and self.chessboard.cellColor(*position) == -self.color and move_ in self.chessboard.get(*position).moves:
-                    return position
-        
-        return None
+        return self.chessboard.getSquareAttacker(self.r, self.c, -self.color)
     
     # A member function that changes the piece into another piece. So far, this is only used for pawn promotion.
     def changeTo(self, chessPiece):
-        newChessPiece = numToPiece[abs(chessPiece)](self.chessboard, chessPiece / abs(chessPiece), self.r, self.c, self.chessboard.master.chessPieceImages[chessPiece])
-        newChessPiece.neverMoved = False
-        newChessPiece.actualR = self.actualR
-        newChessPiece.actualC = self.actualC
-        self.chessboard.set(self.r, self.c, newChessPiece)
-        self.chessboard.master.destroyPopUp()
-        self.chessboard.checkForCheck()
-        self.chessboard.deleteCache()
-        self.chessboard.checkResults()
-        self.chessboard.master.sendPromotionToAI(symbols[abs(chessPiece)])
+        self.chessboard.changePiece(self.r, self.c, abs(chessPiece))
 
 
 # Implementation of individual piece type classes follow. Each contains possible moves and overrides member function from base Piece class if necessary.
@@ -128,78 +89,55 @@ class Piece:
 class King(Piece):
     pieceType = PIECE.KING
     moves = [move.Adjacent, move.Castling]
+    value = 0
     
-    def __init__(self, chessboard, color, r, c, image):
-        Piece.__init__(self, chessboard, color, r, c, image)
+    def __init__(self, chessboard, color, r, c):
+        Piece.__init__(self, chessboard, color, r, c)
 
 
 class Queen(Piece):
     pieceType = PIECE.QUEEN
     moves = [move.RankFile, move.Diagonal]
+    value = 900
     
-    def __init__(self, chessboard, color, r, c, image):
-        Piece.__init__(self, chessboard, color, r, c, image)
+    def __init__(self, chessboard, color, r, c):
+        Piece.__init__(self, chessboard, color, r, c)
     
     
 class Bishop(Piece):
     pieceType = PIECE.BISHOP
     moves = [move.Diagonal]
+    value = 330
     
-    def __init__(self, chessboard, color, r, c, image):
-        Piece.__init__(self, chessboard, color, r, c, image)
+    def __init__(self, chessboard, color, r, c):
+        Piece.__init__(self, chessboard, color, r, c)
     
     
 class Knight(Piece):
     pieceType = PIECE.KNIGHT
     moves = [move.LJump]
+    value = 320
     
-    def __init__(self, chessboard, color, r, c, image):
-        Piece.__init__(self, chessboard, color, r, c, image)
+    def __init__(self, chessboard, color, r, c):
+        Piece.__init__(self, chessboard, color, r, c)
     
     
 class Rook(Piece):
     pieceType = PIECE.ROOK
     moves = [move.RankFile]
+    value = 500
     
-    def __init__(self, chessboard, color, r, c, image):
-        Piece.__init__(self, chessboard, color, r, c, image)
+    def __init__(self, chessboard, color, r, c):
+        Piece.__init__(self, chessboard, color, r, c)
     
     
 class Pawn(Piece):
     pieceType = PIECE.PAWN
     moves = [move.Forward, move.DoubleForward, move.ForwardDiagonal, move.EnPassant]
+    value = 100
     
-    def __init__(self, chessboard, color, r, c, image):
-        Piece.__init__(self, chessboard, color, r, c, image)
-        
-    # This checks if a pawn can be promoted. If so, it creates a pop up that allows the user to choose.
-    def update(self):
-        if self.r == (0 if self.forward == -1 else self.chessboard.rows - 1) and self.color in self.chessboard.master.settings["playAs"]:
-            xC, yC = self.chessboard.cellToCoord(self.r, self.c)
-            imageWidth = 0.95 * self.chessboard.cellWidth
-            imageHeight = 0.95 * self.chessboard.cellHeight
-            cellYOffset = self.chessboard.cellHeight
-            fC = color(255) if self.color == COLOR.BLACK else color(0)
-            sC = color(0) if self.color == COLOR.BLACK else color(255)
-            
-            if self.chessboard.master.boardAngle != 0:
-                xC = width / 2.0 + (width / 2.0 - xC)
-                yC = height / 2.0 + (height / 2.0 - yC)
-                cellYOffset *= -1
-            
-            self.chessboard.master.createPopUp([widget.Rect(width / 2.0, height / 2.0, width, height, color(1, 200), color(1, 200), 0, False), \
-                                                widget.Ellipse(xC, yC - self.forward * cellYOffset, self.chessboard.cellWidth, self.chessboard.cellHeight, fC, sC, 5, True), \
-                                                widget.Ellipse(xC, yC - self.forward * 2 * cellYOffset, self.chessboard.cellWidth, self.chessboard.cellHeight, fC, sC, 5, True), \
-                                                widget.Ellipse(xC, yC - self.forward * 3 * cellYOffset, self.chessboard.cellWidth, self.chessboard.cellHeight, fC, sC, 5, True), \
-                                                widget.Ellipse(xC, yC - self.forward * 4 * cellYOffset, self.chessboard.cellWidth, self.chessboard.cellHeight, fC, sC, 5, True), \
-                                                widget.ImageButton(xC, yC - self.forward * cellYOffset, imageWidth, imageHeight, \
-                                                                   self.chessboard.master.chessPieceImages[self.color * PIECE.QUEEN], lambda: self.changeTo(self.color * PIECE.QUEEN), False), \
-                                                widget.ImageButton(xC, yC - self.forward * 2 * cellYOffset, imageWidth, imageHeight, \
-                                                                   self.chessboard.master.chessPieceImages[self.color * PIECE.KNIGHT], lambda: self.changeTo(self.color * PIECE.KNIGHT), False), \
-                                                widget.ImageButton(xC, yC - self.forward * 3 * cellYOffset, imageWidth, imageHeight, \
-                                                                   self.chessboard.master.chessPieceImages[self.color * PIECE.ROOK], lambda: self.changeTo(self.color * PIECE.ROOK), False), \
-                                                widget.ImageButton(xC, yC - self.forward * 4 * cellYOffset, imageWidth, imageHeight, \
-                                                                   self.chessboard.master.chessPieceImages[self.color * PIECE.BISHOP], lambda: self.changeTo(self.color * PIECE.BISHOP), False)])
+    def __init__(self, chessboard, color, r, c):
+        Piece.__init__(self, chessboard, color, r, c)
 
 
 # A list that contains piece types that corresponds to the index.
@@ -0,0 +1,93 @@
+import time
+import piece
+
+
+# Times are in seconds.
+MOVES_TO_GO = 30  # How many more moves a game is assumed to last when sharing out the time left.
+INCREMENT_SHARE = 0.75  # The share of the increment spent on the move that earns it.
+MOVE_OVERHEAD = 0.05  # The time lost on each move between the game and the AI, which is kept in hand.
+MIN_MOVE_TIME = 0.05
+
+
+# A Clock class that holds the time left to each player, which runs down for the player to move. A player gets the increment back after each
+# move they make, and loses once their time runs out.
+class Clock:
+    # An __init__ member function that gets called when a Clock instance is created. It creates the representation of the object.
+    def __init__(self, base, increment=0, timer=time.time):
+        self.base = base
+        self.increment = increment
+        self.timer = timer
+        self.remaining = {piece.COLOR.WHITE: float(base), piece.COLOR.BLACK: float(base)}
+        self.running = None  # The color whose time is running down, if any.
+        self.startTime = None
+
+    # A member function that starts the time of a color running down.
+    def start(self, color):
+        self.stop()
+        self.running = color
+        self.startTime = self.timer()
+
+    # A member function that stops the clock, charging the running color for the time it has used.
+    def stop(self):
+        if self.running is not None:
+            self.remaining[self.running] -= self.timer() - self.startTime
+            self.running = None
+
+    # A member function that ends the move of the running color: its time stops, it gets the increment and the time of the other color starts.
+    def press(self):
+        color = self.running
+        if color is None:
+            return
+
+        self.stop()
+        self.remaining[color] += self.increment
+        self.start(-color)
+
+    # A member function that returns the time a color has left.
+    def getRemaining(self, color):
+        if color == self.running:
+            return self.remaining[color] - (self.timer() - self.startTime)
+        return self.remaining[color]
+
+    # A member function that determines if the time of a color has run out.
+    def hasFlagged(self, color):
+        return self.getRemaining(color) <= 0
+
+    # A member function that returns the time a color has left as minutes and seconds, with tenths of a second in the last ten seconds.
+    def format(self, color):
+        remaining = max(0.0, self.getRemaining(color))
+        if remaining < 10:
+            return "0:%04.1f" % remaining
+        return "%d:%02d" % (remaining // 60, remaining % 60)
+
+
+# A TimeManager class that decides how long the AI may think about a move. With a clock, it shares the time left out over the moves the game
+# is assumed to have left and spends most of the increment, always keeping enough in hand not to lose on time. Without one, it gives a fixed
+# time. Either way, the time never exceeds the ceiling, if one is set, so that an answer never takes longer than that.
+class TimeManager:
+    # An __init__ member function that gets called when a TimeManager instance is created. It creates the representation of the object.
+    def __init__(self, moveTime=1.0, maxMoveTime=None, movesToGo=MOVES_TO_GO, overhead=MOVE_OVERHEAD):
+        self.moveTime = moveTime
+        self.maxMoveTime = maxMoveTime
+        self.movesToGo = movesToGo
+        self.overhead = overhead
+
+    # A member function that returns the time the AI may spend on a move of a color.
+    def getMoveTime(self, clock=None, color=None):
+        if clock is None:
+            moveTime = self.moveTime
+        else:
+            remaining = clock.getRemaining(color)
+            moveTime = min(remaining / self.movesToGo + clock.increment * INCREMENT_SHARE, remaining - self.overhead)
+
+        if self.maxMoveTime is not None:
+            moveTime = min(moveTime, self.maxMoveTime)
+        return max(moveTime, MIN_MOVE_TIME)
+
+
+def main():
+    print("Please run the Chess_by_Eric_Liu.pyde file to run the program.")
+
+
+if __name__ == "__main__":
+    main()
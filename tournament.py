@@ -0,0 +1,414 @@
+import sys
+import math
+import time
+import random
+import inspect
+import argparse
+try:
+    import multiprocessing
+except ImportError:  # Jython has no multiprocessing, so the games are played one after another there.
+    multiprocessing = None
+import piece
+import move
+import variant
+import chessboard
+import engine
+import book
+import enginepool
+import engineconfig
+import AI
+
+
+# The variants the games can be played in, as the Variant classes of variant.py by name.
+VARIANTS = dict((name, cls) for name, cls in inspect.getmembers(variant, inspect.isclass) if issubclass(cls, variant.Variant) and cls.rows)
+
+OPENING_PLIES = 6  # How many moves of the lines of the opening book an opening keeps.
+OPENINGS_SEED = 0  # The seed the openings are mixed with.
+MAX_PLIES = 400  # How long a game may last before it is adjudicated a draw.
+MOVE_TIMEOUT = 60.0  # How long, in seconds, a UCI program may take to answer before it forfeits the game.
+DEFAULT_TIME = 0.1  # The seconds an opponent thinks about each move if it is given no limit.
+
+# The bounds of the sequential probability ratio test, as the Elo differences of the two hypotheses and the chances of accepting the wrong
+# one.
+ELO0 = 0.0
+ELO1 = 5.0
+ALPHA = 0.05
+BETA = 0.05
+
+
+# A function that returns the openings of standard games, as moves in coordinate notation: the first moves of the lines the opening book is
+# made from, each kept once, so that the games and the book share the same openings. The lines are grouped by opening, so they are mixed, in
+# the same order every time, for a short match to play several kinds. Each is played twice, with the players swapping colors, so that
+# neither gets the better side of it. Other variants start from their own position, which for Chess960 is shuffled the same way for both
+# games. Without the lines, every game starts from the starting position.
+def getOpenings(plies=OPENING_PLIES):
+    try:
+        lines = book.readLines()
+    except IOError:
+        return [""]
+
+    openings = list()
+    for line in lines:
+        opening = " ".join(line[:plies])
+        if opening not in openings:
+            openings.append(opening)
+
+    random.Random(OPENINGS_SEED).shuffle(openings)
+    return openings or [""]
+
+
+OPENINGS = getOpenings()
+
+
+# A NativePlayer class that plays with the built-in engine, which can play every variant.
+class NativePlayer:
+    # An __init__ member function that gets called as the NativePlayer instance is created. It creates the representation of the object.
+    def __init__(self, maxTime=None, maxDepth=64, maxNodes=None, megabytes=16):
+        self.engine = engine.Engine(megabytes=megabytes, maxTime=maxTime, maxNodes=maxNodes, maxDepth=maxDepth)
+
+    # A member function that readies the player for a new game, which forgets the positions of the last one.
+    def newGame(self):
+        self.engine.table.clear()
+
+    # A member function that returns the move of the player to move, or None if it has none.
+    def getMove(self, board, startFEN, moves):
+        return self.engine.search(board.copy())
+
+    # A member function that stops the player.
+    def close(self):
+        pass
+
+
+# A UCIPlayer class that plays with a UCI program run with an engine profile, which is told the moves of the game in coordinate notation.
+class UCIPlayer:
+    # An __init__ member function that gets called as the UCIPlayer instance is created. It creates the representation of the object.
+    def __init__(self, profile, limits):
+        self.profile = profile
+        self.limits = limits  # The limits of each search, as the arguments of the go command.
+        self.process = None
+        self.launch()
+
+    # A member function that launches the program and sets the options of the profile.
+    def launch(self):
+        self.process = enginepool.EngineProcess(self.profile.path)
+        if not self.process.isReady(enginepool.STARTUP_TIMEOUT):
+            self.process.quit()
+            raise RuntimeError("the engine at %s does not answer" % self.profile.path)
+        self.process.setOptions(self.profile.options)
+
+    # A member function that readies the program for a new game, launching it again if it has died or stopped answering.
+    def newGame(self):
+        if not self.process.newGame():
+            self.process.quit()
+            self.launch()
+
+    # A member function that returns the move of the player to move, or None if the program does not answer with a legal move in time.
+    def getMove(self, board, startFEN, moves):
+        self.process.send("position fen " + startFEN + ("" if not moves else " moves " + " ".join(moves)))
+        request = AI.MoveRequest()
+        self.process.searches.append(request)
+        self.process.send("go " + self.limits)
+
+        answer = request.getMove(MOVE_TIMEOUT)
+        if answer is None or answer == "(none)":
+            return None
+        return book.findMove(board, answer)
+
+    # A member function that quits the program.
+    def close(self):
+        self.process.quit()
+
+
+# A function that creates the player of an opponent, written as its kind followed by its settings, as in "native:depth=4" or
+# "stockfish:profile=Default:time=0.1". Either kind may be limited by time, in seconds, depth or nodes, and is otherwise given a tenth of a
+# second a move. The built-in engine may also be given the size of its hash table in megabytes, and a UCI program is run with a profile of
+# data/engines.ini.
+def createPlayer(opponent):
+    words = opponent.split(":")
+    kind = words[0]
+    settings = dict(word.split("=", 1) for word in words[1:])
+    if not set(settings) & set(["time", "depth", "nodes"]):
+        settings["time"] = str(DEFAULT_TIME)
+
+    if kind == "native":
+        return NativePlayer(maxTime=float(settings["time"]) if "time" in settings else None, maxDepth=int(settings.get("depth", 64)),
+                            maxNodes=int(settings["nodes"]) if "nodes" in settings else None, megabytes=int(settings.get("hash", 16)))
+    elif kind == "stockfish":
+        limits = []
+        if "time" in settings:
+            limits.append("movetime %d" % (1000 * float(settings["time"])))
+        if "depth" in settings:
+            limits.append("depth " + settings["depth"])
+        if "nodes" in settings:
+            limits.append("nodes " + settings["nodes"])
+        return UCIPlayer(engineconfig.getProfile(settings.get("profile", engineconfig.DEFAULT_PROFILE)), " ".join(limits))
+    raise ValueError("there is no opponent of the kind %s" % kind)
+
+
+# A function that returns a move in standard algebraic notation, which needs the legal moves of the position to tell apart the pieces of the
+# same type that can move to the same cell. The move must not have been made yet.
+def toSAN(board, move_, legalMoves):
+    r1, c1, r2, c2, moveType, promotion = move_
+    chessPiece = board.get(r1, c1)
+    if moveType is move.Castling:
+        return "O-O" if c2 > c1 else "O-O-O"
+
+    file_, rank = board.cellToPos(r1, c1)
+    isCapture = board.isOccupied(r2, c2) or moveType is move.EnPassant
+    target = "".join(board.cellToPos(r2, c2))
+
+    if chessPiece.pieceType == piece.PIECE.PAWN:
+        return (file_ + "x" if isCapture else "") + target + ("=" + piece.symbols[promotion].upper() if promotion else "")
+
+    rivals = [other for other in legalMoves if other[2:4] == (r2, c2) and other[:2] != (r1, c1) and board.get(other[0], other[1]).pieceType == chessPiece.pieceType]
+    if not rivals:
+        disambiguation = ""
+    elif all(other[1] != c1 for other in rivals):
+        disambiguation = file_
+    elif all(other[0] != r1 for other in rivals):
+        disambiguation = rank
+    else:
+        disambiguation = file_ + rank
+
+    return piece.symbols[chessPiece.pieceType].upper() + disambiguation + ("x" if isCapture else "") + target
+
+
+# A function that creates the players of the worker, once in every worker process, so that they last from one game to the next.
+def initializeWorker(opponents, maxPlies):
+    global opponentNames, players, plyLimit
+    opponentNames = opponents
+    players = [createPlayer(opponent) for opponent in opponents]
+    plyLimit = maxPlies
+
+
+# A function that plays a game between the two players of the worker, and returns its number, its variant, the score of the first player,
+# the game in PGN and the plies it lasted. Each game is played on a headless chessboard, from the opening after the moves that fit the
+# variant. The game is drawn on a threefold repetition, by the fifty-move rule or once it has lasted too long, and a player that gives no
+# legal move loses.
+def playGame(game):
+    number, variantName, opening, swapped, seed = game
+    random.seed(seed)  # Both games of a pair of a shuffled variant start from the same position.
+    board = chessboard.Chessboard(variant=VARIANTS[variantName])
+    startFEN = board.toFEN()
+    white, black = (players[1], players[0]) if swapped else (players[0], players[1])
+    white.newGame()
+    black.newGame()
+
+    notations = []
+    sans = []
+    repetitions = {board.zobristKey: 1}
+    termination = None
+    forfeit = None
+
+    for notation in opening.split():
+        move_ = book.findMove(board, notation)
+        if move_ is None or board.result != chessboard.RESULT.UNDETERMINED:
+            break
+        playMove(board, move_, notations, sans, repetitions)
+
+    while board.result == chessboard.RESULT.UNDETERMINED:
+        player = white if board.turn == piece.COLOR.WHITE else black
+        move_ = player.getMove(board, startFEN, notations)
+        if move_ is None:
+            termination, forfeit = "forfeit", board.turn
+            break
+
+        playMove(board, move_, notations, sans, repetitions)
+        if repetitions[board.zobristKey] >= 3:
+            termination = "threefold repetition"
+        elif board.getHalfmoveClock() >= 100:
+            termination = "fifty-move rule"
+        elif len(notations) >= plyLimit:
+            termination = "adjudication"
+        if termination is not None:
+            break
+
+    if forfeit is not None:
+        whiteScore = 0.0 if forfeit == piece.COLOR.WHITE else 1.0
+    elif board.result == chessboard.RESULT.WHITE:
+        whiteScore = 1.0
+    elif board.result == chessboard.RESULT.BLACK:
+        whiteScore = 0.0
+    else:
+        whiteScore = 0.5
+
+    names = (opponentNames[1], opponentNames[0]) if swapped else (opponentNames[0], opponentNames[1])
+    pgn = toPGN(number, variantName, startFEN, names, whiteScore, sans, termination)
+    return number, variantName, 1.0 - whiteScore if swapped else whiteScore, pgn, len(notations)
+
+
+# A function that makes a move on the chessboard of a game, and records it in coordinate and standard algebraic notation, along with the
+# position it leads to.
+def playMove(board, move_, notations, sans, repetitions):
+    r1, c1, r2, c2, moveType, promotion = move_
+    san = toSAN(board, move_, board.getLegalMoves())
+    notations.append("".join(board.cellToPos(r1, c1) + board.cellToPos(r2, c2)) + piece.symbols[promotion])
+
+    board.makeMove(*move_)
+    board.update()
+    if board.isInCheck:
+        san += "#" if board.result != chessboard.RESULT.UNDETERMINED else "+"
+    sans.append(san)
+    repetitions[board.zobristKey] = repetitions.get(board.zobristKey, 0) + 1
+
+
+# A function that returns a game in PGN. A game of another variant than the standard one is given its variant and starting position.
+def toPGN(number, variantName, startFEN, names, whiteScore, sans, termination):
+    result = {1.0: "1-0", 0.0: "0-1", 0.5: "1/2-1/2"}[whiteScore]
+    tags = [("Event", "Tournament"), ("Site", "?"), ("Date", time.strftime("%Y.%m.%d")), ("Round", str(number + 1)), ("White", names[0]),
+            ("Black", names[1]), ("Result", result)]
+    if variantName != "Standard":
+        tags += [("Variant", variantName), ("SetUp", "1"), ("FEN", startFEN)]
+    if termination is not None:
+        tags.append(("Termination", termination))
+
+    lines = ['[%s "%s"]' % tag for tag in tags] + [""]
+    words = []
+    for i, san in enumerate(sans):
+        words.append("%d. %s" % (i // 2 + 1, san) if i % 2 == 0 else san)
+    words.append(result)
+
+    line = ""
+    for word in words:  # Lines of the moves are kept within 80 characters.
+        if line and len(line) + 1 + len(word) > 80:
+            lines.append(line)
+            line = word
+        else:
+            line = line + " " + word if line else word
+    lines.append(line)
+    return "\n".join(lines) + "\n\n"
+
+
+# A function that returns the Elo difference that a score, as the share of the points, stands for.
+def getElo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return 400.0 * math.log10(score / (1.0 - score))
+
+
+# A function that returns the score of the first player, the Elo difference and its margin at 95% confidence, from the results of the games.
+def getEloEstimate(wins, draws, losses):
+    games = wins + draws + losses
+    score = (wins + 0.5 * draws) / games
+    deviation = math.sqrt((wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games)
+    margin = 1.96 * deviation / math.sqrt(games)
+    return score, getElo(score), (getElo(score + margin) - getElo(score - margin)) / 2.0
+
+
+# A function that returns the log-likelihood ratio of the sequential probability ratio test of the first player being ELO1 rather than ELO0
+# stronger, from the results of the games. The test accepts the second hypothesis once the ratio reaches the upper bound, and the first one
+# once it reaches the lower bound.
+def getLLR(wins, draws, losses, elo0=ELO0, elo1=ELO1):
+    games = wins + draws + losses
+    if not wins or not losses:  # Until both players have won a game, the variance of the results is not known well enough.
+        return 0.0
+
+    score = (wins + 0.5 * draws) / games
+    variance = (wins + 0.25 * draws) / games - score ** 2
+    score0 = 1.0 / (1.0 + 10 ** (-elo0 / 400.0))
+    score1 = 1.0 / (1.0 + 10 ** (-elo1 / 400.0))
+    return (score1 - score0) * (2 * score - score0 - score1) / (2 * variance / games)
+
+
+# A function that returns the bounds of the log-likelihood ratio at which the sequential probability ratio test stops.
+def getLLRBounds(alpha=ALPHA, beta=BETA):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+# A function that returns the games of a tournament: as many pairs of games as asked for in every variant, each pair played from the same
+# opening with the players swapping colors.
+def createGames(variantNames, pairs, openings=OPENINGS):
+    games = []
+    for variantName in variantNames:
+        for pair in xrange(pairs):
+            opening = openings[pair % len(openings)] if variantName == "Standard" else ""
+            for swapped in (False, True):
+                games.append((len(games), variantName, opening, swapped, pair))
+    return games
+
+
+# A function that writes a table of the results of the first opponent against the second, in every variant and overall.
+def writeResults(results, variantNames, elapsed, out=sys.stdout):
+    lower, upper = getLLRBounds()
+    out.write("%-10s %6s %6s %6s %6s %7s %8s %7s %7s\n" % ("Variant", "Games", "Wins", "Draws", "Losses", "Score", "Elo", "+/-", "LLR"))
+
+    for variantName in variantNames + ["Total"]:
+        scores = [score for name, score in results if variantName in (name, "Total")]
+        wins, draws, losses = scores.count(1.0), scores.count(0.5), scores.count(0.0)
+        if not scores:
+            continue
+        score, elo, margin = getEloEstimate(wins, draws, losses)
+        out.write("%-10s %6d %6d %6d %6d %6.1f%% %8.1f %7.1f %7.2f\n" % (variantName, len(scores), wins, draws, losses, 100 * score, elo, margin,
+                                                                           getLLR(wins, draws, losses)))
+
+    out.write("SPRT elo0 %.1f elo1 %.1f: LLR bounds %.2f, %.2f\n" % (ELO0, ELO1, lower, upper))
+    out.write("%d games in %.1f s: %.0f games per hour\n" % (len(results), elapsed, 3600 * len(results) / elapsed))
+
+
+# A function that plays a tournament between two opponents, spreading the games over a pool of worker processes, and writes every game to a
+# PGN file as it ends. With the sequential probability ratio test, it stops once the test has decided. It returns the variant and the score
+# of the first opponent of every game played.
+def runTournament(opponents, games, workers=None, pgnPath=None, maxPlies=MAX_PLIES, sprt=False, out=sys.stdout):
+    lower, upper = getLLRBounds()
+
+    if multiprocessing is not None and workers != 1:
+        pool = multiprocessing.Pool(workers, initializeWorker, (opponents, maxPlies))
+        played = pool.imap_unordered(playGame, games)
+    else:
+        pool = None
+        initializeWorker(opponents, maxPlies)
+        played = (playGame(game) for game in games)
+
+    results = []
+    pgnFile = open(pgnPath, "w") if pgnPath is not None else None
+    try:
+        for number, variantName, score, pgn, plies in played:
+            results.append((variantName, score))
+            if pgnFile is not None:
+                pgnFile.write(pgn)
+                pgnFile.flush()
+            out.write("Game %d (%s) %s: %s in %d plies\n" % (number + 1, variantName, {1.0: "win", 0.5: "draw", 0.0: "loss"}[score],
+                                                               opponents[0], plies))
+
+            scores = [score_ for name, score_ in results]
+            llr = getLLR(scores.count(1.0), scores.count(0.5), scores.count(0.0))
+            if sprt and not lower < llr < upper:
+                out.write("SPRT stopped: %s\n" % ("H1 accepted" if llr >= upper else "H0 accepted"))
+                break
+    finally:
+        if pgnFile is not None:
+            pgnFile.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        else:
+            for player in players:
+                player.close()
+
+    return results
+
+
+def main():
+    # Usage: python tournament.py <opponent> <opponent> [--games N] [--variant name|all] [--workers N] [--pgn path] [--sprt]
+    parser = argparse.ArgumentParser(description="Plays games between two opponents, such as native:time=0.1 or stockfish:profile=Default:depth=8.")
+    parser.add_argument("opponents", nargs=2)
+    parser.add_argument("--games", type=int, default=100, help="the number of games in every variant, rounded up to an even number")
+    parser.add_argument("--variant", default="Standard", choices=sorted(VARIANTS) + ["all"])
+    parser.add_argument("--workers", type=int, default=None, help="the number of games played at once (all the cores by default)")
+    parser.add_argument("--pgn", default=None, help="the file the games are written to")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    parser.add_argument("--sprt", action="store_true", help="stop once the sequential probability ratio test has decided")
+    arguments = parser.parse_args()
+
+    variantNames = sorted(VARIANTS) if arguments.variant == "all" else [arguments.variant]
+    if any(opponent.startswith("stockfish") for opponent in arguments.opponents) and variantNames != ["Standard"]:
+        parser.error("the Stockfish AI program only plays the standard variant")
+
+    start = time.time()
+    results = runTournament(arguments.opponents, createGames(variantNames, (arguments.games + 1) // 2), arguments.workers, arguments.pgn,
+                            arguments.max_plies, arguments.sprt)
+    if results:
+        writeResults(results, variantNames, time.time() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from array import array
+
+
+# A BOUND enumeration class that holds what a stored score says about the true score of a position.
+class BOUND:
+    NONE = 0  # The entry is empty.
+    EXACT = 1
+    LOWER = 2  # The search failed high, so the true score is at least the stored score.
+    UPPER = 3  # The search failed low, so the true score is at most the stored score.
+
+
+# Each entry takes 12 bytes: the upper half of the Zobrist key to tell positions apart (4), the best move (4), the score (2), the depth (1)
+# and the bound together with the age (1). Entries are grouped in buckets, and a position may be stored in any entry of its bucket.
+ENTRY_SIZE = 12
+BUCKET_SIZE = 4
+AGE_BITS = 6
+AGE_MASK = (1 << AGE_BITS) - 1
+BOUND_MASK = 3
+NO_MOVE = 0
+
+
+# A function that packs a move into an integer that fits an entry. The cells are numbered row by row, and 0 stands for no move.
+def encodeMove(r1, c1, r2, c2, promotion, cols):
+    return ((r1 * cols + c1) << 12 | (r2 * cols + c2) << 4 | promotion) + 1
+
+
+# A function that unpacks a move packed by encodeMove, returning the cells it goes from and to and the piece type it promotes to.
+def decodeMove(code, cols):
+    code -= 1
+    r1, c1 = divmod(code >> 12, cols)
+    r2, c2 = divmod(code >> 4 & 255, cols)
+    return r1, c1, r2, c2, code & 15
+
+
+# A TranspositionTable class that remembers the results of searching positions, indexed by their Zobrist keys. The entries are held in
+# arrays allocated once for a memory budget, so the table never grows however long it is used, and old entries make room for new ones.
+class TranspositionTable:
+    # An __init__ member function that gets called when a TranspositionTable instance is created. It creates the representation of the object.
+    def __init__(self, megabytes=16):
+        self.resize(megabytes)
+
+    # A member function that allocates the entries for a memory budget in megabytes. The number of buckets is a power of two, so that a key
+    # is turned into a bucket by masking its lower bits. The stored entries are lost.
+    def resize(self, megabytes):
+        buckets = 1
+        while buckets * 2 * BUCKET_SIZE * ENTRY_SIZE <= megabytes * 1024 * 1024:
+            buckets *= 2
+
+        self.megabytes = megabytes
+        self.mask = buckets - 1
+        self.size = buckets * BUCKET_SIZE
+        self.checks = array("I", [0]) * self.size
+        self.moves = array("I", [0]) * self.size
+        self.scores = array("h", [0]) * self.size
+        self.depths = array("b", [0]) * self.size
+        self.flags = array("B", [0]) * self.size  # The bound in the lower bits and the age of the entry above them.
+        self.age = 0
+        self.resetStatistics()
+
+    # A member function that empties the table. Only the flags are cleared, as an entry whose bound is BOUND.NONE is empty.
+    def clear(self):
+        self.flags = array("B", [BOUND.NONE]) * self.size
+        self.age = 0
+        self.resetStatistics()
+
+    # A member function that resets the counters of the table.
+    def resetStatistics(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0  # The stores that overwrote an entry of another position.
+
+    # A member function that ages the table when a new search starts, so that entries left by earlier searches are replaced first.
+    def newSearch(self):
+        self.age = (self.age + 1) & AGE_MASK
+
+    # A member function that looks a position up. It returns the depth, bound, score and move stored for it, or None if it is not stored.
+    def probe(self, key):
+        self.probes += 1
+        check = key >> 32 & 0xFFFFFFFF
+        start = (key & self.mask) * BUCKET_SIZE
+
+        for i in xrange(start, start + BUCKET_SIZE):
+            if self.checks[i] == check and self.flags[i] & BOUND_MASK:
+                self.hits += 1
+                self.flags[i] = self.age << 2 | self.flags[i] & BOUND_MASK  # An entry that is still in use is refreshed.
+                return self.depths[i], self.flags[i] & BOUND_MASK, self.scores[i], self.moves[i]
+        return None
+
+    # A member function that stores the result of searching a position. The entry of the same position is overwritten if there is one;
+    # otherwise the entry of its bucket that is worth the least is, which is the shallowest one once older searches count as shallower.
+    def store(self, key, depth, bound, score, move=NO_MOVE):
+        self.stores += 1
+        check = key >> 32 & 0xFFFFFFFF
+        start = (key & self.mask) * BUCKET_SIZE
+        replaced = start
+        worth = None
+
+        for i in xrange(start, start + BUCKET_SIZE):
+            if self.checks[i] == check and self.flags[i] & BOUND_MASK:
+                replaced = i
+                if move == NO_MOVE:  # A search that found no best move keeps the one found before.
+                    move = self.moves[i]
+                break
+
+            entryWorth = self.getWorth(i)
+            if worth is None or entryWorth < worth:
+                replaced = i
+                worth = entryWorth
+        else:
+            if self.flags[replaced] & BOUND_MASK:
+                self.replacements += 1
+
+        self.checks[replaced] = check
+        self.moves[replaced] = move
+        self.scores[replaced] = max(-32768, min(32767, score))
+        self.depths[replaced] = max(-128, min(127, depth))
+        self.flags[replaced] = self.age << 2 | bound
+
+    # A member function that returns how much an entry is worth keeping, which is its depth lowered by the number of searches since it was used.
+    def getWorth(self, i):
+        if not self.flags[i] & BOUND_MASK:
+            return -1024
+        return self.depths[i] - 8 * ((self.age - (self.flags[i] >> 2)) & AGE_MASK)
+
+    # A member function that returns the share of the probes that found their position.
+    def getHitRate(self):
+        return float(self.hits) / self.probes if self.probes else 0.0
+
+    # A member function that returns the share of the entries, in thousandths, that were used by the current search, estimated from a sample.
+    def getUsage(self):
+        sample = min(self.size, 1000)
+        return sum(1 for i in xrange(sample) if self.flags[i] & BOUND_MASK and self.flags[i] >> 2 == self.age) * 1000 // sample
+
+    # A member function that returns the share of the entries that hold a position, counting every entry, which takes a while on a big table.
+    def getFillRate(self):
+        return float(sum(1 for flags in self.flags if flags & BOUND_MASK)) / self.size
+
+    # A member function that returns the counters of the table, for reporting.
+    def getStatistics(self):
+        return {"megabytes": self.megabytes,
+                "entries": self.size,
+                "probes": self.probes,
+                "hits": self.hits,
+                "hitRate": self.getHitRate(),
+                "stores": self.stores,
+                "replacements": self.replacements,
+                "fillRate": self.getFillRate(),
+                "usage": self.getUsage()}
+
+
+def main():
+    print("Please run the Chess_by_Eric_Liu.pyde file to run the program.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,72 @@
+import random
 import piece
 from copy import deepcopy
 
 
+# A Geometry class that holds, for every cell of a chessboard of a given size, the cells that each kind of move can reach on an empty
+# chessboard. The tables are built once, so that the move types walk precomputed tuples instead of working out the geometry on every call.
+# Each table is indexed by row and then column, and the pawn tables are also indexed by the forward direction of the pawn.
+class Geometry:
+    orthogonal = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+    diagonal = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+    knight = [(2, -1), (2, 1), (1, -2), (1, 2), (-1, -2), (-1, 2), (-2, -1), (-2, 1)]
+    
+    # An __init__ member function that gets called when a Geometry instance is created. It creates the representation of the object.
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.jumps = dict()
+        
+        self.kingCells = self.getJumps(self.orthogonal + self.diagonal)
+        self.knightCells = self.getJumps(self.knight)
+        self.rays = dict((direction, self.createRays(direction)) for direction in self.orthogonal + self.diagonal)
+        self.pawnPushes = dict((forward, self.getJumps([(1, 0)], forward)) for forward in (1, -1))
+        self.pawnDoublePushes = dict((forward, self.createDoublePushes(forward)) for forward in (1, -1))
+        self.pawnCaptures = dict((forward, self.getJumps([(1, -1), (1, 1)], forward)) for forward in (1, -1))
+        
+    # A member function that determines if a cell is on the chessboard.
+    def contains(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols
+        
+    # A member function that returns the table of cells reached from every cell by the given offsets, whose rows are multiplied by the
+    # forward direction. The table is built the first time it is asked for.
+    def getJumps(self, offsets, forward=1):
+        key = tuple(offsets), forward
+        
+        if key not in self.jumps:
+            self.jumps[key] = [[tuple((r + forward * dr, c + dc) for dr, dc in offsets if self.contains(r + forward * dr, c + dc)) \
+                                for c in xrange(self.cols)] for r in xrange(self.rows)]
+            
+        return self.jumps[key]
+    
+    # A member function that returns the table of cells passed by walking in a direction from every cell until the edge of the chessboard.
+    def createRays(self, direction):
+        rays = [[None] * self.cols for r in xrange(self.rows)]
+        
+        for r in xrange(self.rows):
+            for c in xrange(self.cols):
+                ray = list()
+                r2, c2 = r + direction[0], c + direction[1]
+                while self.contains(r2, c2):
+                    ray.append((r2, c2))
+                    r2 += direction[0]
+                    c2 += direction[1]
+                rays[r][c] = tuple(ray)
+                
+        return rays
+    
+    # A member function that returns the table of cells reached by a pawn moving two cells forward, which it may only do from its starting row.
+    def createDoublePushes(self, forward):
+        startRow = 1 if forward == 1 else self.rows - 2
+        
+        return [[((r + 2 * forward, c),) if r == startRow and self.contains(r + 2 * forward, c) else () \
+                 for c in xrange(self.cols)] for r in xrange(self.rows)]
+        
+        
+# A dictionary of the geometries that have been built, indexed by the number of rows and columns. Variants of the same size share one.
+geometries = dict()
+
+
 # A Variant base class that provides a representation and interface of each classes that will be inherited from this class.
 class Variant:
     rows = 0
@@ -23,10 +88,18 @@ class Variant:
         for r in xrange(cls.rows):
             for c in xrange(cls.cols):
                 if template[r][c]: 
-                    chessboard[r][c] = piece.numToPiece[abs(template[r][c])](board, template[r][c] / abs(template[r][c]), r, c, board.master.chessPieceImages[template[r][c]] if board.master is not None else None)
+                    chessboard[r][c] = piece.numToPiece[abs(template[r][c])](board, template[r][c] / abs(template[r][c]), r, c)
                     
         return chessboard
     
+    # A class method that returns the geometry of the variant's chessboard, building it the first time it is needed.
+    @classmethod
+    def getGeometry(cls):
+        if (cls.rows, cls.cols) not in geometries:
+            geometries[cls.rows, cls.cols] = Geometry(cls.rows, cls.cols)
+            
+        return geometries[cls.rows, cls.cols]
+    
     # A class method that determines if a position is valid position on the board. 
     @classmethod
     def isValidPosition(cls, r, c):
@@ -92,7 +165,7 @@ class Chess960(Variant):
         for r in xrange(cls.rows):
             for c in xrange(cls.cols):
                 if template[r][c]: 
-                    chessboard[r][c] = piece.numToPiece[abs(template[r][c])](board, template[r][c] / abs(template[r][c]), r, c, board.master.chessPieceImages[template[r][c]] if board.master is not None else None)
+                    chessboard[r][c] = piece.numToPiece[abs(template[r][c])](board, template[r][c] / abs(template[r][c]), r, c)
                     
         return chessboard
     
@@ -100,7 +173,7 @@ class Chess960(Variant):
     @staticmethod
     def shuffle(lst):
         for i in xrange(1, len(lst)):
-            randomIndex = int(random(i))
+            randomIndex = random.randrange(i)
             lst[i], lst[randomIndex] = lst[randomIndex], lst[i]
         
 
@@ -0,0 +1,81 @@
+import random
+import piece
+
+
+# Zobrist keys give every position a 64-bit key, made by XORing together one random number for each piece on its cell, one for the side
+# to move, one for each castling right and one for the file of an en passant capture. A move changes the key by a few XORs.
+BITS = 64
+
+# The keys are drawn from a generator with a fixed seed, so that a position has the same key in every run and keys that were stored stay valid.
+SEED = 0x5EED
+
+
+# The castling rights, as bits of an integer. Kingside is towards the column of the king's rook on the standard chessboard.
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+
+
+# A Keys class that holds the random numbers used for the positions of a chessboard of a given size. Cells are numbered from white's side,
+# whatever the orientation of the chessboard, so that a position has the same key however it is displayed.
+class Keys:
+    # An __init__ member function that gets called when a Keys instance is created. It creates the representation of the object.
+    def __init__(self, rows, cols):
+        generator = random.Random(SEED)
+
+        self.rows = rows
+        self.cols = cols
+        self.pieces = dict()
+        for color in (piece.COLOR.WHITE, piece.COLOR.BLACK):
+            for pieceType in xrange(1, len(piece.numToPiece)):
+                self.pieces[color * pieceType] = [generator.getrandbits(BITS) for i in xrange(rows * cols)]
+        self.side = generator.getrandbits(BITS)  # Used when black is to move.
+        rightKeys = [generator.getrandbits(BITS) for i in xrange(4)]
+        self.enPassant = [generator.getrandbits(BITS) for c in xrange(cols)]
+
+        self.castling = [0] * 16  # Indexed by the castling rights, each holding the keys of its rights combined.
+        for rights in xrange(16):
+            for i in xrange(4):
+                if rights >> i & 1:
+                    self.castling[rights] ^= rightKeys[i]
+
+        self.orientedPieces = dict()
+
+    # A member function that returns the keys of the pieces indexed by piece, row and column of a chessboard with the given orientation.
+    def getPieceKeys(self, orientation):
+        if orientation not in self.orientedPieces:
+            self.orientedPieces[orientation] = dict((chessPiece, [[pieceKeys[self.getIndex(r, c, orientation)] for c in xrange(self.cols)] for r in xrange(self.rows)]) \
+                                                    for chessPiece, pieceKeys in self.pieces.items())
+
+        return self.orientedPieces[orientation]
+
+    # A member function that returns the keys of the en passant files indexed by column of a chessboard with the given orientation.
+    def getEnPassantKeys(self, orientation):
+        return self.enPassant[:] if orientation == 1 else self.enPassant[::-1]
+
+    # A member function that returns the number of a cell counted from white's side, row by row from the top as white sees the chessboard.
+    def getIndex(self, r, c, orientation):
+        if orientation == 1:
+            return r * self.cols + c
+        return (self.rows - 1 - r) * self.cols + self.cols - 1 - c
+
+
+# A dictionary of the keys that have been drawn, indexed by the number of rows and columns. Chessboards of the same size share them.
+drawnKeys = dict()
+
+
+# A function that returns the keys of a chessboard of a given size, drawing them the first time they are needed.
+def getKeys(rows, cols):
+    if (rows, cols) not in drawnKeys:
+        drawnKeys[rows, cols] = Keys(rows, cols)
+
+    return drawnKeys[rows, cols]
+
+
+def main():
+    print("Please run the Chess_by_Eric_Liu.pyde file to run the program.")
+
+
+if __name__ == "__main__":
+    main()